@@ -0,0 +1,29 @@
+"""
+Script para agregar la actividad diaria de reclamos por departamento.
+Agrega sólo los reclamos y cambios de estado nuevos desde la ejecución
+anterior, por lo que conviene programarlo periódicamente (p. ej. con cron).
+Con --reconstruir vuelve a agregar todo el historial.
+"""
+
+import argparse
+
+from modules.config import create_app
+from modules.actividad_diaria import ActividadDiaria
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--reconstruir", action="store_true", help="volver a agregar todo el historial")
+    argumentos = parser.parse_args()
+
+    app = create_app()
+    with app.app_context():
+        if argumentos.reconstruir:
+            procesadas = ActividadDiaria.reconstruir()
+        else:
+            procesadas = ActividadDiaria.actualizar()
+        print(f"Actividad diaria actualizada: {procesadas} reclamos y cambios de estado agregados")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,30 @@
+"""
+Script para recalcular las métricas de tiempos de resolución por departamento.
+Recalcula sólo los departamentos con cambios de estado o movimientos de
+reclamos desde la ejecución anterior, por lo que conviene programarlo
+periódicamente (p. ej. con cron). Con --reconstruir recalcula todos.
+"""
+
+import argparse
+
+from modules.config import create_app
+from modules.metrica_resolucion import MetricaResolucion
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--reconstruir", action="store_true", help="recalcular todos los departamentos")
+    argumentos = parser.parse_args()
+
+    app = create_app()
+    with app.app_context():
+        if argumentos.reconstruir:
+            MetricaResolucion.reconstruir()
+            print("Métricas de resolución recalculadas para todos los departamentos")
+        else:
+            recalculados = MetricaResolucion.actualizar()
+            print(f"Métricas de resolución actualizadas: {recalculados} departamentos recalculados")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,19 @@
+"""
+Script para exportar el clasificador provisto por la cátedra a un artefacto compilado.
+Ejecutar cada vez que se reemplace data/claims_clf.pkl.
+"""
+
+from modules.clasificador import Clasificador
+
+
+def main():
+    clasificador = Clasificador()
+    if not clasificador.modelo_disponible():
+        print(f"No se encontró el modelo en {Clasificador.RUTA_MODELO}")
+        return
+    ruta = clasificador.exportar_modelo_compilado()
+    print(f"Modelo compilado exportado en {ruta}")
+
+
+if __name__ == "__main__":
+    main()
@@ -11,10 +11,16 @@ from modules.adherente_reclamo import AdherenteReclamo  # noqa: F401
 from modules.historial_estado_reclamo import HistorialEstadoReclamo  # noqa: F401
 from modules.derivacion_reclamo import DerivacionReclamo  # noqa: F401
 from modules.notificacion_usuario import NotificacionUsuario  # noqa: F401
+from modules.banda_lsh import BandaLSH  # noqa: F401
+from modules.cache_clasificacion import CacheClasificacion  # noqa: F401
+from modules.conteo_reclamos import ConteoReclamos  # noqa: F401
+from modules.frecuencia_palabra import FrecuenciaPalabra  # noqa: F401
+from modules.actividad_diaria import ActividadDiaria, MarcaActividad  # noqa: F401
+from modules.metrica_resolucion import MetricaResolucion, MarcaMetricaResolucion  # noqa: F401
+from modules.version_similitud import VersionSimilitud  # noqa: F401
 
 # Módulos de infraestructura
 from modules.clasificador import clasificador, Clasificador
-from modules.classifier import ClaimsClassifier
 from modules.similitud import buscador_similitud, BuscadorSimilitud
 from modules.manejador_imagen import ManejadorImagen
 
@@ -24,3 +30,11 @@ from modules.generador_reportes import crear_reporte, Reporte, ReporteHTML, Repo
 
 # Módulos auxiliares
 from modules.ayudante_admin import AyudanteAdmin
+
+
+def __getattr__(nombre):
+    # ClaimsClassifier importa scikit-learn: se resuelve recién cuando se pide
+    if nombre == "ClaimsClassifier":
+        from modules.classifier import ClaimsClassifier
+        return ClaimsClassifier
+    raise AttributeError(f"module {__name__!r} has no attribute {nombre!r}")
@@ -0,0 +1,217 @@
+from __future__ import annotations
+
+from datetime import date as Date, timedelta
+
+from sqlalchemy import ForeignKey, delete, func, select
+from sqlalchemy.dialects.sqlite import insert
+from sqlalchemy.orm import Mapped, mapped_column
+
+from modules.config import db
+from modules.reclamo import EstadoReclamo
+
+
+class ActividadDiaria(db.Model):
+    """
+    Reclamos creados, resueltos e invalidados por departamento y día.
+
+    La tabla la completa actualizar(), pensada para correr periódicamente
+    (ver actualizar_actividad.py): agrega sólo los reclamos y cambios de estado
+    posteriores a la última ejecución, cuyo último id se guarda en
+    MarcaActividad. Las tendencias de las analíticas leen sólo esta tabla.
+
+    Cada evento se cuenta en el departamento que tiene el reclamo al momento
+    de agregarlo; una derivación posterior no mueve lo ya agregado.
+    """
+
+    __tablename__ = "actividad_diaria"
+
+    departamento_id: Mapped[int] = mapped_column(ForeignKey("departamento.id"), primary_key=True)
+    fecha: Mapped[Date] = mapped_column(primary_key=True)
+    creados: Mapped[int] = mapped_column(default=0, nullable=False)
+    resueltos: Mapped[int] = mapped_column(default=0, nullable=False)
+    invalidados: Mapped[int] = mapped_column(default=0, nullable=False)
+
+    # Columna de la tabla según el estado nuevo de un cambio de estado
+    COLUMNA_ESTADO = {
+        EstadoReclamo.RESUELTO: "resueltos",
+        EstadoReclamo.INVALIDO: "invalidados",
+    }
+    AGRUPACIONES = ("dia", "semana")
+    # Filas por sentencia INSERT, por debajo del límite de parámetros de SQLite
+    FILAS_POR_SENTENCIA = 150
+
+    def __init__(self, departamento_id: int, fecha: Date):
+        self.departamento_id = departamento_id
+        self.fecha = fecha
+
+    def __repr__(self):
+        return (
+            f"<ActividadDiaria depto={self.departamento_id} {self.fecha} creados={self.creados} "
+            f"resueltos={self.resueltos} invalidados={self.invalidados}>"
+        )
+
+    @staticmethod
+    def actualizar() -> int:
+        """
+        Agrega los reclamos y cambios de estado nuevos desde la última
+        ejecución. Devuelve la cantidad de filas de origen procesadas.
+        """
+        from modules.historial_estado_reclamo import HistorialEstadoReclamo
+        from modules.reclamo import Reclamo
+
+        deltas: dict[tuple[int, Date], dict[str, int]] = {}
+        procesadas = 0
+
+        # Reclamos creados, por fecha de creación
+        desde, hasta = MarcaActividad.rango("reclamo", db.session.scalar(select(func.max(Reclamo.id))))
+        if hasta > desde:
+            filas = db.session.execute(
+                select(Reclamo.departamento_id, func.date(Reclamo.creado_en), func.count(Reclamo.id))
+                .where(Reclamo.id > desde, Reclamo.id <= hasta)
+                .group_by(Reclamo.departamento_id, func.date(Reclamo.creado_en))
+            )
+            for departamento_id, dia, cantidad in filas:
+                fila = deltas.setdefault((departamento_id, Date.fromisoformat(dia)), {})
+                fila["creados"] = fila.get("creados", 0) + cantidad
+                procesadas += cantidad
+            MarcaActividad.guardar("reclamo", hasta)
+
+        # Resoluciones e invalidaciones, por fecha del cambio de estado
+        desde, hasta = MarcaActividad.rango(
+            "historial", db.session.scalar(select(func.max(HistorialEstadoReclamo.id)))
+        )
+        if hasta > desde:
+            filas = db.session.execute(
+                select(
+                    Reclamo.departamento_id, func.date(HistorialEstadoReclamo.cambiado_en),
+                    HistorialEstadoReclamo.estado_nuevo, func.count(HistorialEstadoReclamo.id),
+                )
+                .join(Reclamo, Reclamo.id == HistorialEstadoReclamo.reclamo_id)
+                .where(
+                    HistorialEstadoReclamo.id > desde,
+                    HistorialEstadoReclamo.id <= hasta,
+                    HistorialEstadoReclamo.estado_nuevo.in_(list(ActividadDiaria.COLUMNA_ESTADO)),
+                )
+                .group_by(
+                    Reclamo.departamento_id, func.date(HistorialEstadoReclamo.cambiado_en),
+                    HistorialEstadoReclamo.estado_nuevo,
+                )
+            )
+            for departamento_id, dia, estado, cantidad in filas:
+                columna = ActividadDiaria.COLUMNA_ESTADO[estado]
+                fila = deltas.setdefault((departamento_id, Date.fromisoformat(dia)), {})
+                fila[columna] = fila.get(columna, 0) + cantidad
+                procesadas += cantidad
+            MarcaActividad.guardar("historial", hasta)
+
+        ActividadDiaria._sumar(deltas)
+        db.session.commit()
+        return procesadas
+
+    @staticmethod
+    def reconstruir() -> int:
+        """Borra la tabla y las marcas y vuelve a agregar todo el historial."""
+        db.session.execute(delete(ActividadDiaria))
+        db.session.execute(delete(MarcaActividad))
+        return ActividadDiaria.actualizar()
+
+    @staticmethod
+    def obtener_serie(
+        departamento_ids: list[int] | None,
+        desde: Date,
+        hasta: Date,
+        agrupar: str = "dia",
+    ) -> list[dict]:
+        """
+        Devuelve [{fecha, creados, resueltos, invalidados}] entre desde y hasta
+        (inclusive), con un elemento por día o por semana (que empieza el lunes),
+        incluidos los períodos sin actividad.
+        """
+        if agrupar not in ActividadDiaria.AGRUPACIONES:
+            raise ValueError(f"Agrupación desconocida: {agrupar}")
+
+        por_dia: dict[Date, tuple[int, int, int]] = {}
+        if departamento_ids is None or len(departamento_ids) > 0:
+            query = (
+                select(
+                    ActividadDiaria.fecha,
+                    func.sum(ActividadDiaria.creados),
+                    func.sum(ActividadDiaria.resueltos),
+                    func.sum(ActividadDiaria.invalidados),
+                )
+                .where(ActividadDiaria.fecha >= desde, ActividadDiaria.fecha <= hasta)
+                .group_by(ActividadDiaria.fecha)
+            )
+            if departamento_ids is not None:
+                query = query.where(ActividadDiaria.departamento_id.in_(departamento_ids))
+            por_dia = {
+                fecha: (int(creados), int(resueltos), int(invalidados))
+                for fecha, creados, resueltos, invalidados in db.session.execute(query)
+            }
+
+        serie: dict[Date, dict] = {}
+        dia = desde
+        while dia <= hasta:
+            inicio = dia - timedelta(days=dia.weekday()) if agrupar == "semana" else dia
+            periodo = serie.setdefault(
+                inicio, {"fecha": inicio, "creados": 0, "resueltos": 0, "invalidados": 0}
+            )
+            creados, resueltos, invalidados = por_dia.get(dia, (0, 0, 0))
+            periodo["creados"] += creados
+            periodo["resueltos"] += resueltos
+            periodo["invalidados"] += invalidados
+            dia += timedelta(days=1)
+        return list(serie.values())
+
+    # ── Helpers privados ─────────────────────────────────────────────
+
+    @staticmethod
+    def _sumar(deltas: dict[tuple[int, Date], dict[str, int]]) -> None:
+        filas = [
+            {
+                "departamento_id": departamento_id, "fecha": fecha,
+                "creados": valores.get("creados", 0),
+                "resueltos": valores.get("resueltos", 0),
+                "invalidados": valores.get("invalidados", 0),
+            }
+            for (departamento_id, fecha), valores in deltas.items()
+        ]
+        for inicio in range(0, len(filas), ActividadDiaria.FILAS_POR_SENTENCIA):
+            sentencia = insert(ActividadDiaria).values(
+                filas[inicio:inicio + ActividadDiaria.FILAS_POR_SENTENCIA]
+            )
+            db.session.execute(sentencia.on_conflict_do_update(
+                index_elements=[ActividadDiaria.departamento_id, ActividadDiaria.fecha],
+                set_={
+                    columna: getattr(ActividadDiaria, columna) + getattr(sentencia.excluded, columna)
+                    for columna in ("creados", "resueltos", "invalidados")
+                },
+            ))
+
+
+class MarcaActividad(db.Model):
+    """Último id de cada tabla de origen ya agregado en actividad_diaria."""
+
+    __tablename__ = "marca_actividad"
+
+    origen: Mapped[str] = mapped_column(primary_key=True)
+    ultimo_id: Mapped[int] = mapped_column(default=0, nullable=False)
+
+    def __init__(self, origen: str, ultimo_id: int = 0):
+        self.origen = origen
+        self.ultimo_id = ultimo_id
+
+    @staticmethod
+    def rango(origen: str, maximo_id: int | None) -> tuple[int, int]:
+        """Devuelve (último id agregado, id máximo actual) para el origen."""
+        marca = db.session.get(MarcaActividad, origen)
+        return (marca.ultimo_id if marca else 0), (maximo_id or 0)
+
+    @staticmethod
+    def guardar(origen: str, ultimo_id: int) -> None:
+        """No hace commit."""
+        marca = db.session.get(MarcaActividad, origen)
+        if marca is None:
+            db.session.add(MarcaActividad(origen, ultimo_id))
+        else:
+            marca.ultimo_id = ultimo_id
@@ -34,6 +34,7 @@ class AyudanteAdmin:
 
         return (
             db.session.query(Reclamo)
+            .options(*Reclamo.opciones_precarga())
             .filter(Reclamo.departamento_id.in_(ids_filtro))
             .order_by(Reclamo.creado_en.desc())
             .all()
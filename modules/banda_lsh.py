@@ -0,0 +1,145 @@
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+from sqlalchemy import ForeignKey, and_, delete, insert, or_, select, update
+from sqlalchemy.orm import Mapped, mapped_column, relationship
+
+from modules.config import db
+from modules.utils.minhash import (
+    calcular_bandas, calcular_firma, firma_a_bytes, firma_desde_bytes, similitud_estimada,
+)
+
+if TYPE_CHECKING:
+    from modules.reclamo import Reclamo
+
+
+class BandaLSH(db.Model):
+    """
+    Bucket LSH de la firma MinHash de un reclamo.
+    Dos reclamos que comparten alguna (banda, valor) son candidatos a casi duplicados.
+    """
+
+    __tablename__ = "banda_lsh"
+
+    banda: Mapped[int] = mapped_column(primary_key=True)
+    valor: Mapped[int] = mapped_column(primary_key=True)
+    reclamo_id: Mapped[int] = mapped_column(ForeignKey("reclamo.id"), primary_key=True)
+
+    # Relaciones
+    reclamo: Mapped["Reclamo"] = relationship("Reclamo", back_populates="bandas_lsh")
+
+    def __init__(self, banda: int, valor: int):
+        self.banda = banda
+        self.valor = valor
+
+    def __repr__(self):
+        return f"<BandaLSH reclamo={self.reclamo_id} banda={self.banda}>"
+
+    @staticmethod
+    def registrar(reclamo: "Reclamo") -> None:
+        """
+        Calcula la firma del reclamo y sus buckets. Un texto sin shingles no se
+        indexa. No hace commit.
+        """
+        firma = calcular_firma(reclamo.detalle)
+        if firma is None:
+            reclamo.firma_minhash = None
+            reclamo.bandas_lsh = []
+            return
+        reclamo.firma_minhash = firma_a_bytes(firma)
+        reclamo.bandas_lsh = [
+            BandaLSH(banda=i, valor=valor) for i, valor in enumerate(calcular_bandas(firma))
+        ]
+
+    @staticmethod
+    def reconstruir(tamano_bloque: int = 1000) -> int:
+        """
+        Recalcula la firma y los buckets de todos los reclamos, de a
+        `tamano_bloque` por id (necesario para los reclamos creados antes de
+        existir la detección de casi duplicados). Devuelve cuántos indexó.
+        """
+        from modules.reclamo import Reclamo
+
+        db.session.execute(delete(BandaLSH))
+        indexados = 0
+        ultimo_id = 0
+        while True:
+            filas = db.session.execute(
+                select(Reclamo.id, Reclamo.detalle)
+                .where(Reclamo.id > ultimo_id)
+                .order_by(Reclamo.id)
+                .limit(tamano_bloque)
+            ).all()
+            if not filas:
+                break
+            firmas, bandas = [], []
+            for reclamo_id, detalle in filas:
+                firma = calcular_firma(detalle)
+                firmas.append({
+                    "id": reclamo_id,
+                    "firma_minhash": None if firma is None else firma_a_bytes(firma),
+                })
+                if firma is not None:
+                    indexados += 1
+                    bandas.extend(
+                        {"banda": i, "valor": valor, "reclamo_id": reclamo_id}
+                        for i, valor in enumerate(calcular_bandas(firma))
+                    )
+            db.session.execute(update(Reclamo), firmas)
+            if bandas:
+                db.session.execute(insert(BandaLSH), bandas)
+            ultimo_id = filas[-1][0]
+        db.session.commit()
+        return indexados
+
+    @staticmethod
+    def buscar_casi_duplicados(
+        texto: str,
+        umbral: float = 0.6,
+        limite: int = 5,
+        excluir_id: int | None = None,
+    ) -> list[tuple["Reclamo", float]]:
+        """Reclamos en cualquier estado cuyo texto es casi idéntico al dado."""
+        from modules.reclamo import Reclamo
+
+        if not texto or not texto.strip():
+            return []
+
+        firma = calcular_firma(texto)
+        if firma is None:
+            return []
+        condiciones = [
+            and_(BandaLSH.banda == i, BandaLSH.valor == valor)
+            for i, valor in enumerate(calcular_bandas(firma))
+        ]
+        ids_candidatos = [
+            reclamo_id
+            for (reclamo_id,) in db.session.query(BandaLSH.reclamo_id)
+            .filter(or_(*condiciones))
+            .distinct()
+            .all()
+            if reclamo_id != excluir_id
+        ]
+        if not ids_candidatos:
+            return []
+
+        firmas = (
+            db.session.query(Reclamo.id, Reclamo.firma_minhash)
+            .filter(Reclamo.id.in_(ids_candidatos))
+            .all()
+        )
+        puntajes = sorted(
+            (
+                (similitud_estimada(firma, firma_desde_bytes(datos)), reclamo_id)
+                for reclamo_id, datos in firmas
+                if datos is not None
+            ),
+            reverse=True,
+        )
+        puntajes = [(sim, rid) for sim, rid in puntajes if sim >= umbral][:limite]
+        if not puntajes:
+            return []
+
+        reclamos = {r.id: r for r in Reclamo.obtener_por_ids([rid for _, rid in puntajes])}
+        return [(reclamos[rid], sim) for sim, rid in puntajes if rid in reclamos]
@@ -0,0 +1,166 @@
+from __future__ import annotations
+
+import hashlib
+from datetime import datetime as Datetime, timedelta
+
+from sqlalchemy import delete, func, select
+from sqlalchemy.dialects.sqlite import insert
+from sqlalchemy.orm import Mapped, mapped_column
+
+from modules.config import db
+from modules.utils.texto import normalizar_texto
+
+
+class CacheClasificacion(db.Model):
+    """
+    Resultado del clasificador para un texto normalizado y una versión del modelo.
+
+    Las entradas de otra versión del modelo se descartan la primera vez que se
+    consulta la caché con la versión nueva. Cuando se supera MAX_ENTRADAS se
+    eliminan las entradas usadas hace más tiempo.
+
+    Para que una consulta sea sólo una lectura, usado_en se actualiza únicamente
+    si tiene más de INTERVALO_USO, y el tamaño se controla cada
+    ALTAS_ENTRE_DESALOJOS altas por proceso en lugar de en cada alta (la tabla
+    puede pasarse del máximo por esa cantidad).
+    """
+
+    __tablename__ = "cache_clasificacion"
+
+    MAX_ENTRADAS = 20_000
+    PROPORCION_DESALOJO = 0.1
+    INTERVALO_USO = timedelta(hours=1)
+    ALTAS_ENTRE_DESALOJOS = 500
+
+    clave: Mapped[str] = mapped_column(primary_key=True)
+    version_modelo: Mapped[str] = mapped_column(nullable=False, index=True)
+    departamento: Mapped[str] = mapped_column(nullable=False)
+    usado_en: Mapped[Datetime] = mapped_column(default=Datetime.now, index=True)
+
+    # Última versión con la que se verificó la tabla, por proceso
+    _version_verificada = None
+    # Altas desde el último control de tamaño, por proceso
+    _altas_sin_desalojo = 0
+
+    def __init__(self, clave: str, version_modelo: str, departamento: str):
+        self.clave = clave
+        self.version_modelo = version_modelo
+        self.departamento = departamento
+
+    def __repr__(self):
+        return f"<CacheClasificacion {self.clave[:8]} -> {self.departamento}>"
+
+    @staticmethod
+    def calcular_clave(texto: str) -> str:
+        """Hash del texto normalizado; ignora mayúsculas, acentos y espacios repetidos."""
+        normalizado = " ".join(normalizar_texto(texto).split())
+        return hashlib.blake2b(normalizado.encode("utf-8"), digest_size=16).hexdigest()
+
+    @staticmethod
+    def obtener(texto: str, version_modelo: str) -> str | None:
+        return CacheClasificacion.obtener_varios([texto], version_modelo).get(
+            CacheClasificacion.calcular_clave(texto)
+        )
+
+    @staticmethod
+    def consultar(texto: str, version_modelo: str) -> str | None:
+        """
+        Como obtener, pero sólo lee: no invalida otras versiones ni actualiza
+        usado_en, así que no escribe en la base.
+        """
+        return db.session.scalar(
+            select(CacheClasificacion.departamento).where(
+                CacheClasificacion.clave == CacheClasificacion.calcular_clave(texto),
+                CacheClasificacion.version_modelo == version_modelo,
+            )
+        )
+
+    @staticmethod
+    def obtener_varios(textos: list[str], version_modelo: str) -> dict[str, str]:
+        """Devuelve {clave: departamento} para los textos que están en la caché."""
+        CacheClasificacion._invalidar_otras_versiones(version_modelo)
+        claves = list({CacheClasificacion.calcular_clave(t) for t in textos})
+        if not claves:
+            return {}
+        filas = db.session.execute(
+            select(
+                CacheClasificacion.clave, CacheClasificacion.departamento, CacheClasificacion.usado_en,
+            ).where(
+                CacheClasificacion.clave.in_(claves),
+                CacheClasificacion.version_modelo == version_modelo,
+            )
+        ).all()
+        ahora = Datetime.now()
+        viejas = [clave for clave, _, usado_en in filas if usado_en < ahora - CacheClasificacion.INTERVALO_USO]
+        if viejas:
+            db.session.query(CacheClasificacion).filter(
+                CacheClasificacion.clave.in_(viejas)
+            ).update({"usado_en": ahora}, synchronize_session=False)
+            db.session.commit()
+        return {clave: departamento for clave, departamento, _ in filas}
+
+    @staticmethod
+    def guardar(texto: str, version_modelo: str, departamento: str) -> None:
+        CacheClasificacion.guardar_varios([(texto, departamento)], version_modelo)
+
+    @staticmethod
+    def guardar_varios(resultados: list[tuple[str, str]], version_modelo: str) -> None:
+        """Guarda tuplas (texto, departamento) y desaloja si se supera el máximo."""
+        if not resultados:
+            return
+        ahora = Datetime.now()
+        filas = {
+            CacheClasificacion.calcular_clave(texto): departamento for texto, departamento in resultados
+        }
+        sentencia = insert(CacheClasificacion).values([
+            {"clave": clave, "version_modelo": version_modelo, "departamento": departamento, "usado_en": ahora}
+            for clave, departamento in filas.items()
+        ])
+        db.session.execute(sentencia.on_conflict_do_update(
+            index_elements=[CacheClasificacion.clave],
+            set_={
+                "version_modelo": sentencia.excluded.version_modelo,
+                "departamento": sentencia.excluded.departamento,
+                "usado_en": sentencia.excluded.usado_en,
+            },
+        ))
+        CacheClasificacion._altas_sin_desalojo += len(filas)
+        if CacheClasificacion._altas_sin_desalojo >= CacheClasificacion.ALTAS_ENTRE_DESALOJOS:
+            CacheClasificacion._desalojar()
+            CacheClasificacion._altas_sin_desalojo = 0
+        db.session.commit()
+
+    @staticmethod
+    def limpiar() -> None:
+        db.session.execute(delete(CacheClasificacion))
+        db.session.commit()
+        CacheClasificacion._version_verificada = None
+        CacheClasificacion._altas_sin_desalojo = 0
+
+    # ── Helpers privados ─────────────────────────────────────────────
+
+    @staticmethod
+    def _invalidar_otras_versiones(version_modelo: str) -> None:
+        if CacheClasificacion._version_verificada == version_modelo:
+            return
+        db.session.execute(
+            delete(CacheClasificacion).where(CacheClasificacion.version_modelo != version_modelo)
+        )
+        db.session.commit()
+        CacheClasificacion._version_verificada = version_modelo
+
+    @staticmethod
+    def _desalojar() -> None:
+        total = db.session.scalar(select(func.count()).select_from(CacheClasificacion))
+        if total <= CacheClasificacion.MAX_ENTRADAS:
+            return
+        # Se libera algo más que el excedente para no desalojar en cada alta
+        sobrantes = total - int(CacheClasificacion.MAX_ENTRADAS * (1 - CacheClasificacion.PROPORCION_DESALOJO))
+        mas_viejas = (
+            select(CacheClasificacion.clave)
+            .order_by(CacheClasificacion.usado_en)
+            .limit(sobrantes)
+        )
+        db.session.execute(
+            delete(CacheClasificacion).where(CacheClasificacion.clave.in_(mas_viejas))
+        )
@@ -0,0 +1,183 @@
+"""
+Cache de gráficos renderizados, direccionado por contenido.
+
+La clave es un hash de los datos del gráfico y de sus parámetros de
+renderizado: si los conteos no cambiaron, la imagen se sirve sin volver a
+dibujarla. Hay un nivel en memoria (LRU) y otro en disco que sobrevive a los
+reinicios y se comparte entre procesos.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import threading
+from collections import OrderedDict
+from typing import Callable
+
+RUTA_CACHE_GRAFICOS = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data", "cache_graficos"
+)
+
+
+class CacheGraficos:
+    """
+    Cache de imágenes en dos niveles. En memoria se guardan hasta
+    `capacidad_memoria` imágenes; en disco, hasta `max_bytes_disco` bytes, tras
+    lo cual se borran los archivos usados hace más tiempo.
+    """
+
+    CAPACIDAD_MEMORIA = 64
+    MAX_BYTES_DISCO = 50 * 1024 * 1024
+
+    def __init__(
+        self,
+        directorio: str | None = RUTA_CACHE_GRAFICOS,
+        capacidad_memoria: int = CAPACIDAD_MEMORIA,
+        max_bytes_disco: int = MAX_BYTES_DISCO,
+    ):
+        self.directorio = directorio
+        self.capacidad_memoria = capacidad_memoria
+        self.max_bytes_disco = max_bytes_disco
+        self.aciertos_memoria = 0
+        self.aciertos_disco = 0
+        self.fallos = 0
+        self.__entradas: OrderedDict[str, bytes] = OrderedDict()
+        self.__lock = threading.Lock()
+
+    @staticmethod
+    def clave(tipo: str, datos: dict, parametros: dict | None = None) -> str:
+        """
+        Huella de los datos y parámetros. Los datos se toman en su orden, que es
+        el de las porciones y etiquetas del gráfico; los parámetros no.
+        """
+        contenido = json.dumps(
+            {"tipo": tipo, "datos": list(datos.items()), "parametros": parametros or {}},
+            sort_keys=True, ensure_ascii=False, default=str,
+        )
+        return hashlib.blake2b(contenido.encode("utf-8"), digest_size=16).hexdigest()
+
+    def obtener(self, clave: str) -> bytes | None:
+        with self.__lock:
+            imagen = self.__entradas.get(clave)
+            if imagen is not None:
+                self.__entradas.move_to_end(clave)
+                self.aciertos_memoria += 1
+                return imagen
+
+        imagen = self.__leer_disco(clave)
+        if imagen is None:
+            self.fallos += 1
+            return None
+        self.aciertos_disco += 1
+        self.__guardar_memoria(clave, imagen)
+        return imagen
+
+    def guardar(self, clave: str, imagen: bytes) -> None:
+        self.__guardar_memoria(clave, imagen)
+        self.__escribir_disco(clave, imagen)
+
+    def obtener_o_generar(
+        self, tipo: str, datos: dict, parametros: dict | None, generar: Callable[[], bytes | None]
+    ) -> bytes | None:
+        """Devuelve la imagen cacheada o la genera y la guarda (si generar no devuelve None)."""
+        clave = self.clave(tipo, datos, parametros)
+        imagen = self.obtener(clave)
+        if imagen is None:
+            imagen = generar()
+            if imagen is not None:
+                self.guardar(clave, imagen)
+        return imagen
+
+    def limpiar(self) -> None:
+        with self.__lock:
+            self.__entradas.clear()
+            self.aciertos_memoria = self.aciertos_disco = self.fallos = 0
+        for nombre, _, _ in self.__archivos():
+            try:
+                os.remove(os.path.join(self.directorio, nombre))
+            except OSError:
+                pass
+
+    def estadisticas(self) -> dict[str, int]:
+        archivos = self.__archivos()
+        return {
+            "en_memoria": len(self.__entradas),
+            "capacidad_memoria": self.capacidad_memoria,
+            "en_disco": len(archivos),
+            "bytes_disco": sum(tamano for _, tamano, _ in archivos),
+            "aciertos_memoria": self.aciertos_memoria,
+            "aciertos_disco": self.aciertos_disco,
+            "fallos": self.fallos,
+        }
+
+    # ── Helpers privados ─────────────────────────────────────────────
+
+    def __guardar_memoria(self, clave: str, imagen: bytes) -> None:
+        with self.__lock:
+            self.__entradas[clave] = imagen
+            self.__entradas.move_to_end(clave)
+            while len(self.__entradas) > self.capacidad_memoria:
+                self.__entradas.popitem(last=False)
+
+    def __ruta(self, clave: str) -> str:
+        return os.path.join(self.directorio, f"{clave}.bin")
+
+    def __leer_disco(self, clave: str) -> bytes | None:
+        if self.directorio is None:
+            return None
+        ruta = self.__ruta(clave)
+        try:
+            with open(ruta, "rb") as archivo:
+                imagen = archivo.read()
+            # La fecha de modificación hace de "último uso" para el desalojo
+            os.utime(ruta)
+        except OSError:
+            return None
+        return imagen
+
+    def __escribir_disco(self, clave: str, imagen: bytes) -> None:
+        if self.directorio is None:
+            return
+        try:
+            os.makedirs(self.directorio, exist_ok=True)
+            temporal = f"{self.__ruta(clave)}.{os.getpid()}.{threading.get_ident()}.tmp"
+            with open(temporal, "wb") as archivo:
+                archivo.write(imagen)
+            os.replace(temporal, self.__ruta(clave))
+        except OSError:
+            # Sin disco disponible el cache sigue funcionando en memoria
+            return
+        self.__desalojar_disco()
+
+    def __archivos(self) -> list[tuple[str, int, float]]:
+        if self.directorio is None or not os.path.isdir(self.directorio):
+            return []
+        archivos = []
+        for entrada in os.scandir(self.directorio):
+            if entrada.name.endswith(".bin"):
+                try:
+                    estado = entrada.stat()
+                except OSError:
+                    continue
+                archivos.append((entrada.name, estado.st_size, estado.st_mtime))
+        return archivos
+
+    def __desalojar_disco(self) -> None:
+        archivos = self.__archivos()
+        total = sum(tamano for _, tamano, _ in archivos)
+        if total <= self.max_bytes_disco:
+            return
+        for nombre, tamano, _ in sorted(archivos, key=lambda a: a[2]):
+            try:
+                os.remove(os.path.join(self.directorio, nombre))
+            except OSError:
+                continue
+            total -= tamano
+            if total <= self.max_bytes_disco:
+                return
+
+
+# Instancia global del cache de gráficos
+cache_graficos = CacheGraficos()
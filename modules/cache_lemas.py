@@ -0,0 +1,77 @@
+"""
+Cache LRU de textos lematizados por spaCy.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import threading
+from collections import OrderedDict
+
+
+class CacheLemas:
+    """
+    Cache acotado de tokens lematizados, indexado por un hash del texto.
+    Al superar la capacidad se descarta la entrada usada hace más tiempo.
+    """
+
+    CAPACIDAD_POR_DEFECTO = 10_000
+
+    def __init__(self, capacidad: int = CAPACIDAD_POR_DEFECTO):
+        self.capacidad = capacidad
+        self.aciertos = 0
+        self.fallos = 0
+        self.__entradas: OrderedDict[str, str] = OrderedDict()
+        self.__lock = threading.Lock()
+
+    @staticmethod
+    def clave(texto: str) -> str:
+        # El vectorizador pasa todo a minúsculas antes de lematizar
+        return hashlib.blake2b(texto.lower().encode("utf-8"), digest_size=16).hexdigest()
+
+    def obtener(self, texto: str) -> str | None:
+        clave = self.clave(texto)
+        with self.__lock:
+            tokens = self.__entradas.get(clave)
+            if tokens is None:
+                self.fallos += 1
+                return None
+            self.__entradas.move_to_end(clave)
+            self.aciertos += 1
+            return tokens
+
+    def guardar(self, texto: str, tokens: str) -> None:
+        clave = self.clave(texto)
+        with self.__lock:
+            self.__entradas[clave] = tokens
+            self.__entradas.move_to_end(clave)
+            while len(self.__entradas) > self.capacidad:
+                self.__entradas.popitem(last=False)
+
+    def limpiar(self) -> None:
+        with self.__lock:
+            self.__entradas.clear()
+            self.aciertos = 0
+            self.fallos = 0
+
+    def __len__(self) -> int:
+        return len(self.__entradas)
+
+    def estadisticas(self) -> dict[str, float]:
+        consultas = self.aciertos + self.fallos
+        return {
+            "tamano": len(self.__entradas),
+            "capacidad": self.capacidad,
+            "aciertos": self.aciertos,
+            "fallos": self.fallos,
+            "tasa_aciertos": self.aciertos / consultas if consultas else 0.0,
+        }
+
+    def __getstate__(self):
+        estado = self.__dict__.copy()
+        del estado["_CacheLemas__lock"]
+        return estado
+
+    def __setstate__(self, estado):
+        self.__dict__.update(estado)
+        self.__lock = threading.Lock()
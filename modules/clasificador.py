@@ -5,33 +5,170 @@ Clasificador automático de reclamos usando pickle + ClaimsClassifier.
 from __future__ import annotations
 import os
 import pickle
+import threading
+
+from modules.cache_lemas import CacheLemas
+from modules.cortacircuitos import Cortacircuitos
+from modules.modelo_compilado import PredictorCompilado, exportar_modelo
 
 
 class Clasificador:
-    """Clasificador automático de reclamos a departamentos"""
+    """
+    Clasificador automático de reclamos a departamentos.
+
+    Con carga_diferida=True el pickle (y con él spaCy y scikit-learn) se carga
+    recién en el primer uso, o antes si se llama a precalentar().
+    """
 
     RUTA_MODELO = os.path.join(os.path.dirname(os.path.dirname(__file__)), "data", "claims_clf.pkl")
+    RUTA_MODELO_COMPILADO = os.path.join(
+        os.path.dirname(os.path.dirname(__file__)), "data", "claims_clf_compilado"
+    )
+    # Procesamiento por lotes de spaCy (clasificar_lote)
+    TAMANO_LOTE = 256
+    PROCESOS_LOTE = 1
+    # Textos lematizados que se recuerdan (ver CacheLemas)
+    CAPACIDAD_CACHE_LEMAS = 10_000
+
+    DEPARTAMENTOS_POR_ETIQUETA = {
+        "soporte informático": "Secretario Informartico - secretario_informatico",
+        "secretaría técnica": "Secretario Técnico - secretario_tecnico",
+        "maestranza": "Maestranza - maestranza",
+    }
 
-    def __init__(self):
+    def __init__(self, carga_diferida: bool = False):
         self.__clf = None
-        if os.path.exists(self.RUTA_MODELO):
-            with open(self.RUTA_MODELO, "rb") as archivo:
-                self.__clf = pickle.load(archivo)
+        self.__predictor = None
+        self.__version: str | None = None
+        self.__cargado = False
+        self.__lock = threading.Lock()
+        self.cache_lemas = CacheLemas(self.CAPACIDAD_CACHE_LEMAS)
+        if not carga_diferida:
+            self.__asegurar_cargado()
+
+    @property
+    def listo(self) -> bool:
+        """True cuando ya se intentó cargar el modelo; usarlo no bloquea."""
+        return self.__cargado
+
+    def __asegurar_cargado(self) -> None:
+        if self.__cargado:
+            return
+        with self.__lock:
+            if self.__cargado:
+                return
+            if os.path.exists(self.RUTA_MODELO):
+                with open(self.RUTA_MODELO, "rb") as archivo:
+                    self.__clf = pickle.load(archivo)
+                self.__clf.set_token_cache(self.cache_lemas)
+                self.__version = self.version_modelo()
+                self.__predictor = self.__cargar_predictor_compilado()
+            self.__cargado = True
+
+    def precalentar(self, en_segundo_plano: bool = True) -> threading.Thread | None:
+        """Carga el modelo y procesa un texto corto para inicializar spaCy."""
+
+        def _precalentar():
+            self.__asegurar_cargado()
+            if self.__clf is not None:
+                self.__clf.tokenize(["precalentamiento del clasificador"])
+
+        if not en_segundo_plano:
+            _precalentar()
+            return None
+        hilo = threading.Thread(target=_precalentar, name="precalentar-clasificador", daemon=True)
+        hilo.start()
+        return hilo
+
+    @classmethod
+    def huella_modelo(cls) -> dict[str, int]:
+        """Identifica la versión del pickle por tamaño y fecha de modificación."""
+        estado = os.stat(cls.RUTA_MODELO)
+        return {"tamano": estado.st_size, "modificado_ns": estado.st_mtime_ns}
+
+    @property
+    def version(self) -> str | None:
+        """Versión del modelo cargado en este proceso (ver version_modelo)."""
+        self.__asegurar_cargado()
+        return self.__version
+
+    def version_sin_cargar(self) -> str | None:
+        """
+        Versión del modelo sin cargarlo: la del modelo ya cargado o, si todavía
+        no se cargó, la del pickle en disco. None si no hay modelo.
+        """
+        if self.__cargado:
+            return self.__version
+        try:
+            return self.version_modelo()
+        except OSError:
+            return None
+
+    @classmethod
+    def version_modelo(cls) -> str:
+        """Huella del pickle como texto, para guardar junto a resultados del modelo."""
+        huella = cls.huella_modelo()
+        return f"{huella['tamano']}-{huella['modificado_ns']}"
+
+    def __cargar_predictor_compilado(self) -> PredictorCompilado | None:
+        # Un artefacto exportado desde otro pickle se ignora
+        metadatos = PredictorCompilado.leer_metadatos(self.RUTA_MODELO_COMPILADO)
+        if not PredictorCompilado.es_compatible(metadatos) or metadatos.get("origen") != self.huella_modelo():
+            return None
+        return PredictorCompilado.cargar(self.RUTA_MODELO_COMPILADO)
+
+    def exportar_modelo_compilado(self, ruta: str | None = None) -> str:
+        """Exporta el modelo cargado a un artefacto compilado y empieza a usarlo."""
+        self.__asegurar_cargado()
+        ruta = ruta or self.RUTA_MODELO_COMPILADO
+        exportar_modelo(self.__clf, ruta, metadatos={"origen": self.huella_modelo()})
+        if ruta == self.RUTA_MODELO_COMPILADO:
+            self.__predictor = PredictorCompilado.cargar(ruta)
+        return ruta
+
+    def usa_modelo_compilado(self) -> bool:
+        return self.__predictor is not None
 
     def clasificar(self, texto: str) -> str:
         """Clasifica un texto y devuelve el nombre de departamento interno."""
-        resultado = self.__clf.classify([texto])[0]
-        tabla = {
-            "soporte informático": "Secretario Informartico - secretario_informatico",
-            "secretaría técnica": "Secretario Técnico - secretario_tecnico",
-            "maestranza": "Maestranza - maestranza",
+        self.__asegurar_cargado()
+        if self.__predictor is not None:
+            resultado = self.__predictor.predecir(self.__clf.tokenize([texto]))[0]
+        else:
+            resultado = self.__clf.classify([texto])[0]
+        return self.DEPARTAMENTOS_POR_ETIQUETA[resultado]
+
+    def clasificar_lote(
+        self,
+        textos: list[str],
+        tamano_lote: int | None = None,
+        procesos: int | None = None,
+    ) -> list[str]:
+        """
+        Clasifica muchos textos de una vez, procesándolos en lotes con nlp.pipe.
+        Devuelve los nombres de departamento interno en el mismo orden.
+        """
+        if not textos:
+            return []
+        self.__asegurar_cargado()
+        parametros_lote = {
+            "batch_size": tamano_lote or self.TAMANO_LOTE,
+            "n_process": procesos or self.PROCESOS_LOTE,
         }
-        return tabla[resultado]
+        if self.__predictor is not None:
+            resultados = self.__predictor.predecir(self.__clf.tokenize(list(textos), **parametros_lote))
+        else:
+            resultados = self.__clf.classify_batch(list(textos), **parametros_lote)
+        return [self.DEPARTAMENTOS_POR_ETIQUETA[r] for r in resultados]
 
     def modelo_disponible(self) -> bool:
         """Retorna True si el modelo fue cargado correctamente."""
+        self.__asegurar_cargado()
         return self.__clf is not None
 
 
-# Instancia global del clasificador
-clasificador = Clasificador()
+# Instancia global del clasificador; el modelo se carga en el primer uso
+clasificador = Clasificador(carga_diferida=True)
+
+# Protege a los requests de un clasificador lento o con fallos seguidos
+cortacircuitos_clasificador = Cortacircuitos("clasificador")
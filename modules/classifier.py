@@ -1,3 +1,5 @@
+import numpy as np
+import scipy.sparse as sp
 from modules.text_vectorizer import TextVectorizer
 from sklearn.preprocessing import LabelEncoder
 from sklearn.pipeline import Pipeline
@@ -25,9 +27,40 @@ class ClaimsClassifier(ClassifierMixin, BaseEstimator):
             self.is_fitted_ = True
         return self
     
-    def __predict(self, X):
+    def __used_features(self):
+        """Índices (ordenados) de las columnas que algún árbol del bosque consulta."""
+        forest = self.__clf.named_steps['classifier']
+        return np.unique(np.concatenate([
+            tree.tree_.feature[tree.tree_.feature >= 0] for tree in forest.estimators_
+        ]))
+
+    def __predict(self, X, batch_size=None, n_process=None):
+        """Predice igual que el Pipeline entrenado, sin densificar todo el vocabulario.
+        Los conteos se arman dispersos, pero las columnas que usan los árboles se escalan
+        en un bloque denso de filas x columnas usadas: la memoria crece con la cantidad de
+        textos por la cantidad de columnas usadas, no con la cantidad de palabras de cada texto.
+        """
         check_is_fitted(self)
-        return self.__encoder.inverse_transform(self.__clf.predict(X))
+        vectorizer = self.__clf.named_steps['vectorizer']
+        scaler = self.__clf.named_steps['scaler']
+        forest = self.__clf.named_steps['classifier']
+
+        # El escalado centra los datos, así que los ceros dejan de serlo: sólo se escalan
+        # (en denso) las columnas que usan los árboles. Las demás quedan en 0, un valor
+        # que ningún árbol llega a comparar.
+        counts = vectorizer.transform_sparse(X, batch_size, n_process)
+        features = self.__used_features()
+        scaled = (counts[:, features].toarray() - scaler.mean_[features]) / scaler.scale_[features]
+        n_rows = counts.shape[0]
+        scaled_sparse = sp.csr_matrix(
+            (
+                scaled.ravel(),
+                np.tile(features, n_rows),
+                np.arange(n_rows + 1) * len(features),
+            ),
+            shape=counts.shape,
+        )
+        return self.__encoder.inverse_transform(forest.predict(scaled_sparse))
     
     def classify(self, X):
         """Clasifica una lista de reclamos
@@ -38,4 +71,34 @@ class ClaimsClassifier(ClassifierMixin, BaseEstimator):
             los valores posibles dependen de las etiquetas en y usadas en el entrenamiento
         """
         return self.__predict(X)
+
+    def get_components(self):
+        """Devuelve los pasos entrenados del pipeline y las etiquetas originales de cada clase"""
+        check_is_fitted(self)
+        return {
+            'vectorizer': self.__clf.named_steps['vectorizer'],
+            'scaler': self.__clf.named_steps['scaler'],
+            'classifier': self.__clf.named_steps['classifier'],
+            'labels': self.__encoder.classes_,
+        }
+
+    def tokenize(self, X, batch_size=None, n_process=None):
+        """Devuelve los textos lematizados tal como los ve el vectorizador"""
+        return self.__clf.named_steps['vectorizer'].tokenize(X, batch_size, n_process)
+
+    def set_token_cache(self, token_cache):
+        """Conecta un cache de textos lematizados al vectorizador del pipeline"""
+        self.__clf.named_steps['vectorizer'].set_token_cache(token_cache)
+        return self
+
+    def classify_batch(self, X, batch_size=None, n_process=None):
+        """Clasifica una lista grande de reclamos procesando los textos en lotes con nlp.pipe
+        Args:
+            X (List): Lista de reclamos a clasificar, el formato de cada reclamo debe ser un string
+            batch_size (int): Cantidad de textos por lote de spaCy
+            n_process (int): Cantidad de procesos que usa spaCy
+        Returns:
+            clasificación: Lista con las clasificaciones de los reclamos
+        """
+        return self.__predict(X, batch_size, n_process)
     
@@ -0,0 +1,197 @@
+"""
+Cola de clasificación automática de reclamos.
+
+Reclamo.crear guarda el reclamo en la Secretaría Técnica marcado como
+pendiente de clasificación y lo encola; un pool de hilos trabajadores lo
+clasifica después y lo asigna al departamento predicho.
+
+También permite anticipar la clasificación de un texto que todavía no es un
+reclamo (durante la vista previa), para que al confirmarlo no haga falta
+invocar al modelo.
+"""
+
+from __future__ import annotations
+
+import os
+import queue
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+
+from flask import Flask, current_app, has_app_context
+
+
+class ColaClasificacion:
+    """
+    Cola de reclamos a clasificar con un pool de hilos trabajadores.
+
+    La cantidad de hilos se toma de CLASIFICACION_TRABAJADORES en la
+    configuración de la app; con 0 no se inicia ningún hilo y la cola sólo se
+    procesa al llamar a drenar() (lo que usan los tests).
+
+    Los hilos pertenecen al proceso que los inició: en un proceso hijo creado
+    con fork (p. ej. un trabajador de gunicorn --preload) la cola, los hilos y
+    el pool se vuelven a crear en el primer uso.
+    """
+
+    TRABAJADORES_POR_DEFECTO = 2
+    HILOS_ANTICIPACION = 2
+    # Intentos por reclamo antes de dejarlo en la Secretaría Técnica sin clasificar
+    MAX_INTENTOS = 3
+
+    def __init__(self):
+        self.__iniciar_estado()
+
+    def __iniciar_estado(self) -> None:
+        self.__pid = os.getpid()
+        self.__cola: queue.Queue[tuple[Flask, int, int]] = queue.Queue()
+        self.__lock = threading.Lock()
+        self.__hilos: list[threading.Thread] = []
+        self.__pool_anticipacion: ThreadPoolExecutor | None = None
+
+    def __len__(self) -> int:
+        return self.__cola.qsize()
+
+    def encolar(self, reclamo_id: int) -> None:
+        """Encola un reclamo; debe llamarse dentro de un contexto de la app."""
+        app = current_app._get_current_object()
+        self.__verificar_proceso()
+        self.__cola.put((app, reclamo_id, 1))
+        self.__iniciar_trabajadores(app)
+
+    def encolar_pendientes(self) -> int:
+        """Vuelve a encolar los reclamos que quedaron sin clasificar (p. ej. tras un reinicio)."""
+        from modules.reclamo import Reclamo
+
+        ids = Reclamo.obtener_ids_sin_clasificar()
+        for reclamo_id in ids:
+            self.encolar(reclamo_id)
+        return len(ids)
+
+    def anticipar(self, detalle: str) -> Future:
+        """
+        Empieza a clasificar un detalle en otro hilo. El futuro devuelve el id
+        del departamento predicho, o None si el clasificador no respondió a
+        tiempo o falló.
+        """
+        from modules.cortacircuitos import ServicioNoDisponible
+        from modules.reclamo import Reclamo
+
+        app = current_app._get_current_object()
+        self.__verificar_proceso()
+
+        def _clasificar() -> int | None:
+            with app.app_context():
+                try:
+                    return Reclamo._clasificar_departamento(detalle)
+                except ServicioNoDisponible:
+                    return None
+
+        if self.__pool_anticipacion is None:
+            with self.__lock:
+                if self.__pool_anticipacion is None:
+                    self.__pool_anticipacion = ThreadPoolExecutor(
+                        max_workers=self.HILOS_ANTICIPACION, thread_name_prefix="anticipacion"
+                    )
+        return self.__pool_anticipacion.submit(_clasificar)
+
+    def drenar(self) -> int:
+        """Procesa en el hilo actual todo lo encolado y devuelve cuántos reclamos clasificó."""
+        procesados = 0
+        while True:
+            try:
+                app, reclamo_id, intento = self.__cola.get_nowait()
+            except queue.Empty:
+                return procesados
+            try:
+                if self.__ejecutar(app, reclamo_id, intento):
+                    procesados += 1
+            finally:
+                self.__cola.task_done()
+
+    def esperar(self) -> None:
+        """Bloquea hasta que los trabajadores terminen lo encolado."""
+        self.__cola.join()
+
+    def reiniciar(self) -> None:
+        """Descarta lo encolado sin procesarlo."""
+        while True:
+            try:
+                self.__cola.get_nowait()
+            except queue.Empty:
+                return
+            self.__cola.task_done()
+
+    # ── Helpers privados ─────────────────────────────────────────────
+
+    def __verificar_proceso(self) -> None:
+        # Tras un fork los hilos del padre no existen en el hijo, aunque sigan
+        # en la lista, y sus locks pueden haber quedado tomados
+        if os.getpid() != self.__pid:
+            self.__iniciar_estado()
+
+    def __iniciar_trabajadores(self, app: Flask) -> None:
+        cantidad = app.config.get("CLASIFICACION_TRABAJADORES", self.TRABAJADORES_POR_DEFECTO)
+        if len(self.__hilos) >= cantidad:
+            return
+        with self.__lock:
+            while len(self.__hilos) < cantidad:
+                hilo = threading.Thread(
+                    target=self.__trabajar,
+                    name=f"clasificacion-{len(self.__hilos)}",
+                    daemon=True,
+                )
+                hilo.start()
+                self.__hilos.append(hilo)
+
+    def __trabajar(self) -> None:
+        while True:
+            app, reclamo_id, intento = self.__cola.get()
+            try:
+                self.__ejecutar(app, reclamo_id, intento)
+            finally:
+                self.__cola.task_done()
+
+    def __ejecutar(self, app: Flask, reclamo_id: int, intento: int) -> bool:
+        # Un fallo no debe detener al trabajador: se registra y el reclamo se
+        # vuelve a encolar hasta MAX_INTENTOS veces
+        from modules.reclamo import Reclamo
+
+        try:
+            self.__en_contexto(app, Reclamo.aplicar_clasificacion, reclamo_id)
+            return True
+        except Exception:
+            if intento < self.MAX_INTENTOS:
+                app.logger.exception(
+                    "Falló la clasificación del reclamo %s (intento %s de %s); se reintenta",
+                    reclamo_id, intento, self.MAX_INTENTOS,
+                )
+                self.__cola.put((app, reclamo_id, intento + 1))
+                return False
+            app.logger.exception(
+                "Falló la clasificación del reclamo %s tras %s intentos; "
+                "queda en la Secretaría Técnica sin clasificar", reclamo_id, intento,
+            )
+        try:
+            self.__en_contexto(app, Reclamo.descartar_clasificacion, reclamo_id)
+        except Exception:
+            app.logger.exception("No se pudo desmarcar el reclamo %s", reclamo_id)
+        return False
+
+    @staticmethod
+    def __en_contexto(app: Flask, funcion, reclamo_id: int) -> None:
+        from modules.config import db
+
+        if has_app_context() and current_app._get_current_object() is app:
+            try:
+                funcion(reclamo_id)
+            except Exception:
+                # La sesión es la del contexto actual: no debe quedar a medio escribir
+                db.session.rollback()
+                raise
+            return
+        with app.app_context():
+            funcion(reclamo_id)
+
+
+# Instancia global de la cola de clasificación
+cola_clasificacion = ColaClasificacion()
@@ -32,6 +32,16 @@ def create_app(config_overrides: dict | None = None):
     app.config["SQLALCHEMY_TRACK_MODIFICATIONS"] = False
     app.config["SECRET_KEY"] = "another-super-secret-key"
     app.config["MAX_CONTENT_LENGTH"] = 5 * 1024 * 1024  # 5MB max file size
+    # Los reclamos nuevos se clasifican en segundo plano (ver modules/cola_clasificacion.py)
+    app.config["CLASIFICACION_ASINCRONA"] = True
+    app.config["CLASIFICACION_TRABAJADORES"] = 2
+    # Tiempo máximo que un request espera al clasificador (ver modules/cortacircuitos.py)
+    app.config["CLASIFICACION_PRESUPUESTO_SEGUNDOS"] = 2.0
+    # Los gráficos de analíticas se dibujan en un pool de procesos (ver modules/renderizador_graficos.py)
+    app.config["GRAFICOS_PROCESOS"] = 2
+    app.config["GRAFICOS_ESPERA_SEGUNDOS"] = 5.0
+    # Los reportes PDF se generan en segundo plano (ver modules/trabajos_reportes.py)
+    app.config["REPORTES_TRABAJADORES"] = 1
 
     if config_overrides:
         app.config.update(config_overrides)
@@ -0,0 +1,116 @@
+from __future__ import annotations
+
+from sqlalchemy import ForeignKey, delete, func, select
+from sqlalchemy.dialects.sqlite import insert
+from sqlalchemy.orm import Mapped, mapped_column
+
+from modules.config import db
+from modules.reclamo import EstadoReclamo
+
+
+class ConteoReclamos(db.Model):
+    """
+    Cantidad de reclamos por departamento y estado, mantenida junto con cada cambio.
+
+    Las operaciones que crean reclamos o cambian su departamento o su estado
+    llaman a ajustar() antes de su commit, de modo que el contador se actualiza
+    en la misma transacción. verificar() y reconstruir() lo comparan y lo
+    regeneran a partir de la tabla reclamo.
+    """
+
+    __tablename__ = "conteo_reclamos"
+
+    departamento_id: Mapped[int] = mapped_column(ForeignKey("departamento.id"), primary_key=True)
+    estado: Mapped[EstadoReclamo] = mapped_column(primary_key=True)
+    cantidad: Mapped[int] = mapped_column(default=0, nullable=False)
+
+    def __init__(self, departamento_id: int, estado: EstadoReclamo, cantidad: int = 0):
+        self.departamento_id = departamento_id
+        self.estado = estado
+        self.cantidad = cantidad
+
+    def __repr__(self):
+        return f"<ConteoReclamos depto={self.departamento_id} {self.estado.value}={self.cantidad}>"
+
+    @staticmethod
+    def ajustar(departamento_id: int, estado: EstadoReclamo, delta: int) -> None:
+        """Suma delta al contador (departamento, estado). No hace commit."""
+        ConteoReclamos.ajustar_varios({(departamento_id, estado): delta})
+
+    @staticmethod
+    def ajustar_varios(deltas: dict[tuple[int, EstadoReclamo], int]) -> None:
+        """Aplica varios ajustes {(departamento_id, estado): delta}. No hace commit."""
+        filas = [
+            {"departamento_id": departamento_id, "estado": estado, "cantidad": delta}
+            for (departamento_id, estado), delta in deltas.items()
+            if delta != 0
+        ]
+        if not filas:
+            return
+        sentencia = insert(ConteoReclamos).values(filas)
+        db.session.execute(sentencia.on_conflict_do_update(
+            index_elements=[ConteoReclamos.departamento_id, ConteoReclamos.estado],
+            set_={"cantidad": ConteoReclamos.cantidad + sentencia.excluded.cantidad},
+        ))
+
+    @staticmethod
+    def mover(
+        departamento_origen_id: int, estado_origen: EstadoReclamo,
+        departamento_destino_id: int, estado_destino: EstadoReclamo,
+    ) -> None:
+        """Pasa un reclamo de un contador a otro. No hace commit."""
+        if (departamento_origen_id, estado_origen) == (departamento_destino_id, estado_destino):
+            return
+        ConteoReclamos.ajustar_varios({
+            (departamento_origen_id, estado_origen): -1,
+            (departamento_destino_id, estado_destino): 1,
+        })
+
+    @staticmethod
+    def obtener(departamento_ids: list[int] | None = None) -> dict[int, dict[EstadoReclamo, int]]:
+        """Devuelve {departamento_id: {estado: cantidad}} con una sola consulta."""
+        if departamento_ids is not None and len(departamento_ids) == 0:
+            return {}
+        query = select(ConteoReclamos.departamento_id, ConteoReclamos.estado, ConteoReclamos.cantidad)
+        if departamento_ids is not None:
+            query = query.where(ConteoReclamos.departamento_id.in_(departamento_ids))
+        conteos: dict[int, dict[EstadoReclamo, int]] = {}
+        for departamento_id, estado, cantidad in db.session.execute(query):
+            conteos.setdefault(int(departamento_id), {})[estado] = int(cantidad)
+        return conteos
+
+    @staticmethod
+    def verificar() -> list[tuple[int, EstadoReclamo, int, int]]:
+        """Devuelve las diferencias (departamento_id, estado, contador, real)."""
+        reales = ConteoReclamos._contar_reclamos()
+        guardados = {
+            (departamento_id, estado): cantidad
+            for departamento_id, por_estado in ConteoReclamos.obtener().items()
+            for estado, cantidad in por_estado.items()
+        }
+        diferencias = []
+        for departamento_id, estado in set(reales) | set(guardados):
+            guardado = guardados.get((departamento_id, estado), 0)
+            real = reales.get((departamento_id, estado), 0)
+            if guardado != real:
+                diferencias.append((departamento_id, estado, guardado, real))
+        return sorted(diferencias, key=lambda d: (d[0], d[1].name))
+
+    @staticmethod
+    def reconstruir() -> None:
+        """Regenera todos los contadores a partir de la tabla reclamo."""
+        db.session.execute(delete(ConteoReclamos))
+        ConteoReclamos.ajustar_varios(ConteoReclamos._contar_reclamos())
+        db.session.commit()
+
+    # ── Helpers privados ─────────────────────────────────────────────
+
+    @staticmethod
+    def _contar_reclamos() -> dict[tuple[int, EstadoReclamo], int]:
+        from modules.reclamo import Reclamo
+
+        filas = db.session.execute(
+            select(Reclamo.departamento_id, Reclamo.estado, func.count(Reclamo.id))
+            .group_by(Reclamo.departamento_id, Reclamo.estado)
+        )
+        return {(int(departamento_id), estado): int(conteo) for departamento_id, estado, conteo in filas}
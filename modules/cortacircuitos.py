@@ -0,0 +1,158 @@
+"""
+Cortacircuitos con presupuesto de latencia para llamadas costosas (el clasificador).
+"""
+
+from __future__ import annotations
+
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as TiempoAgotado
+from enum import Enum
+from typing import Callable, TypeVar
+
+T = TypeVar("T")
+
+
+class EstadoCortacircuitos(Enum):
+    """Estado de un cortacircuitos"""
+
+    CERRADO = "Cerrado"
+    ABIERTO = "Abierto"
+    SEMIABIERTO = "Semiabierto"
+
+
+class ServicioNoDisponible(Exception):
+    """La llamada fue rechazada por el cortacircuitos o superó el presupuesto de latencia."""
+
+
+class Cortacircuitos:
+    """
+    Ejecuta una función con un tiempo máximo y corta las llamadas tras fallos seguidos.
+
+    Tras `umbral_fallos` fallos consecutivos (errores o tiempos agotados) el
+    cortacircuitos se abre y rechaza las llamadas durante `espera_reapertura`
+    segundos. Pasado ese tiempo deja pasar una llamada de prueba: si funciona
+    se cierra, si falla vuelve a abrirse.
+
+    La función se ejecuta en un pool de hilos para poder dejar de esperarla; una
+    llamada que agota el presupuesto sigue corriendo hasta terminar, pero su
+    resultado se descarta.
+    """
+
+    UMBRAL_FALLOS = 3
+    ESPERA_REAPERTURA = 30.0
+    MAX_HILOS = 4
+
+    def __init__(
+        self,
+        nombre: str,
+        umbral_fallos: int = UMBRAL_FALLOS,
+        espera_reapertura: float = ESPERA_REAPERTURA,
+    ):
+        self.nombre = nombre
+        self.umbral_fallos = umbral_fallos
+        self.espera_reapertura = espera_reapertura
+        self.__lock = threading.Lock()
+        self.__pool: ThreadPoolExecutor | None = None
+        self.reiniciar()
+
+    @property
+    def estado(self) -> EstadoCortacircuitos:
+        with self.__lock:
+            return self.__estado_actual()
+
+    def reiniciar(self) -> None:
+        """Vuelve al estado cerrado y pone los contadores en cero."""
+        with self.__lock:
+            self.__estado = EstadoCortacircuitos.CERRADO
+            self.__abierto_desde = 0.0
+            self.__prueba_en_curso = False
+            self.__fallos_consecutivos = 0
+            self.__contadores = {
+                "exitos": 0, "errores": 0, "tiempos_agotados": 0, "rechazos": 0, "aperturas": 0,
+            }
+
+    def ejecutar(self, funcion: Callable[..., T], *args, presupuesto: float | None = None) -> T:
+        """
+        Ejecuta funcion(*args) esperando como máximo `presupuesto` segundos.
+        Lanza ServicioNoDisponible si el cortacircuitos está abierto o se agota
+        el tiempo; los errores de la función se propagan tal cual.
+        """
+        with self.__lock:
+            estado = self.__estado_actual()
+            if estado == EstadoCortacircuitos.ABIERTO or (
+                estado == EstadoCortacircuitos.SEMIABIERTO and self.__prueba_en_curso
+            ):
+                self.__contadores["rechazos"] += 1
+                raise ServicioNoDisponible(f"{self.nombre}: cortacircuitos abierto")
+            if estado == EstadoCortacircuitos.SEMIABIERTO:
+                self.__prueba_en_curso = True
+
+        try:
+            if presupuesto is None:
+                resultado = funcion(*args)
+            else:
+                resultado = self.__obtener_pool().submit(funcion, *args).result(timeout=presupuesto)
+        except TiempoAgotado:
+            self.__registrar_fallo("tiempos_agotados")
+            raise ServicioNoDisponible(
+                f"{self.nombre}: se superó el presupuesto de {presupuesto:.2f} s"
+            ) from None
+        except Exception:
+            self.__registrar_fallo("errores")
+            raise
+
+        with self.__lock:
+            self.__contadores["exitos"] += 1
+            self.__fallos_consecutivos = 0
+            self.__prueba_en_curso = False
+            self.__estado = EstadoCortacircuitos.CERRADO
+        return resultado
+
+    def estadisticas(self) -> dict:
+        with self.__lock:
+            estado = self.__estado_actual()
+            return {
+                "nombre": self.nombre,
+                "estado": estado.value,
+                "fallos_consecutivos": self.__fallos_consecutivos,
+                "segundos_para_reintentar": (
+                    max(0.0, self.__abierto_desde + self.espera_reapertura - time.monotonic())
+                    if estado == EstadoCortacircuitos.ABIERTO else 0.0
+                ),
+                **self.__contadores,
+            }
+
+    # ── Helpers privados ─────────────────────────────────────────────
+
+    def __estado_actual(self) -> EstadoCortacircuitos:
+        if (
+            self.__estado == EstadoCortacircuitos.ABIERTO
+            and time.monotonic() - self.__abierto_desde >= self.espera_reapertura
+        ):
+            self.__estado = EstadoCortacircuitos.SEMIABIERTO
+            self.__prueba_en_curso = False
+        return self.__estado
+
+    def __registrar_fallo(self, contador: str) -> None:
+        with self.__lock:
+            self.__contadores[contador] += 1
+            self.__fallos_consecutivos += 1
+            self.__prueba_en_curso = False
+            if (
+                self.__estado == EstadoCortacircuitos.SEMIABIERTO
+                or self.__fallos_consecutivos >= self.umbral_fallos
+            ):
+                if self.__estado != EstadoCortacircuitos.ABIERTO:
+                    self.__contadores["aperturas"] += 1
+                self.__estado = EstadoCortacircuitos.ABIERTO
+                self.__abierto_desde = time.monotonic()
+
+    def __obtener_pool(self) -> ThreadPoolExecutor:
+        if self.__pool is None:
+            with self.__lock:
+                if self.__pool is None:
+                    self.__pool = ThreadPoolExecutor(
+                        max_workers=self.MAX_HILOS, thread_name_prefix=f"cortacircuitos-{self.nombre}"
+                    )
+        return self.__pool
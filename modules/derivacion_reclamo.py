@@ -84,10 +84,21 @@ class DerivacionReclamo(db.Model):
         )
 
         reclamo.departamento_id = departamento_destino_id
+        from modules.conteo_reclamos import ConteoReclamos
+        from modules.frecuencia_palabra import FrecuenciaPalabra
+        from modules.metrica_resolucion import MetricaResolucion
+        ConteoReclamos.mover(departamento_origen_id, reclamo.estado, departamento_destino_id, reclamo.estado)
+        FrecuenciaPalabra.mover(reclamo.detalle, departamento_origen_id, departamento_destino_id)
+        MetricaResolucion.mover([reclamo.id], {departamento_origen_id, departamento_destino_id})
+        # Una derivación manual reemplaza a la clasificación automática en espera
+        reclamo.clasificacion_pendiente = False
 
         db.session.add(derivacion)
         db.session.commit()
 
+        from modules.similitud import buscador_similitud
+        buscador_similitud.sincronizar_reclamo(reclamo, departamento_anterior_id=departamento_origen_id)
+
         return derivacion, None
 
     @staticmethod
@@ -0,0 +1,159 @@
+from __future__ import annotations
+
+from collections import Counter
+
+from sqlalchemy import ForeignKey, Index, delete, func, literal_column, select, text
+from sqlalchemy.dialects.sqlite import insert
+from sqlalchemy.orm import Mapped, mapped_column
+
+from modules.config import db
+from modules.utils.texto import extraer_palabras_clave
+
+
+class FrecuenciaPalabra(db.Model):
+    """
+    Cantidad de apariciones de una palabra clave en los reclamos de un departamento.
+
+    Se actualiza al crear un reclamo y al cambiarlo de departamento, en la
+    misma transacción. Las filas con departamento_id NULL llevan el total de
+    todos los departamentos y se ajustan en el mismo upsert, así que las
+    palabras más frecuentes salen de recorrer un índice, sin agrupar la tabla.
+    Las filas que llegan a cero se borran.
+    """
+
+    __tablename__ = "frecuencia_palabra"
+    __table_args__ = (
+        # Un NULL no choca con otro NULL en un índice único: el total general
+        # se identifica con departamento_id 0 sólo dentro del índice
+        Index(
+            "ux_frecuencia_palabra_departamento_palabra",
+            func.ifnull(text("departamento_id"), literal_column("0")), "palabra", unique=True,
+        ),
+        Index("ix_frecuencia_palabra_departamento_cantidad", "departamento_id", "cantidad"),
+    )
+
+    # Filas por sentencia INSERT, por debajo del límite de parámetros de SQLite
+    FILAS_POR_SENTENCIA = 500
+
+    id: Mapped[int] = mapped_column(primary_key=True)
+    # NULL: total de todos los departamentos
+    departamento_id: Mapped[int | None] = mapped_column(ForeignKey("departamento.id"), nullable=True)
+    palabra: Mapped[str] = mapped_column(nullable=False)
+    cantidad: Mapped[int] = mapped_column(default=0, nullable=False)
+
+    def __init__(self, departamento_id: int | None, palabra: str, cantidad: int = 0):
+        self.departamento_id = departamento_id
+        self.palabra = palabra
+        self.cantidad = cantidad
+
+    def __repr__(self):
+        return f"<FrecuenciaPalabra depto={self.departamento_id} {self.palabra}={self.cantidad}>"
+
+    @staticmethod
+    def registrar(detalle: str, departamento_id: int) -> None:
+        """Suma las palabras de un reclamo nuevo. No hace commit."""
+        FrecuenciaPalabra.ajustar_varios({
+            (departamento_id, palabra): cantidad
+            for palabra, cantidad in Counter(extraer_palabras_clave(detalle)).items()
+        })
+
+    @staticmethod
+    def mover(detalle: str, departamento_origen_id: int, departamento_destino_id: int) -> None:
+        """Pasa las palabras de un reclamo a otro departamento. No hace commit."""
+        if departamento_origen_id == departamento_destino_id:
+            return
+        deltas = {}
+        for palabra, cantidad in Counter(extraer_palabras_clave(detalle)).items():
+            deltas[(departamento_origen_id, palabra)] = -cantidad
+            deltas[(departamento_destino_id, palabra)] = cantidad
+        FrecuenciaPalabra.ajustar_varios(deltas)
+
+    @staticmethod
+    def ajustar_varios(deltas: dict[tuple[int, str], int]) -> None:
+        """
+        Aplica ajustes {(departamento_id, palabra): delta} y los suma al total
+        general. Borra las filas que quedan en cero. No hace commit.
+        """
+        totales: Counter = Counter()
+        for (_, palabra), delta in deltas.items():
+            totales[palabra] += delta
+        filas = [
+            {"departamento_id": departamento_id, "palabra": palabra, "cantidad": delta}
+            for (departamento_id, palabra), delta in deltas.items()
+            if delta != 0
+        ] + [
+            {"departamento_id": None, "palabra": palabra, "cantidad": delta}
+            for palabra, delta in totales.items()
+            if delta != 0
+        ]
+        agotadas = []
+        for inicio in range(0, len(filas), FrecuenciaPalabra.FILAS_POR_SENTENCIA):
+            sentencia = insert(FrecuenciaPalabra).values(
+                filas[inicio:inicio + FrecuenciaPalabra.FILAS_POR_SENTENCIA]
+            )
+            sentencia = sentencia.on_conflict_do_update(
+                index_elements=[
+                    func.ifnull(FrecuenciaPalabra.departamento_id, literal_column("0")), FrecuenciaPalabra.palabra,
+                ],
+                set_={"cantidad": FrecuenciaPalabra.cantidad + sentencia.excluded.cantidad},
+            ).returning(FrecuenciaPalabra.id, FrecuenciaPalabra.cantidad)
+            agotadas.extend(
+                fila_id for fila_id, cantidad in db.session.execute(sentencia) if cantidad <= 0
+            )
+        if agotadas:
+            db.session.execute(delete(FrecuenciaPalabra).where(FrecuenciaPalabra.id.in_(agotadas)))
+
+    @staticmethod
+    def obtener_mas_frecuentes(
+        departamento_ids: list[int] | None = None, top_n: int = 20
+    ) -> dict[str, int]:
+        """Devuelve {palabra: cantidad} con las top_n palabras de los departamentos indicados."""
+        from modules.departamento import Departamento
+
+        if departamento_ids is not None and len(departamento_ids) == 0:
+            return {}
+        if departamento_ids is not None and len(departamento_ids) > 1:
+            todos = set(db.session.scalars(select(Departamento.id)))
+            if todos <= set(departamento_ids):
+                departamento_ids = None
+        if departamento_ids is None or len(departamento_ids) == 1:
+            # Un departamento o el total general: se recorre el índice (departamento_id, cantidad)
+            filtro_departamento = (
+                FrecuenciaPalabra.departamento_id.is_(None) if departamento_ids is None
+                else FrecuenciaPalabra.departamento_id == departamento_ids[0]
+            )
+            query = (
+                select(FrecuenciaPalabra.palabra, FrecuenciaPalabra.cantidad)
+                .where(filtro_departamento, FrecuenciaPalabra.cantidad > 0)
+                .order_by(FrecuenciaPalabra.cantidad.desc(), FrecuenciaPalabra.palabra)
+            )
+        else:
+            # Algunos departamentos: se agrupan sólo sus filas
+            total = func.sum(FrecuenciaPalabra.cantidad).label("total")
+            query = (
+                select(FrecuenciaPalabra.palabra, total)
+                .where(FrecuenciaPalabra.departamento_id.in_(departamento_ids))
+                .group_by(FrecuenciaPalabra.palabra)
+                .having(total > 0)
+                .order_by(total.desc(), FrecuenciaPalabra.palabra)
+            )
+        return {palabra: int(cantidad) for palabra, cantidad in db.session.execute(query.limit(top_n))}
+
+    @staticmethod
+    def reconstruir(tamano_bloque: int = 1000) -> None:
+        """Regenera la tabla a partir de los reclamos, leyéndolos por bloques."""
+        from modules.reclamo import Reclamo
+
+        # Se recrea la tabla por si la base es anterior al total general
+        conexion = db.session.connection()
+        FrecuenciaPalabra.__table__.drop(conexion, checkfirst=True)
+        FrecuenciaPalabra.__table__.create(conexion)
+        conteos: Counter = Counter()
+        filas = db.session.execute(
+            select(Reclamo.departamento_id, Reclamo.detalle).execution_options(yield_per=tamano_bloque)
+        )
+        for departamento_id, detalle in filas:
+            for palabra in extraer_palabras_clave(detalle):
+                conteos[(departamento_id, palabra)] += 1
+        FrecuenciaPalabra.ajustar_varios(dict(conteos))
+        db.session.commit()
@@ -3,20 +3,16 @@
 from __future__ import annotations
 
 import base64
+import importlib.util
 import io
-import re
-from collections import Counter
+from datetime import date as Date, timedelta
 from typing import TYPE_CHECKING
 
-import matplotlib
-
-matplotlib.use("Agg")
-import matplotlib.pyplot as plt
-
-from modules.config import db
+from modules.actividad_diaria import ActividadDiaria
+from modules.cache_graficos import cache_graficos
+from modules.frecuencia_palabra import FrecuenciaPalabra
+from modules.metrica_resolucion import MetricaResolucion
 from modules.reclamo import Reclamo, EstadoReclamo
-from modules.utils.constantes import STOPWORDS_ESPANOL_SET
-from modules.utils.texto import normalizar_texto
 
 if TYPE_CHECKING:
     from modules.departamento import Departamento
@@ -39,6 +35,39 @@ class GeneradorAnaliticas:
         EstadoReclamo.INVALIDO: "Inválido",
     }
 
+    # Parámetros de renderizado; forman parte de la clave del cache de gráficos
+    PARAMETROS_TORTA = {"figsize": (8, 6), "dpi": 100, "colores": COLORES_ESTADO}
+    PARAMETROS_NUBE = {
+        "width": 800,
+        "height": 400,
+        "background_color": "white",
+        "colormap": "viridis",
+        "max_words": 50,
+        "min_font_size": 10,
+        "prefer_horizontal": 0.7,
+    }
+    PARAMETROS_ACTIVIDAD = {
+        "figsize": (10, 4),
+        "dpi": 100,
+        "series": {"creados": "#17a2b8", "resueltos": "#28a745", "invalidados": "#dc3545"},
+    }
+
+    # Días que muestra la tendencia si no se indica un rango
+    DIAS_TENDENCIA = 30
+
+    # Formatos en los que se sirven los gráficos: {formato: tipo MIME}
+    FORMATOS_GRAFICO = {"png": "image/png", "svg": "image/svg+xml"}
+
+    @staticmethod
+    def _pyplot():
+        """Importa matplotlib (backend sin ventana) recién cuando se genera un gráfico."""
+        import matplotlib
+
+        matplotlib.use("Agg")
+        import matplotlib.pyplot as plt
+
+        return plt
+
     @staticmethod
     def obtener_estadisticas_reclamos(departamentos: list["Departamento"] | None = None) -> dict:
         conteos_crudos = Reclamo.obtener_conteo_estados(departamentos=departamentos)
@@ -73,48 +102,140 @@ class GeneradorAnaliticas:
     def obtener_frecuencias_palabras(
         departamentos: list["Departamento"] | None = None, top_n: int = 20
     ) -> dict[str, int]:
-        query = db.session.query(Reclamo.detalle)
+        # Las frecuencias por departamento se mantienen en frecuencia_palabra
+        ids = [d.id for d in departamentos] if departamentos is not None else None
+        return FrecuenciaPalabra.obtener_mas_frecuentes(ids, top_n=top_n)
 
-        if departamentos is not None:
-            if len(departamentos) == 0:
-                return {}
-            ids = [d.id for d in departamentos]
-            query = query.filter(Reclamo.departamento_id.in_(ids))
+    @staticmethod
+    def obtener_tendencia(
+        departamentos: list["Departamento"] | None = None,
+        desde: Date | None = None,
+        hasta: Date | None = None,
+        agrupar: str = "dia",
+    ) -> list[dict]:
+        """
+        Reclamos creados, resueltos e invalidados por día o semana, leídos de
+        actividad_diaria. Por defecto, los últimos DIAS_TENDENCIA días.
+        """
+        hasta = hasta or Date.today()
+        desde = desde or hasta - timedelta(days=GeneradorAnaliticas.DIAS_TENDENCIA - 1)
+        ids = [d.id for d in departamentos] if departamentos is not None else None
+        return ActividadDiaria.obtener_serie(ids, desde, hasta, agrupar)
 
-        detalles = [fila[0] for fila in query.all()]
+    @staticmethod
+    def obtener_metricas_resolucion(departamentos: list["Departamento"] | None = None) -> list[dict]:
+        """
+        Mediana y p90 (en horas) del tiempo de resolución y del tiempo en cada
+        estado, por departamento. Lee la tabla precalculada metrica_resolucion.
+        """
+        from modules.departamento import Departamento
+
+        if departamentos is None:
+            departamentos = Departamento.obtener_todos()
+        metricas = MetricaResolucion.obtener([d.id for d in departamentos])
+        return [
+            {
+                "departamento": departamento.nombre_mostrar,
+                **{
+                    metrica: metricas.get(departamento.id, {}).get(metrica)
+                    for metrica in MetricaResolucion.METRICAS
+                },
+            }
+            for departamento in departamentos
+            if departamento.id in metricas
+        ]
 
-        if not detalles:
-            return {}
+    # ── Gráficos ─────────────────────────────────────────────────────
 
-        todas_palabras: list[str] = []
-        for detalle in detalles:
-            normalizado = normalizar_texto(detalle)
-            palabras = re.findall(r"\b\w+\b", normalizado)
-            filtradas = [
-                p
-                for p in palabras
-                if p not in STOPWORDS_ESPANOL_SET and len(p) > 2 and not p.isdigit()
-            ]
-            todas_palabras.extend(filtradas)
+    @staticmethod
+    def obtener_datos_grafico(
+        tipo: str, departamentos: list["Departamento"] | None = None, **rango
+    ) -> dict:
+        """
+        Datos de entrada del gráfico "torta" (estados), "nube" (palabras clave)
+        o "actividad" (tendencia; acepta desde, hasta y agrupar).
+        """
+        if tipo == "torta":
+            return GeneradorAnaliticas.obtener_estadisticas_reclamos(departamentos)["conteos_estado"]
+        if tipo == "nube":
+            return GeneradorAnaliticas.obtener_frecuencias_palabras(departamentos)
+        if tipo == "actividad":
+            serie = GeneradorAnaliticas.obtener_tendencia(departamentos, **rango)
+            return {
+                "fechas": [periodo["fecha"].isoformat() for periodo in serie],
+                **{
+                    columna: [periodo[columna] for periodo in serie]
+                    for columna in GeneradorAnaliticas.PARAMETROS_ACTIVIDAD["series"]
+                },
+            }
+        raise ValueError(f"Tipo de gráfico desconocido: {tipo}")
 
-        if not todas_palabras:
-            return {}
+    @staticmethod
+    def huella_grafico(tipo: str, datos: dict, formato: str = "png") -> str:
+        """Huella de los datos y parámetros del gráfico; sirve de ETag y de clave de cache."""
+        return cache_graficos.clave(
+            tipo, GeneradorAnaliticas._datos_validos(tipo, datos),
+            GeneradorAnaliticas._parametros_grafico(tipo, formato),
+        )
+
+    @staticmethod
+    def renderizar_grafico(tipo: str, datos: dict, formato: str = "png") -> bytes | None:
+        """Imagen del gráfico en el formato pedido, tomada del cache si ya se había dibujado."""
+        datos = GeneradorAnaliticas._datos_validos(tipo, datos)
+        if not datos:
+            return None
+        return cache_graficos.obtener_o_generar(
+            tipo, datos, GeneradorAnaliticas._parametros_grafico(tipo, formato),
+            lambda: GeneradorAnaliticas.dibujar_grafico(tipo, datos, formato),
+        )
 
-        conteo_palabras = Counter(todas_palabras).most_common(top_n)
-        return dict(conteo_palabras)
+    @staticmethod
+    def dibujar_grafico(tipo: str, datos: dict, formato: str = "png") -> bytes | None:
+        """Dibuja el gráfico sin pasar por el cache (lo usa el pool de modules/renderizador_graficos.py)."""
+        datos = GeneradorAnaliticas._datos_validos(tipo, datos)
+        if not datos:
+            return None
+        if tipo == "torta":
+            return GeneradorAnaliticas._renderizar_torta(datos, formato)
+        if tipo == "actividad":
+            return GeneradorAnaliticas._renderizar_actividad(datos, formato)
+        return GeneradorAnaliticas._renderizar_nube(datos, formato)
 
     @staticmethod
     def generar_grafico_torta(conteos_estado: dict[str, int]) -> str | None:
-        if not conteos_estado:
+        imagen = GeneradorAnaliticas.renderizar_grafico("torta", conteos_estado or {})
+        if imagen is None:
             return None
+        return base64.b64encode(imagen).decode("utf-8")
 
-        stats_filtradas = {k: v for k, v in conteos_estado.items() if v > 0}
-        if not stats_filtradas:
-            return None
+    @staticmethod
+    def _datos_validos(tipo: str, datos: dict) -> dict:
+        """Descarta los valores en cero; {} si no queda nada para dibujar."""
+        if tipo == "actividad":
+            series = GeneradorAnaliticas.PARAMETROS_ACTIVIDAD["series"]
+            hay_actividad = any(any(datos.get(columna, [])) for columna in series)
+            return datos if hay_actividad else {}
+        return {k: v for k, v in datos.items() if v > 0}
+
+    @staticmethod
+    def _parametros_grafico(tipo: str, formato: str) -> dict:
+        if formato not in GeneradorAnaliticas.FORMATOS_GRAFICO:
+            raise ValueError(f"Formato de gráfico desconocido: {formato}")
+        if tipo == "torta":
+            return {**GeneradorAnaliticas.PARAMETROS_TORTA, "formato": formato}
+        if tipo == "nube":
+            return {**GeneradorAnaliticas.PARAMETROS_NUBE, "formato": formato}
+        if tipo == "actividad":
+            return {**GeneradorAnaliticas.PARAMETROS_ACTIVIDAD, "formato": formato}
+        raise ValueError(f"Tipo de gráfico desconocido: {tipo}")
 
-        fig, ax = plt.subplots(figsize=(8, 6))
+    @staticmethod
+    def _renderizar_torta(stats_filtradas: dict[str, int], formato: str = "png") -> bytes:
+        parametros = GeneradorAnaliticas.PARAMETROS_TORTA
+        plt = GeneradorAnaliticas._pyplot()
+        fig, ax = plt.subplots(figsize=parametros["figsize"])
         colores = [
-            GeneradorAnaliticas.COLORES_ESTADO.get(k, "#6c757d")
+            parametros["colores"].get(k, "#6c757d")
             for k in stats_filtradas.keys()
         ]
 
@@ -138,52 +259,97 @@ class GeneradorAnaliticas:
 
         buffer = io.BytesIO()
         plt.savefig(
-            buffer, format="png", dpi=100, bbox_inches="tight", facecolor="white"
+            buffer, format=formato, dpi=parametros["dpi"], bbox_inches="tight", facecolor="white"
         )
         plt.close(fig)
-        buffer.seek(0)
 
-        return base64.b64encode(buffer.getvalue()).decode("utf-8")
+        return buffer.getvalue()
+
+    @staticmethod
+    def _renderizar_actividad(datos: dict, formato: str = "png") -> bytes:
+        parametros = GeneradorAnaliticas.PARAMETROS_ACTIVIDAD
+        plt = GeneradorAnaliticas._pyplot()
+        fig, ax = plt.subplots(figsize=parametros["figsize"])
+        fechas = [Date.fromisoformat(f) for f in datos["fechas"]]
+
+        for columna, color in parametros["series"].items():
+            ax.plot(fechas, datos[columna], label=columna.capitalize(), color=color, marker="o", markersize=3)
+
+        ax.set_title("Actividad de Reclamos", fontsize=14, fontweight="bold")
+        ax.set_ylim(bottom=0)
+        ax.yaxis.get_major_locator().set_params(integer=True)
+        ax.grid(axis="y", alpha=0.3)
+        ax.legend()
+        fig.autofmt_xdate()
+        plt.tight_layout()
+
+        buffer = io.BytesIO()
+        plt.savefig(
+            buffer, format=formato, dpi=parametros["dpi"], bbox_inches="tight", facecolor="white"
+        )
+        plt.close(fig)
+
+        return buffer.getvalue()
 
     @staticmethod
     def generar_nube_palabras(frecuencias_palabras: dict[str, int]) -> str | None:
-        if not frecuencias_palabras:
+        imagen = GeneradorAnaliticas.renderizar_grafico("nube", frecuencias_palabras or {})
+        if imagen is None:
             return None
+        return base64.b64encode(imagen).decode("utf-8")
 
+    @staticmethod
+    def nube_palabras_disponible() -> bool:
+        return importlib.util.find_spec("wordcloud") is not None
+
+    @staticmethod
+    def _renderizar_nube(frecuencias_palabras: dict[str, int], formato: str = "png") -> bytes | None:
         try:
             from wordcloud import WordCloud
         except ImportError:
             return None
 
-        nube = WordCloud(
-            width=800,
-            height=400,
-            background_color="white",
-            colormap="viridis",
-            max_words=50,
-            min_font_size=10,
-            prefer_horizontal=0.7,
-        ).generate_from_frequencies(frecuencias_palabras)
+        nube = WordCloud(**GeneradorAnaliticas.PARAMETROS_NUBE).generate_from_frequencies(
+            frecuencias_palabras
+        )
+        if formato == "svg":
+            return nube.to_svg().encode("utf-8")
 
         buffer = io.BytesIO()
         nube.to_image().save(buffer, format="PNG")
-        buffer.seek(0)
 
-        return base64.b64encode(buffer.getvalue()).decode("utf-8")
+        return buffer.getvalue()
 
     @staticmethod
     def obtener_analiticas_completas(departamentos: list["Departamento"] | None = None) -> dict:
+        """
+        Estadísticas y palabras clave, más la huella de cada gráfico. Los gráficos
+        no se dibujan acá: la página los pide aparte, usando la huella como versión.
+        """
         estadisticas = GeneradorAnaliticas.obtener_estadisticas_reclamos(departamentos)
         palabras_clave = GeneradorAnaliticas.obtener_frecuencias_palabras(departamentos)
 
-        grafico_torta = GeneradorAnaliticas.generar_grafico_torta(
-            estadisticas.get("conteos_estado", {})
+        conteos_estado = estadisticas.get("conteos_estado", {})
+        huella_torta = (
+            GeneradorAnaliticas.huella_grafico("torta", conteos_estado, "svg")
+            if conteos_estado else None
+        )
+        huella_nube = (
+            GeneradorAnaliticas.huella_grafico("nube", palabras_clave, "png")
+            if palabras_clave and GeneradorAnaliticas.nube_palabras_disponible() else None
+        )
+        datos_actividad = GeneradorAnaliticas.obtener_datos_grafico("actividad", departamentos)
+        huella_actividad = (
+            GeneradorAnaliticas.huella_grafico("actividad", datos_actividad, "svg")
+            if GeneradorAnaliticas._datos_validos("actividad", datos_actividad) else None
         )
-        nube_palabras = GeneradorAnaliticas.generar_nube_palabras(palabras_clave)
 
         return {
             "estadisticas": estadisticas,
-            "grafico_torta": grafico_torta,
-            "nube_palabras": nube_palabras,
+            "huella_torta": huella_torta,
+            "huella_nube": huella_nube,
+            "actividad": datos_actividad,
+            "metricas_resolucion": GeneradorAnaliticas.obtener_metricas_resolucion(departamentos),
+            "huella_actividad": huella_actividad,
             "palabras_clave": palabras_clave,
         }
@@ -4,9 +4,10 @@ from __future__ import annotations
 
 from abc import ABC, abstractmethod
 from datetime import datetime
-from typing import TYPE_CHECKING
+from typing import TYPE_CHECKING, Iterator
 
-from flask import render_template
+from flask import stream_template
+from sqlalchemy import Row
 
 from modules.reclamo import Reclamo
 from modules.departamento import Departamento
@@ -24,8 +25,8 @@ class Reporte(ABC):
         self.departamentos = departamentos
         self.es_secretario_tecnico = es_secretario_tecnico
 
-    def _obtener_reclamos(self) -> list[Reclamo]:
-        return Reclamo.obtener_por_departamentos(self.departamentos)
+    def _obtener_reclamos(self) -> Iterator[Row]:
+        return Reclamo.iterar_para_reporte(self.departamentos)
 
     def _obtener_estadisticas(self) -> dict:
         return GeneradorAnaliticas.obtener_estadisticas_reclamos(self.departamentos)
@@ -36,7 +37,19 @@ class Reporte(ABC):
 
 
 class ReporteHTML(Reporte):
+    # Caracteres acumulados antes de entregar cada fragmento del reporte
+    TAMANO_FRAGMENTO = 16 * 1024
+
     def generar(self) -> str:
+        return "".join(self.generar_stream())
+
+    def generar_stream(self) -> Iterator[str]:
+        """
+        Genera el reporte por partes: los reclamos se leen por bloques y la
+        plantilla se renderiza a medida que se recorren, de modo que la memoria
+        no crece con la cantidad de reclamos. Para devolverlo en una respuesta
+        hay que envolverlo con stream_with_context.
+        """
         estadisticas = self._obtener_estadisticas()
         # Adaptar claves para template
         stats_template = {
@@ -44,19 +57,42 @@ class ReporteHTML(Reporte):
             "status_counts": estadisticas.get("conteos_estado", {}),
             "status_percentages": estadisticas.get("porcentajes_estado", {}),
         }
-        return render_template(
+        fragmentos = stream_template(
             "reports/department_report.html",
             departments=self.departamentos,
             claims=self._obtener_reclamos(),
+            claims_count=stats_template["total_claims"],
             stats=stats_template,
             is_technical_secretary=self.es_secretario_tecnico,
             generated_at=datetime.now(),
             pdf_css=CSS_PDF,
         )
+        buffer: list[str] = []
+        tamano = 0
+        for fragmento in fragmentos:
+            buffer.append(fragmento)
+            tamano += len(fragmento)
+            if tamano >= self.TAMANO_FRAGMENTO:
+                yield "".join(buffer)
+                buffer, tamano = [], 0
+        if buffer:
+            yield "".join(buffer)
 
 
 class ReportePDF(Reporte):
     def generar(self) -> bytes | None:
+        try:
+            contenido_html = ReporteHTML(self.departamentos, self.es_secretario_tecnico).generar()
+        except Exception:
+            return None
+        return ReportePDF.convertir_html(contenido_html)
+
+    @staticmethod
+    def convertir_html(contenido_html: str) -> bytes | None:
+        """
+        Convierte a PDF el HTML de un reporte. No usa la app ni la base, así
+        que puede correr en otro proceso (ver modules/trabajos_reportes.py).
+        """
         try:
             from io import BytesIO
             from xhtml2pdf import pisa
@@ -64,9 +100,6 @@ class ReportePDF(Reporte):
             return None
 
         try:
-            reporte_html = ReporteHTML(self.departamentos, self.es_secretario_tecnico)
-            contenido_html = reporte_html.generar()
-
             buffer_pdf = BytesIO()
             estado_pisa = pisa.CreatePDF(src=contenido_html, dest=buffer_pdf)
 
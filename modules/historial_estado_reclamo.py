@@ -24,7 +24,7 @@ class HistorialEstadoReclamo(db.Model):
     cambiado_en: Mapped[Datetime] = mapped_column(default=Datetime.now)
 
     # Claves Foráneas
-    reclamo_id: Mapped[int] = mapped_column(ForeignKey("reclamo.id"), nullable=False)
+    reclamo_id: Mapped[int] = mapped_column(ForeignKey("reclamo.id"), nullable=False, index=True)
     cambiado_por_id: Mapped[int] = mapped_column(ForeignKey("usuario.id"), nullable=False)
 
     # Relaciones
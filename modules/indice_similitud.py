@@ -0,0 +1,289 @@
+"""
+Índice TF-IDF en memoria de los reclamos pendientes de un departamento, y el
+vocabulario que comparten los índices de todos los departamentos.
+"""
+
+from __future__ import annotations
+
+import heapq
+import threading
+from typing import TYPE_CHECKING
+
+from modules.utils.constantes import STOPWORDS_ESPANOL
+from modules.utils.texto import normalizar_texto
+
+if TYPE_CHECKING:
+    from sklearn.feature_extraction.text import TfidfVectorizer
+
+
+class IndiceSimilitud:
+    """
+    Índice invertido TF-IDF persistente que se actualiza de forma incremental.
+
+    Cada término apunta a su lista de reclamos con el peso TF-IDF (filas
+    normalizadas L2), de modo que una consulta sólo puntúa los reclamos que
+    comparten algún término con el texto buscado.
+
+    El vocabulario y los pesos IDF se ajustan al construir el índice; los
+    reclamos agregados después se vectorizan con ese ajuste. Cuando las
+    altas acumuladas superan PROPORCION_REAJUSTE del corpus ajustado, el
+    vectorizador se vuelve a ajustar en la siguiente consulta.
+
+    Con un VocabularioSimilitud el índice no ajusta su propio vectorizador:
+    usa el del vocabulario y vuelve a vectorizar sus textos cuando este cambia
+    de versión.
+    """
+
+    PROPORCION_REAJUSTE = 0.5
+
+    def __init__(self, vocabulario: VocabularioSimilitud | None = None):
+        self.__lock = threading.RLock()
+        self.__vocabulario = vocabulario
+        self.__version_vocabulario = 0
+        self.__vectorizador: "TfidfVectorizer | None" = None
+        self.__textos: dict[int, str] = {}
+        # término -> {reclamo_id: peso}
+        self.__postings: dict[int, dict[int, float]] = {}
+        # término -> peso máximo visto (cota superior para la poda)
+        self.__peso_maximo: dict[int, float] = {}
+        # reclamo_id -> términos indexados, para poder quitarlo
+        self.__terminos: dict[int, list[int]] = {}
+        self.__altas_desde_ajuste = 0
+        self.__tamano_ajuste = 0
+        self.__construido = False
+
+    @staticmethod
+    def _crear_vectorizador() -> "TfidfVectorizer":
+        from sklearn.feature_extraction.text import TfidfVectorizer
+
+        return TfidfVectorizer(
+            stop_words=STOPWORDS_ESPANOL,
+            min_df=1,
+            ngram_range=(1, 2),
+            max_features=1000,
+            preprocessor=normalizar_texto,
+        )
+
+    @property
+    def construido(self) -> bool:
+        return self.__construido
+
+    def __len__(self) -> int:
+        return len(self.__textos)
+
+    def __contains__(self, reclamo_id: int) -> bool:
+        return reclamo_id in self.__textos
+
+    def construir(self, reclamos: list[tuple[int, str]]) -> None:
+        """Construye el índice a partir de tuplas (id, detalle)."""
+        with self.__lock:
+            self.__textos = dict(reclamos)
+            self.__reajustar()
+            self.__construido = True
+
+    def reiniciar(self) -> None:
+        """Descarta el contenido; el índice se reconstruirá en el próximo uso."""
+        with self.__lock:
+            self.__vectorizador = None
+            self.__version_vocabulario = 0
+            self.__textos = {}
+            self.__postings = {}
+            self.__peso_maximo = {}
+            self.__terminos = {}
+            self.__altas_desde_ajuste = 0
+            self.__tamano_ajuste = 0
+            self.__construido = False
+
+    def agregar(self, reclamo_id: int, detalle: str) -> None:
+        with self.__lock:
+            if self.__textos.get(reclamo_id) == detalle:
+                return
+            self.__quitar_postings(reclamo_id)
+            self.__textos[reclamo_id] = detalle
+            self.__altas_desde_ajuste += 1
+            if self.__vectorizador is not None:
+                fila = self.__vectorizador.transform([detalle])
+                self.__indexar(reclamo_id, fila.indices, fila.data)
+
+    def quitar(self, reclamo_id: int) -> None:
+        with self.__lock:
+            if self.__textos.pop(reclamo_id, None) is None:
+                return
+            self.__quitar_postings(reclamo_id)
+
+    def consultar(
+        self, texto: str, umbral: float = 0.25, limite: int = 5
+    ) -> list[tuple[int, float]]:
+        """
+        Devuelve hasta `limite` tuplas (reclamo_id, similitud) con similitud
+        mayor a `umbral`, ordenadas de mayor a menor.
+        """
+        with self.__lock:
+            if self.__requiere_reajuste():
+                self.__reajustar()
+            if self.__vectorizador is None or not self.__terminos:
+                return []
+            vector_consulta = self.__vectorizador.transform([texto])
+            puntajes = self.__acumular_puntajes(
+                vector_consulta.indices.tolist(), vector_consulta.data.tolist(), umbral
+            )
+
+        mejores = heapq.nlargest(
+            limite,
+            ((puntaje, rid) for rid, puntaje in puntajes.items() if puntaje > umbral),
+        )
+        return [(rid, float(puntaje)) for puntaje, rid in mejores]
+
+    # ── Helpers privados ─────────────────────────────────────────────
+
+    def __acumular_puntajes(
+        self,
+        terminos_consulta,
+        pesos_consulta,
+        umbral: float,
+    ) -> dict[int, float]:
+        # Los términos se recorren de mayor a menor contribución posible. Cuando
+        # la suma de las cotas restantes ya no puede superar el umbral, un
+        # reclamo que todavía no apareció tampoco podrá hacerlo: desde ahí sólo
+        # se completan los puntajes de los candidatos ya encontrados.
+        terminos = sorted(
+            (
+                (peso * self.__peso_maximo[termino], termino, peso)
+                for termino, peso in zip(terminos_consulta, pesos_consulta)
+                if termino in self.__postings
+            ),
+            reverse=True,
+        )
+        cota_restante = sum(cota for cota, _, _ in terminos)
+
+        puntajes: dict[int, float] = {}
+        for cota, termino, peso in terminos:
+            posting = self.__postings[termino]
+            if cota_restante > umbral:
+                for rid, peso_reclamo in posting.items():
+                    puntajes[rid] = puntajes.get(rid, 0.0) + peso * peso_reclamo
+            elif len(puntajes) < len(posting):
+                for rid in puntajes:
+                    peso_reclamo = posting.get(rid)
+                    if peso_reclamo is not None:
+                        puntajes[rid] += peso * peso_reclamo
+            else:
+                for rid, peso_reclamo in posting.items():
+                    if rid in puntajes:
+                        puntajes[rid] += peso * peso_reclamo
+            cota_restante -= cota
+        return puntajes
+
+    def __indexar(self, reclamo_id: int, terminos, pesos) -> None:
+        terminos_reclamo = []
+        for termino, peso in zip(terminos, pesos):
+            self.__postings.setdefault(termino, {})[reclamo_id] = peso
+            if peso > self.__peso_maximo.get(termino, 0.0):
+                self.__peso_maximo[termino] = peso
+            terminos_reclamo.append(termino)
+        self.__terminos[reclamo_id] = terminos_reclamo
+
+    def __quitar_postings(self, reclamo_id: int) -> None:
+        # El peso máximo del término no se recalcula: sigue siendo una cota
+        # superior válida y se renueva en el próximo reajuste.
+        for termino in self.__terminos.pop(reclamo_id, []):
+            posting = self.__postings.get(termino)
+            if posting is None:
+                continue
+            posting.pop(reclamo_id, None)
+            if not posting:
+                del self.__postings[termino]
+                del self.__peso_maximo[termino]
+
+    def __requiere_reajuste(self) -> bool:
+        if self.__vocabulario is not None:
+            return self.__vocabulario.version != self.__version_vocabulario
+        umbral = self.__tamano_ajuste * self.PROPORCION_REAJUSTE
+        return self.__altas_desde_ajuste > 0 and (
+            self.__vectorizador is None or self.__altas_desde_ajuste >= umbral
+        )
+
+    def __reajustar(self) -> None:
+        ids = list(self.__textos.keys())
+        self.__postings = {}
+        self.__peso_maximo = {}
+        self.__terminos = {}
+        self.__altas_desde_ajuste = 0
+        self.__tamano_ajuste = len(ids)
+        if self.__vocabulario is not None:
+            # El vocabulario compartido ya está ajustado: sólo se vectoriza
+            self.__vectorizador, self.__version_vocabulario = self.__vocabulario.estado()
+            if not ids or self.__vectorizador is None:
+                return
+            matriz = self.__vectorizador.transform([self.__textos[rid] for rid in ids])
+        else:
+            if not ids:
+                self.__vectorizador = None
+                return
+            vectorizador = self._crear_vectorizador()
+            try:
+                matriz = vectorizador.fit_transform([self.__textos[rid] for rid in ids])
+            except ValueError:
+                self.__vectorizador = None
+                return
+            self.__vectorizador = vectorizador
+        matriz = matriz.tocsr()
+        for i, rid in enumerate(ids):
+            inicio, fin = matriz.indptr[i], matriz.indptr[i + 1]
+            self.__indexar(rid, matriz.indices[inicio:fin], matriz.data[inicio:fin])
+
+
+class VocabularioSimilitud:
+    """
+    Vocabulario y pesos IDF compartidos por varios IndiceSimilitud.
+
+    Los índices que lo comparten vectorizan con el mismo ajuste, así que sus
+    similitudes están en la misma escala y se pueden combinar. Cada ajuste
+    incrementa la versión; los índices vuelven a vectorizar sus textos en la
+    siguiente consulta. Como en IndiceSimilitud, cuando las altas acumuladas
+    superan PROPORCION_REAJUSTE del corpus ajustado conviene volver a ajustar.
+    """
+
+    PROPORCION_REAJUSTE = 0.5
+
+    def __init__(self):
+        self.__lock = threading.Lock()
+        self.__vectorizador: "TfidfVectorizer | None" = None
+        self.__version = 0
+        self.__altas_desde_ajuste = 0
+        self.__tamano_ajuste = 0
+
+    @property
+    def version(self) -> int:
+        """0 mientras no se ajustó nunca."""
+        return self.__version
+
+    def estado(self) -> tuple["TfidfVectorizer | None", int]:
+        """Vectorizador ajustado (None si el corpus no tenía términos) y su versión."""
+        with self.__lock:
+            return self.__vectorizador, self.__version
+
+    def ajustar(self, textos: list[str]) -> None:
+        vectorizador = IndiceSimilitud._crear_vectorizador()
+        try:
+            vectorizador.fit(textos)
+        except ValueError:
+            vectorizador = None
+        with self.__lock:
+            self.__vectorizador = vectorizador
+            self.__version += 1
+            self.__altas_desde_ajuste = 0
+            self.__tamano_ajuste = len(textos)
+
+    def registrar_alta(self) -> None:
+        with self.__lock:
+            self.__altas_desde_ajuste += 1
+
+    def requiere_reajuste(self) -> bool:
+        with self.__lock:
+            if self.__version == 0:
+                return True
+            umbral = self.__tamano_ajuste * self.PROPORCION_REAJUSTE
+            return self.__altas_desde_ajuste > 0 and (
+                self.__vectorizador is None or self.__altas_desde_ajuste >= umbral
+            )
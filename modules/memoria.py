@@ -0,0 +1,74 @@
+"""
+Reporte de memoria de los procesos trabajadores del servidor.
+
+Lee /proc/<pid>/smaps_rollup (Linux) para separar, en cada proceso, la memoria
+propia (páginas privadas) de la compartida con otros procesos, p. ej. el modelo
+precargado antes del fork o los arreglos del artefacto compilado mapeados en
+memoria.
+"""
+
+from __future__ import annotations
+
+import os
+
+CAMPOS_SMAPS = {
+    "Rss": "rss_kb",
+    "Pss": "pss_kb",
+    "Shared_Clean": "compartida_limpia_kb",
+    "Shared_Dirty": "compartida_sucia_kb",
+    "Private_Clean": "privada_limpia_kb",
+    "Private_Dirty": "privada_sucia_kb",
+}
+
+
+def memoria_proceso(pid: int | None = None) -> dict[str, int] | None:
+    """Devuelve los totales de smaps_rollup en KB, o None si no están disponibles."""
+    pid = pid or os.getpid()
+    try:
+        with open(f"/proc/{pid}/smaps_rollup", encoding="ascii") as archivo:
+            lineas = archivo.readlines()
+    except OSError:
+        return None
+
+    memoria = {"pid": pid}
+    for linea in lineas:
+        partes = linea.split()
+        if len(partes) >= 2 and partes[0].rstrip(":") in CAMPOS_SMAPS:
+            memoria[CAMPOS_SMAPS[partes[0].rstrip(":")]] = int(partes[1])
+    memoria["unica_kb"] = memoria.get("privada_limpia_kb", 0) + memoria.get("privada_sucia_kb", 0)
+    memoria["compartida_kb"] = memoria.get("compartida_limpia_kb", 0) + memoria.get("compartida_sucia_kb", 0)
+    return memoria
+
+
+def _linea_de_comandos(pid: int) -> bytes | None:
+    try:
+        with open(f"/proc/{pid}/cmdline", "rb") as archivo:
+            return archivo.read()
+    except OSError:
+        return None
+
+
+def procesos_trabajadores() -> list[int]:
+    """
+    Devuelve el proceso actual y sus hermanos con la misma línea de comandos,
+    que con un servidor que hace fork (p. ej. gunicorn) son los demás trabajadores.
+    """
+    pid = os.getpid()
+    padre = os.getppid()
+    try:
+        with open(f"/proc/{padre}/task/{padre}/children", encoding="ascii") as archivo:
+            hijos = [int(h) for h in archivo.read().split()]
+    except OSError:
+        return [pid]
+    propia = _linea_de_comandos(pid)
+    return sorted({pid, *(h for h in hijos if _linea_de_comandos(h) == propia)})
+
+
+def reporte_memoria() -> dict:
+    """Memoria única y compartida de cada trabajador, más el total de la memoria única."""
+    procesos = [m for m in (memoria_proceso(pid) for pid in procesos_trabajadores()) if m]
+    return {
+        "pid_actual": os.getpid(),
+        "procesos": procesos,
+        "unica_total_kb": sum(m["unica_kb"] for m in procesos),
+    }
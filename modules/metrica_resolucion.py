@@ -0,0 +1,255 @@
+from __future__ import annotations
+
+from datetime import datetime as Datetime
+
+from sqlalchemy import ForeignKey, and_, case, delete, func, literal, or_, select, union_all
+from sqlalchemy.dialects.sqlite import insert
+from sqlalchemy.orm import Mapped, mapped_column
+
+from modules.config import db
+from modules.reclamo import EstadoReclamo
+
+
+class MetricaResolucion(db.Model):
+    """
+    Mediana y percentil 90 de tiempos de resolución por departamento.
+
+    Hay una fila por departamento y métrica:
+    - "resolucion": horas desde la creación del reclamo hasta su primer paso a Resuelto.
+    - "pendiente" / "en_proceso": horas que un reclamo pasó en ese estado antes
+      de cambiar a otro.
+
+    Los valores se calculan en SQL con funciones de ventana sobre
+    historial_estado_reclamo y se guardan acá; las analíticas sólo leen esta
+    tabla. Cada recálculo recorre todo el historial de estados de los
+    departamentos afectados, así que no se hace en cada cambio: los cambios de
+    estado (Reclamo.actualizar_estado) y de departamento (mover(), desde la
+    derivación, la clasificación y la reclasificación en bloque) sólo marcan
+    el departamento en MarcaMetricaResolucion, dentro de la misma transacción.
+    actualizar(), pensada para correr periódicamente (ver
+    actualizar_metricas.py), recalcula una vez cada departamento marcado.
+    """
+
+    __tablename__ = "metrica_resolucion"
+
+    METRICAS = ("resolucion", "pendiente", "en_proceso")
+
+    departamento_id: Mapped[int] = mapped_column(ForeignKey("departamento.id"), primary_key=True)
+    metrica: Mapped[str] = mapped_column(primary_key=True)
+    cantidad: Mapped[int] = mapped_column(nullable=False)
+    mediana_horas: Mapped[float] = mapped_column(nullable=False)
+    p90_horas: Mapped[float] = mapped_column(nullable=False)
+    calculado_en: Mapped[Datetime] = mapped_column(default=Datetime.now)
+
+    def __init__(self, departamento_id: int, metrica: str, cantidad: int, mediana_horas: float, p90_horas: float):
+        self.departamento_id = departamento_id
+        self.metrica = metrica
+        self.cantidad = cantidad
+        self.mediana_horas = mediana_horas
+        self.p90_horas = p90_horas
+
+    def __repr__(self):
+        return (
+            f"<MetricaResolucion depto={self.departamento_id} {self.metrica}: "
+            f"mediana={self.mediana_horas:.1f} h p90={self.p90_horas:.1f} h>"
+        )
+
+    @staticmethod
+    def recalcular(departamento_ids: list[int] | None = None) -> None:
+        """
+        Recalcula las métricas de los departamentos indicados (todos si es None)
+        con una sola sentencia INSERT ... SELECT. No hace commit.
+        """
+        if departamento_ids is not None and len(departamento_ids) == 0:
+            return
+        borrar = delete(MetricaResolucion)
+        if departamento_ids is not None:
+            borrar = borrar.where(MetricaResolucion.departamento_id.in_(departamento_ids))
+        db.session.execute(borrar)
+
+        percentiles = MetricaResolucion._consulta_percentiles(departamento_ids)
+        db.session.execute(
+            MetricaResolucion.__table__.insert().from_select(
+                ["departamento_id", "metrica", "cantidad", "mediana_horas", "p90_horas", "calculado_en"],
+                percentiles.add_columns(literal(Datetime.now())),
+            )
+        )
+
+    @staticmethod
+    def marcar(departamento_ids) -> None:
+        """Marca las métricas de los departamentos para recalcularlas. No hace commit."""
+        MarcaMetricaResolucion.marcar(departamento_ids)
+
+    @staticmethod
+    def mover(reclamo_ids: list[int], departamento_ids: set[int]) -> None:
+        """
+        Marca los departamentos entre los que se movieron los reclamos. Si
+        ninguno tiene historial de estados las métricas no cambian y no se
+        marca nada. No hace commit.
+        """
+        from modules.historial_estado_reclamo import HistorialEstadoReclamo
+
+        if not reclamo_ids or not departamento_ids:
+            return
+        con_historial = db.session.scalar(
+            select(HistorialEstadoReclamo.id)
+            .where(HistorialEstadoReclamo.reclamo_id.in_(reclamo_ids))
+            .limit(1)
+        )
+        if con_historial is not None:
+            MetricaResolucion.marcar(departamento_ids)
+
+    @staticmethod
+    def actualizar() -> int:
+        """
+        Recalcula los departamentos marcados y borra sus marcas. Devuelve
+        cuántos departamentos recalculó.
+        """
+        marcas = MarcaMetricaResolucion.obtener()
+        if not marcas:
+            return 0
+        MetricaResolucion.recalcular(sorted(marcas))
+        MarcaMetricaResolucion.desmarcar(marcas)
+        db.session.commit()
+        return len(marcas)
+
+    @staticmethod
+    def reconstruir() -> None:
+        MetricaResolucion.recalcular()
+        db.session.execute(delete(MarcaMetricaResolucion))
+        db.session.commit()
+
+    @staticmethod
+    def obtener(departamento_ids: list[int] | None = None) -> dict[int, dict[str, dict]]:
+        """Devuelve {departamento_id: {metrica: {cantidad, mediana_horas, p90_horas}}}."""
+        if departamento_ids is not None and len(departamento_ids) == 0:
+            return {}
+        query = select(MetricaResolucion)
+        if departamento_ids is not None:
+            query = query.where(MetricaResolucion.departamento_id.in_(departamento_ids))
+        metricas: dict[int, dict[str, dict]] = {}
+        for fila in db.session.scalars(query):
+            metricas.setdefault(fila.departamento_id, {})[fila.metrica] = {
+                "cantidad": fila.cantidad,
+                "mediana_horas": fila.mediana_horas,
+                "p90_horas": fila.p90_horas,
+            }
+        return metricas
+
+    # ── Helpers privados ─────────────────────────────────────────────
+
+    @staticmethod
+    def _consulta_percentiles(departamento_ids: list[int] | None):
+        """SELECT departamento_id, metrica, cantidad, mediana_horas, p90_horas."""
+        from modules.historial_estado_reclamo import HistorialEstadoReclamo as H
+        from modules.reclamo import Reclamo as R
+
+        def horas(desde, hasta):
+            return (func.julianday(hasta) - func.julianday(desde)) * 24
+
+        orden_reclamo = {"partition_by": H.reclamo_id, "order_by": (H.cambiado_en, H.id)}
+        historial = select(
+            R.departamento_id,
+            R.creado_en,
+            H.estado_anterior,
+            H.estado_nuevo,
+            H.cambiado_en,
+            func.lag(H.cambiado_en).over(**orden_reclamo).label("cambio_anterior"),
+            func.row_number().over(
+                partition_by=(H.reclamo_id, H.estado_nuevo), order_by=(H.cambiado_en, H.id)
+            ).label("orden_estado"),
+        ).join(R, R.id == H.reclamo_id)
+        if departamento_ids is not None:
+            historial = historial.where(R.departamento_id.in_(departamento_ids))
+        historial = historial.subquery("historial")
+
+        # Primer paso a Resuelto de cada reclamo, medido desde su creación
+        resoluciones = select(
+            historial.c.departamento_id,
+            literal("resolucion").label("metrica"),
+            horas(historial.c.creado_en, historial.c.cambiado_en).label("horas"),
+        ).where(
+            historial.c.estado_nuevo == EstadoReclamo.RESUELTO,
+            historial.c.orden_estado == 1,
+        )
+        # Tiempo en el estado que se abandona: desde el cambio anterior (o la creación)
+        permanencias = select(
+            historial.c.departamento_id,
+            case(
+                (historial.c.estado_anterior == EstadoReclamo.PENDIENTE, "pendiente"),
+                else_="en_proceso",
+            ).label("metrica"),
+            horas(
+                func.coalesce(historial.c.cambio_anterior, historial.c.creado_en), historial.c.cambiado_en
+            ).label("horas"),
+        ).where(historial.c.estado_anterior.in_([EstadoReclamo.PENDIENTE, EstadoReclamo.EN_PROCESO]))
+        duraciones = union_all(resoluciones, permanencias).subquery("duraciones")
+
+        grupo = (duraciones.c.departamento_id, duraciones.c.metrica)
+        ordenadas = select(
+            duraciones,
+            func.row_number().over(partition_by=grupo, order_by=duraciones.c.horas).label("posicion"),
+            func.count().over(partition_by=grupo).label("total"),
+        ).subquery("ordenadas")
+
+        # Percentil por rango más cercano: la posición ceil(p * n), en aritmética entera
+        def percentil(numerador: int, denominador: int):
+            posicion = (ordenadas.c.total * numerador + denominador - 1) // denominador
+            return func.max(case((ordenadas.c.posicion == posicion, ordenadas.c.horas)))
+
+        return select(
+            ordenadas.c.departamento_id,
+            ordenadas.c.metrica,
+            func.max(ordenadas.c.total),
+            percentil(1, 2),
+            percentil(9, 10),
+        ).group_by(ordenadas.c.departamento_id, ordenadas.c.metrica)
+
+
+class MarcaMetricaResolucion(db.Model):
+    """
+    Departamentos cuyas métricas de resolución hay que recalcular.
+
+    `cambios` cuenta las marcas desde el último recálculo: actualizar() sólo
+    borra la marca si no cambió mientras recalculaba, de modo que un cambio
+    concurrente no se pierde.
+    """
+
+    __tablename__ = "marca_metrica_resolucion"
+
+    departamento_id: Mapped[int] = mapped_column(ForeignKey("departamento.id"), primary_key=True)
+    cambios: Mapped[int] = mapped_column(default=1, nullable=False)
+
+    def __init__(self, departamento_id: int, cambios: int = 1):
+        self.departamento_id = departamento_id
+        self.cambios = cambios
+
+    @staticmethod
+    def marcar(departamento_ids) -> None:
+        """No hace commit."""
+        filas = [{"departamento_id": departamento_id, "cambios": 1} for departamento_id in set(departamento_ids)]
+        if not filas:
+            return
+        sentencia = insert(MarcaMetricaResolucion).values(filas)
+        db.session.execute(sentencia.on_conflict_do_update(
+            index_elements=[MarcaMetricaResolucion.departamento_id],
+            set_={"cambios": MarcaMetricaResolucion.cambios + 1},
+        ))
+
+    @staticmethod
+    def obtener() -> dict[int, int]:
+        """Devuelve {departamento_id: cambios} de los departamentos marcados."""
+        return dict(db.session.execute(
+            select(MarcaMetricaResolucion.departamento_id, MarcaMetricaResolucion.cambios)
+        ).all())
+
+    @staticmethod
+    def desmarcar(marcas: dict[int, int]) -> None:
+        """Borra las marcas que siguen como se leyeron con obtener(). No hace commit."""
+        db.session.execute(delete(MarcaMetricaResolucion).where(or_(*(
+            and_(
+                MarcaMetricaResolucion.departamento_id == departamento_id,
+                MarcaMetricaResolucion.cambios == cambios,
+            )
+            for departamento_id, cambios in marcas.items()
+        ))))
@@ -0,0 +1,210 @@
+"""
+Artefacto compilado del clasificador de reclamos y predictor vectorizado con NumPy.
+
+El artefacto es un directorio de arreglos .npy con:
+- el vocabulario reducido a las palabras que consulta algún árbol, ordenado
+  para buscar con np.searchsorted,
+- los nodos de todos los árboles concatenados, con la media y la escala del
+  StandardScaler ya incorporadas en los umbrales,
+- las probabilidades de cada hoja y las etiquetas de cada clase.
+
+Los arreglos se abren con mmap_mode="r": los procesos que cargan el mismo
+artefacto comparten las páginas del archivo en lugar de tener cada uno su copia.
+"""
+
+from __future__ import annotations
+
+import json
+import math
+import os
+from typing import TYPE_CHECKING
+
+import numpy as np
+
+if TYPE_CHECKING:
+    from modules.classifier import ClaimsClassifier
+
+VERSION_FORMATO = 2
+ARCHIVO_METADATOS = "metadatos.json"
+ARREGLOS = (
+    "vocabulario", "raices", "izquierdo", "derecho", "caracteristica", "umbral", "valor", "clases",
+)
+
+
+def _sklearn_normaliza_hojas() -> bool:
+    """Antes de scikit-learn 1.4 las hojas guardaban conteos y predict_proba los normalizaba."""
+    import sklearn
+
+    mayor, menor = (int(parte) for parte in sklearn.__version__.split(".")[:2])
+    return (mayor, menor) < (1, 4)
+
+
+def _umbral_en_conteos(umbral: float, media: float, escala: float) -> float:
+    """
+    Traduce el umbral de un nodo (sobre el valor escalado en float32) a un umbral
+    sobre el conteo crudo de la palabra.
+
+    El árbol evalúa float32((conteo - media) / escala) <= umbral. Como la expresión
+    es monótona en el conteo, se busca el mayor conteo entero k que cumple la
+    condición y se devuelve k + 0.5; si ni el 0 la cumple, se devuelve -0.5.
+    """
+
+    def cumple(conteo: int) -> bool:
+        return float(np.float32((np.float64(conteo) - media) / escala)) <= umbral
+
+    if not cumple(0):
+        return -0.5
+    k = max(0, math.floor(umbral * escala + media) - 2)
+    while not cumple(k):
+        k -= 1
+    while cumple(k + 1):
+        k += 1
+    return k + 0.5
+
+
+def exportar_modelo(clf: "ClaimsClassifier", ruta_directorio: str, metadatos: dict | None = None) -> None:
+    """Convierte un ClaimsClassifier entrenado en un artefacto compilado."""
+    componentes = clf.get_components()
+    vocabulario = componentes["vectorizer"].get_feature_names_out()
+    escalador = componentes["scaler"]
+    bosque = componentes["classifier"]
+
+    caracteristicas_usadas = np.unique(np.concatenate([
+        arbol.tree_.feature[arbol.tree_.feature >= 0] for arbol in bosque.estimators_
+    ]))
+    # Las columnas siguen el orden alfabético de las palabras
+    caracteristicas_usadas = caracteristicas_usadas[
+        np.argsort(np.asarray(vocabulario[caracteristicas_usadas], dtype=str), kind="stable")
+    ]
+    columna_de = {int(f): i for i, f in enumerate(caracteristicas_usadas)}
+    media = escalador.mean_ if escalador.with_mean else np.zeros(len(vocabulario))
+    escala = escalador.scale_ if escalador.with_std else np.ones(len(vocabulario))
+    normalizar = _sklearn_normaliza_hojas()
+
+    raices, izquierdos, derechos, caracteristicas, umbrales, valores = [], [], [], [], [], []
+    desplazamiento = 0
+    for arbol in bosque.estimators_:
+        t = arbol.tree_
+        es_hoja = t.children_left == -1
+        raices.append(desplazamiento)
+        izquierdos.append(np.where(es_hoja, -1, t.children_left + desplazamiento))
+        derechos.append(np.where(es_hoja, -1, t.children_right + desplazamiento))
+        caracteristicas.append(np.array(
+            [-1 if hoja else columna_de[int(f)] for f, hoja in zip(t.feature, es_hoja)], dtype=np.int32
+        ))
+        umbrales.append(np.array([
+            0.0 if hoja else _umbral_en_conteos(float(u), float(media[f]), float(escala[f]))
+            for f, u, hoja in zip(t.feature, t.threshold, es_hoja)
+        ]))
+        valor = np.array(t.value[:, 0, :bosque.n_classes_], dtype=np.float64)
+        if normalizar:
+            normalizador = valor.sum(axis=1)[:, np.newaxis]
+            normalizador[normalizador == 0.0] = 1.0
+            valor = valor / normalizador
+        valores.append(valor)
+        desplazamiento += t.node_count
+
+    arreglos = {
+        "vocabulario": np.asarray(vocabulario[caracteristicas_usadas], dtype=str),
+        "raices": np.asarray(raices, dtype=np.int64),
+        "izquierdo": np.concatenate(izquierdos).astype(np.int64),
+        "derecho": np.concatenate(derechos).astype(np.int64),
+        "caracteristica": np.concatenate(caracteristicas),
+        "umbral": np.concatenate(umbrales),
+        "valor": np.concatenate(valores),
+        "clases": np.asarray(componentes["labels"][bosque.classes_.astype(int)], dtype=str),
+    }
+
+    os.makedirs(ruta_directorio, exist_ok=True)
+    for nombre, arreglo in arreglos.items():
+        np.save(os.path.join(ruta_directorio, f"{nombre}.npy"), arreglo, allow_pickle=False)
+    with open(os.path.join(ruta_directorio, ARCHIVO_METADATOS), "w", encoding="utf-8") as archivo:
+        json.dump({"formato": VERSION_FORMATO, **(metadatos or {})}, archivo)
+
+
+class PredictorCompilado:
+    """
+    Predictor del bosque compilado; recibe textos ya lematizados.
+
+    No arma estructuras por proceso a partir de los arreglos (como un dict
+    del vocabulario), de modo que con arreglos mapeados en memoria todo el
+    modelo queda en páginas compartidas.
+    """
+
+    def __init__(self, arreglos: dict[str, np.ndarray], metadatos: dict | None = None):
+        self.metadatos = metadatos or {}
+        self.__raices = arreglos["raices"]
+        self.__izquierdo = arreglos["izquierdo"]
+        self.__derecho = arreglos["derecho"]
+        self.__caracteristica = arreglos["caracteristica"]
+        self.__umbral = arreglos["umbral"]
+        self.__valor = arreglos["valor"]
+        self.__clases = arreglos["clases"]
+        self.__vocabulario = arreglos["vocabulario"]
+
+    @staticmethod
+    def leer_metadatos(ruta_directorio: str) -> dict | None:
+        ruta = os.path.join(ruta_directorio, ARCHIVO_METADATOS)
+        if not os.path.exists(ruta):
+            return None
+        with open(ruta, encoding="utf-8") as archivo:
+            return json.load(archivo)
+
+    @staticmethod
+    def es_compatible(metadatos: dict | None) -> bool:
+        return metadatos is not None and metadatos.get("formato") == VERSION_FORMATO
+
+    @classmethod
+    def cargar(cls, ruta_directorio: str, mapear: bool = True) -> "PredictorCompilado":
+        metadatos = cls.leer_metadatos(ruta_directorio)
+        if not cls.es_compatible(metadatos):
+            raise ValueError(f"Artefacto compilado inválido en {ruta_directorio}")
+        arreglos = {
+            nombre: np.load(
+                os.path.join(ruta_directorio, f"{nombre}.npy"),
+                mmap_mode="r" if mapear else None,
+                allow_pickle=False,
+            )
+            for nombre in ARREGLOS
+        }
+        return cls(arreglos, metadatos)
+
+    def __conteos(self, textos_lematizados: list[str]) -> np.ndarray:
+        conteos = np.zeros((len(textos_lematizados), len(self.__vocabulario)), dtype=np.float64)
+        filas, palabras = [], []
+        for fila, texto in enumerate(textos_lematizados):
+            tokens = texto.split(" ")
+            filas.extend([fila] * len(tokens))
+            palabras.extend(tokens)
+        if not palabras or len(self.__vocabulario) == 0:
+            return conteos
+        palabras = np.asarray(palabras, dtype=str)
+        columnas = np.searchsorted(self.__vocabulario, palabras)
+        columnas[columnas == len(self.__vocabulario)] = 0
+        encontradas = self.__vocabulario[columnas] == palabras
+        np.add.at(conteos, (np.asarray(filas)[encontradas], columnas[encontradas]), 1)
+        return conteos
+
+    def predecir(self, textos_lematizados: list[str]) -> list[str]:
+        """Devuelve la etiqueta de cada texto, idéntica a ClaimsClassifier.classify."""
+        conteos = self.__conteos(textos_lematizados)
+        # Todos los árboles avanzan juntos: nodos[i, t] es el nodo del texto i en el árbol t
+        nodos = np.tile(self.__raices, (conteos.shape[0], 1))
+        filas = np.broadcast_to(np.arange(conteos.shape[0])[:, np.newaxis], nodos.shape)
+        activos = self.__izquierdo[nodos] != -1
+        while activos.any():
+            actuales = nodos[activos]
+            valores = conteos[filas[activos], self.__caracteristica[actuales]]
+            nodos[activos] = np.where(
+                valores <= self.__umbral[actuales],
+                self.__izquierdo[actuales],
+                self.__derecho[actuales],
+            )
+            activos = self.__izquierdo[nodos] != -1
+
+        # Se acumula árbol por árbol, en el mismo orden que RandomForestClassifier
+        probabilidades = np.zeros((conteos.shape[0], self.__valor.shape[1]))
+        for arbol in range(nodos.shape[1]):
+            probabilidades += self.__valor[nodos[:, arbol]]
+        probabilidades /= len(self.__raices)
+        return self.__clases.take(np.argmax(probabilidades, axis=1)).tolist()
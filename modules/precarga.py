@@ -0,0 +1,108 @@
+"""
+Precarga en segundo plano de los componentes costosos de la aplicación.
+
+El clasificador y el índice de similitud se cargan recién en el primer uso;
+precalentar() adelanta ese trabajo en un hilo para que el servidor pueda
+empezar a atender mientras tanto.
+"""
+
+from __future__ import annotations
+
+import gc
+import os
+import threading
+
+from flask import Flask
+
+_listo = threading.Event()
+
+# App cuyos reclamos sin clasificar encola cada trabajador después del fork
+# (ver precargar_antes_de_fork). os.register_at_fork no permite quitar un
+# callback: se registra uno solo por proceso y este valor lo habilita.
+_app_tras_fork: Flask | None = None
+_fork_registrado = False
+
+
+def precalentar(
+    app: Flask, en_segundo_plano: bool = True, encolar_pendientes: bool = True
+) -> threading.Thread | None:
+    """
+    Carga el modelo de clasificación y construye el índice de similitud. Con
+    encolar_pendientes=True además encola los reclamos que quedaron sin
+    clasificar, lo que inicia los hilos de la cola de clasificación.
+    """
+
+    def _precalentar():
+        from modules.clasificador import clasificador
+        from modules.similitud import buscador_similitud
+
+        try:
+            clasificador.precalentar(en_segundo_plano=False)
+            with app.app_context():
+                buscador_similitud.construir_indice()
+            if encolar_pendientes:
+                _encolar_pendientes(app)
+        finally:
+            _listo.set()
+
+    if not en_segundo_plano:
+        _precalentar()
+        return None
+    hilo = threading.Thread(target=_precalentar, name="precarga", daemon=True)
+    hilo.start()
+    return hilo
+
+
+def precargar_antes_de_fork(app: Flask) -> None:
+    """
+    Precarga sincrónica para servidores que hacen fork de sus trabajadores
+    (p. ej. gunicorn --preload). El modelo queda cargado en el proceso maestro
+    y los trabajadores lo comparten copy-on-write.
+
+    En el maestro no se inician hilos: los reclamos sin clasificar los encola
+    cada trabajador después del fork (ver os.register_at_fork). Si hay varios
+    trabajadores todos los encolan, pero sólo el primero en clasificar cada
+    reclamo lo asigna (Reclamo.aplicar_clasificacion). Los procesos que creen
+    después los trabajadores no los vuelven a encolar.
+    """
+    global _app_tras_fork, _fork_registrado
+    from modules.config import db
+
+    precalentar(app, en_segundo_plano=False, encolar_pendientes=False)
+    _app_tras_fork = app
+    if not _fork_registrado:
+        os.register_at_fork(after_in_child=_tras_fork)
+        _fork_registrado = True
+    with app.app_context():
+        # Las conexiones abiertas no deben heredarse entre procesos
+        db.engine.dispose()
+    # Los objetos ya creados pasan a la generación permanente: el recolector
+    # no los recorre en los trabajadores y no ensucia sus páginas compartidas
+    gc.collect()
+    gc.freeze()
+
+
+def _encolar_pendientes(app: Flask) -> None:
+    from modules.cola_clasificacion import cola_clasificacion
+
+    with app.app_context():
+        cola_clasificacion.encolar_pendientes()
+
+
+def _tras_fork() -> None:
+    global _app_tras_fork
+    # Sólo los hijos directos del maestro encolan: el hijo se desmarca
+    app, _app_tras_fork = _app_tras_fork, None
+    if app is not None:
+        _encolar_pendientes_en_segundo_plano(app)
+
+
+def _encolar_pendientes_en_segundo_plano(app: Flask) -> None:
+    threading.Thread(
+        target=_encolar_pendientes, args=(app,), name="encolar-pendientes", daemon=True
+    ).start()
+
+
+def esta_listo() -> bool:
+    """True cuando la precarga terminó."""
+    return _listo.is_set()
@@ -2,11 +2,14 @@ from __future__ import annotations
 
 from datetime import datetime as Datetime
 from enum import Enum
-from typing import TYPE_CHECKING
+from typing import TYPE_CHECKING, Iterator
 
-from sqlalchemy import ForeignKey, func
+from flask import current_app
+from sqlalchemy import ForeignKey, LargeBinary, Row, func, select, update
 from sqlalchemy.exc import IntegrityError
-from sqlalchemy.orm import Mapped, mapped_column, relationship
+from sqlalchemy.orm import (
+    Mapped, joinedload, mapped_column, query_expression, relationship, with_expression,
+)
 
 from modules.config import db
 
@@ -14,6 +17,7 @@ if TYPE_CHECKING:
     from modules.historial_estado_reclamo import HistorialEstadoReclamo
     from modules.adherente_reclamo import AdherenteReclamo
     from modules.derivacion_reclamo import DerivacionReclamo
+    from modules.banda_lsh import BandaLSH
     from modules.departamento import Departamento
     from modules.usuario_final import UsuarioFinal
 
@@ -36,6 +40,8 @@ class Reclamo(db.Model):
     detalle: Mapped[str] = mapped_column(nullable=False)
     estado: Mapped[EstadoReclamo] = mapped_column(default=EstadoReclamo.PENDIENTE)
     ruta_imagen: Mapped[str | None] = mapped_column(nullable=True)
+    firma_minhash: Mapped[bytes | None] = mapped_column(LargeBinary, nullable=True)
+    clasificacion_pendiente: Mapped[bool] = mapped_column(default=False)
     creado_en: Mapped[Datetime] = mapped_column(default=Datetime.now)
     actualizado_en: Mapped[Datetime] = mapped_column(
         default=Datetime.now, onupdate=Datetime.now
@@ -63,6 +69,12 @@ class Reclamo(db.Model):
     derivaciones: Mapped[list["DerivacionReclamo"]] = relationship(
         "DerivacionReclamo", back_populates="reclamo", cascade="all, delete-orphan"
     )
+    bandas_lsh: Mapped[list["BandaLSH"]] = relationship(
+        "BandaLSH", back_populates="reclamo", cascade="all, delete-orphan"
+    )
+
+    # Cantidad de adherentes calculada en la misma consulta (ver opciones_precarga)
+    conteo_adherentes: Mapped[int | None] = query_expression()
 
     def __init__(
         self,
@@ -79,6 +91,8 @@ class Reclamo(db.Model):
     @property
     def cantidad_adherentes(self) -> int:
         """Retorna el número de adherentes"""
+        if self.conteo_adherentes is not None:
+            return self.conteo_adherentes
         return len(self.adherentes)
 
     def __repr__(self):
@@ -93,16 +107,47 @@ class Reclamo(db.Model):
         return secretaria_tecnica.id if secretaria_tecnica else None
 
     @staticmethod
-    def _clasificar_departamento(detalle: str) -> int | None:
-        from modules.clasificador import clasificador
+    def _clasificar_departamento(detalle: str, con_presupuesto: bool = True) -> int | None:
+        """
+        Predice el departamento del detalle, o None si no hay modelo.
+
+        Con con_presupuesto=True la carga del modelo y la predicción pasan por
+        el cortacircuitos del clasificador: lanza ServicioNoDisponible si está
+        abierto, si se supera CLASIFICACION_PRESUPUESTO_SEGUNDOS o si el modelo
+        falla, para que el reclamo se clasifique después en la cola.
+        Con con_presupuesto=False (la cola) los errores se propagan, para que la
+        cola los registre y reintente.
+        """
+        from modules.clasificador import clasificador, cortacircuitos_clasificador
+        from modules.cache_clasificacion import CacheClasificacion
+        from modules.cortacircuitos import ServicioNoDisponible
         from modules.departamento import Departamento
 
-        try:
-            nombre_predicho = clasificador.clasificar(detalle)
-            departamento_predicho = Departamento.obtener_por_nombre(nombre_predicho)
-            return departamento_predicho.id if departamento_predicho else None
-        except Exception:
+        # La versión sale del pickle en disco: cargar el modelo acá dejaría la
+        # primera clasificación fuera del presupuesto
+        version_modelo = clasificador.version_sin_cargar()
+        if version_modelo is None:
             return None
+        try:
+            nombre_predicho = CacheClasificacion.obtener(detalle, version_modelo)
+            if nombre_predicho is None:
+                if con_presupuesto:
+                    nombre_predicho = cortacircuitos_clasificador.ejecutar(
+                        clasificador.clasificar, detalle,
+                        presupuesto=current_app.config.get("CLASIFICACION_PRESUPUESTO_SEGUNDOS"),
+                    )
+                else:
+                    nombre_predicho = clasificador.clasificar(detalle)
+                CacheClasificacion.guardar(detalle, version_modelo, nombre_predicho)
+        except ServicioNoDisponible:
+            raise
+        except Exception as error:
+            if not con_presupuesto:
+                raise
+            current_app.logger.exception("Falló la clasificación en línea; se clasifica en la cola")
+            raise ServicioNoDisponible(f"clasificador: {error}") from error
+        departamento_predicho = Departamento.obtener_por_nombre(nombre_predicho)
+        return departamento_predicho.id if departamento_predicho else None
 
     @staticmethod
     def _resolver_departamento_id(
@@ -139,9 +184,24 @@ class Reclamo(db.Model):
         if not detalle or detalle.strip() == "":
             return None, "El detalle del reclamo no puede estar vacío"
 
-        departamento_id_resuelto, error = Reclamo._resolver_departamento_id(
-            detalle, departamento_id
+        from modules.cortacircuitos import ServicioNoDisponible
+
+        # Sin departamento explícito, el reclamo queda en la Secretaría Técnica y
+        # la cola de clasificación lo asigna después
+        clasificar_despues = departamento_id is None and current_app.config.get(
+            "CLASIFICACION_ASINCRONA", True
         )
+        if not clasificar_despues:
+            try:
+                departamento_id_resuelto, error = Reclamo._resolver_departamento_id(
+                    detalle, departamento_id
+                )
+            except ServicioNoDisponible:
+                # Clasificador lento o cortado: se clasifica después en la cola
+                clasificar_despues = True
+        if clasificar_despues:
+            departamento_id_resuelto = Reclamo._obtener_id_secretaria_tecnica()
+            error = None if departamento_id_resuelto else "No se encontró la Secretaría Técnica"
         if error or not departamento_id_resuelto:
             return None, error
 
@@ -151,12 +211,83 @@ class Reclamo(db.Model):
             creador_id=usuario_id,
             ruta_imagen=ruta_imagen,
         )
+        reclamo.clasificacion_pendiente = clasificar_despues
+
+        from modules.banda_lsh import BandaLSH
+        from modules.conteo_reclamos import ConteoReclamos
+        from modules.frecuencia_palabra import FrecuenciaPalabra
+        BandaLSH.registrar(reclamo)
 
         db.session.add(reclamo)
+        ConteoReclamos.ajustar(departamento_id_resuelto, EstadoReclamo.PENDIENTE, 1)
+        FrecuenciaPalabra.registrar(reclamo.detalle, departamento_id_resuelto)
         db.session.commit()
 
+        from modules.similitud import buscador_similitud
+        buscador_similitud.sincronizar_reclamo(reclamo)
+
+        if clasificar_despues:
+            from modules.cola_clasificacion import cola_clasificacion
+            cola_clasificacion.encolar(reclamo.id)
+
         return reclamo, None
 
+    @staticmethod
+    def aplicar_clasificacion(reclamo_id: int) -> bool:
+        """
+        Clasifica un reclamo pendiente de clasificación y lo asigna al
+        departamento predicho. Retorna False si ya no estaba pendiente (por
+        ejemplo, porque fue derivado a mano mientras esperaba en la cola).
+        """
+        reclamo = db.session.get(Reclamo, reclamo_id)
+        if not reclamo or not reclamo.clasificacion_pendiente:
+            return False
+
+        departamento_anterior_id = reclamo.departamento_id
+        # En segundo plano no hay un request esperando: no se aplica el presupuesto
+        id_clasificado = Reclamo._clasificar_departamento(reclamo.detalle, con_presupuesto=False)
+        valores = {"clasificacion_pendiente": False}
+        if id_clasificado is not None:
+            valores["departamento_id"] = id_clasificado
+
+        # La condición sobre clasificacion_pendiente evita pisar una derivación
+        # manual hecha mientras se clasificaba
+        resultado = db.session.execute(
+            update(Reclamo)
+            .where(Reclamo.id == reclamo_id, Reclamo.clasificacion_pendiente.is_(True))
+            .values(**valores)
+        )
+        if resultado.rowcount == 0:
+            db.session.rollback()
+            return False
+        if id_clasificado is not None:
+            from modules.conteo_reclamos import ConteoReclamos
+            from modules.frecuencia_palabra import FrecuenciaPalabra
+            from modules.metrica_resolucion import MetricaResolucion
+            ConteoReclamos.mover(departamento_anterior_id, reclamo.estado, id_clasificado, reclamo.estado)
+            FrecuenciaPalabra.mover(reclamo.detalle, departamento_anterior_id, id_clasificado)
+            MetricaResolucion.mover([reclamo_id], {departamento_anterior_id, id_clasificado})
+        db.session.commit()
+
+        db.session.refresh(reclamo)
+        from modules.similitud import buscador_similitud
+        buscador_similitud.sincronizar_reclamo(reclamo, departamento_anterior_id=departamento_anterior_id)
+
+        return True
+
+    @staticmethod
+    def descartar_clasificacion(reclamo_id: int) -> None:
+        """
+        Deja de considerar pendiente de clasificación a un reclamo que no se
+        pudo clasificar: queda en la Secretaría Técnica para derivarlo a mano.
+        """
+        db.session.execute(
+            update(Reclamo)
+            .where(Reclamo.id == reclamo_id, Reclamo.clasificacion_pendiente.is_(True))
+            .values(clasificacion_pendiente=False)
+        )
+        db.session.commit()
+
     @staticmethod
     def actualizar_estado(
         reclamo_id: int, nuevo_estado: EstadoReclamo, usuario_admin_id: int
@@ -177,6 +308,9 @@ class Reclamo(db.Model):
 
         reclamo.estado = nuevo_estado
 
+        from modules.conteo_reclamos import ConteoReclamos
+        ConteoReclamos.mover(reclamo.departamento_id, estado_anterior, reclamo.departamento_id, nuevo_estado)
+
         entrada_historial = HistorialEstadoReclamo(
             reclamo_id=reclamo_id,
             estado_anterior=estado_anterior,
@@ -187,6 +321,9 @@ class Reclamo(db.Model):
         db.session.add(entrada_historial)
         db.session.flush()
 
+        from modules.metrica_resolucion import MetricaResolucion
+        MetricaResolucion.marcar([reclamo.departamento_id])
+
         notificacion_creador = NotificacionUsuario(
             usuario_id=reclamo.creador_id, historial_estado_reclamo_id=entrada_historial.id
         )
@@ -201,14 +338,78 @@ class Reclamo(db.Model):
 
         db.session.commit()
 
+        from modules.similitud import buscador_similitud
+        buscador_similitud.sincronizar_reclamo(reclamo)
+
         return True, None
 
     # ── Consultas estáticas ──────────────────────────────────────────
 
+    @staticmethod
+    def subconsulta_adherentes():
+        """Subconsulta correlacionada con la cantidad de adherentes de cada reclamo."""
+        from modules.adherente_reclamo import AdherenteReclamo
+        return (
+            select(func.count(AdherenteReclamo.usuario_id))
+            .where(AdherenteReclamo.reclamo_id == Reclamo.id)
+            .correlate(Reclamo)
+            .scalar_subquery()
+        )
+
+    @staticmethod
+    def opciones_precarga() -> list:
+        """
+        Opciones de carga para listados: departamento y creador en el mismo JOIN
+        y la cantidad de adherentes como subconsulta, sin cargar los adherentes.
+        Así la página se renderiza con una sola consulta, sin importar cuántos
+        reclamos tenga.
+        """
+        return [
+            joinedload(Reclamo.departamento),
+            joinedload(Reclamo.creador),
+            with_expression(Reclamo.conteo_adherentes, Reclamo.subconsulta_adherentes()),
+        ]
+
     @staticmethod
     def obtener_por_id(reclamo_id: int) -> "Reclamo | None":
         return db.session.get(Reclamo, reclamo_id)
 
+    @staticmethod
+    def obtener_por_ids(reclamo_ids: list[int]) -> list["Reclamo"]:
+        if not reclamo_ids:
+            return []
+        return db.session.query(Reclamo).filter(Reclamo.id.in_(reclamo_ids)).all()
+
+    @staticmethod
+    def obtener_ids_sin_clasificar() -> list[int]:
+        filas = (
+            db.session.query(Reclamo.id)
+            .filter_by(clasificacion_pendiente=True)
+            .order_by(Reclamo.id)
+            .all()
+        )
+        return [int(reclamo_id) for (reclamo_id,) in filas]
+
+    @staticmethod
+    def obtener_departamento_clasificado(detalle: str) -> int | None:
+        """
+        Departamento ya predicho para el detalle según el cache de
+        clasificaciones, sin cargar ni invocar al modelo y sin escribir en el
+        cache; None si todavía no se clasificó.
+        """
+        from modules.clasificador import clasificador
+        from modules.cache_clasificacion import CacheClasificacion
+        from modules.departamento import Departamento
+
+        version_modelo = clasificador.version_sin_cargar()
+        if version_modelo is None:
+            return None
+        nombre_predicho = CacheClasificacion.consultar(detalle, version_modelo)
+        if nombre_predicho is None:
+            return None
+        departamento = Departamento.obtener_por_nombre(nombre_predicho)
+        return departamento.id if departamento else None
+
     @staticmethod
     def obtener_pendientes(filtro_departamento_id: int | None = None) -> list["Reclamo"]:
         query = db.session.query(Reclamo).filter_by(estado=EstadoReclamo.PENDIENTE)
@@ -218,9 +419,13 @@ class Reclamo(db.Model):
 
     @staticmethod
     def obtener_todos_con_filtros(
-        filtro_departamento: int | None = None, filtro_estado: EstadoReclamo | None = None
+        filtro_departamento: int | None = None,
+        filtro_estado: EstadoReclamo | None = None,
+        precargar: bool = False,
     ) -> list["Reclamo"]:
         query = db.session.query(Reclamo)
+        if precargar:
+            query = query.options(*Reclamo.opciones_precarga())
         if filtro_departamento is not None:
             query = query.filter_by(departamento_id=filtro_departamento)
         if filtro_estado is not None:
@@ -232,18 +437,17 @@ class Reclamo(db.Model):
     def obtener_conteo_estados(
         departamentos: list["Departamento"] | None = None,
     ) -> dict[EstadoReclamo, int]:
+        from modules.conteo_reclamos import ConteoReclamos
+
         #vamos a inicializar un diccionario donde por cada clave (estado (invalido, en proceso, etc.)) vamos a darle el valor=0
         conteos: dict[EstadoReclamo, int] = {estado: 0 for estado in EstadoReclamo}
         if departamentos is not None and len(departamentos) == 0:
             return conteos
-        #iniciamos una consulta donde nos fijamos unicamente en la columna de estado
-        query = db.session.query(Reclamo.estado, func.count(Reclamo.id))
-        if departamentos is not None:
-            ids = [d.id for d in departamentos]
-            query = query.filter(Reclamo.departamento_id.in_(ids))
-        conteos_query = query.group_by(Reclamo.estado).all()
-        for estado, conteo in conteos_query:
-            conteos[estado] = int(conteo)
+        #los contadores por departamento y estado ya están materializados en conteo_reclamos
+        ids = [d.id for d in departamentos] if departamentos is not None else None
+        for por_estado in ConteoReclamos.obtener(ids).values():
+            for estado, conteo in por_estado.items():
+                conteos[estado] += conteo
         return conteos
 
     @staticmethod
@@ -259,11 +463,7 @@ class Reclamo(db.Model):
                 "reclamos_invalidos": 0,
             }
         conteo_estados = Reclamo.obtener_conteo_estados(departamentos)
-        query_total = db.session.query(Reclamo)
-        if departamentos is not None:
-            ids = [d.id for d in departamentos]
-            query_total = query_total.filter(Reclamo.departamento_id.in_(ids))
-        total_reclamos = int(query_total.count() or 0)
+        total_reclamos = sum(conteo_estados.values())
         return {
             "total_reclamos": total_reclamos,
             "reclamos_pendientes": conteo_estados[EstadoReclamo.PENDIENTE],
@@ -276,6 +476,8 @@ class Reclamo(db.Model):
     def obtener_conteos_dashboard_departamento(
         departamentos: list["Departamento"],
     ) -> dict[int, dict[str, int]]:
+        from modules.conteo_reclamos import ConteoReclamos
+
         if len(departamentos) == 0:
             return {}
         ids = [d.id for d in departamentos]
@@ -286,10 +488,9 @@ class Reclamo(db.Model):
             for depto_id in ids
         }
         filas = (
-            db.session.query(Reclamo.departamento_id, Reclamo.estado, func.count(Reclamo.id))
-            .filter(Reclamo.departamento_id.in_(ids))
-            .group_by(Reclamo.departamento_id, Reclamo.estado)
-            .all()
+            (depto_id, estado, conteo)
+            for depto_id, por_estado in ConteoReclamos.obtener(ids).items()
+            for estado, conteo in por_estado.items()
         )
         for depto_id, estado, conteo in filas:
             depto_id_int = int(depto_id)
@@ -305,6 +506,27 @@ class Reclamo(db.Model):
                 por_depto[depto_id_int]["invalidos"] = conteo_int
         return por_depto
 
+    @staticmethod
+    def obtener_version_datos(departamentos: list["Departamento"]) -> str:
+        """
+        Versión de los datos que muestra un reporte de los departamentos: cambia
+        al crear, modificar o derivar un reclamo y al agregar o quitar adherentes.
+        """
+        from modules.adherente_reclamo import AdherenteReclamo
+
+        ids = [d.id for d in departamentos]
+        cantidad, ultimo_id, ultima_modificacion = db.session.execute(
+            select(func.count(Reclamo.id), func.max(Reclamo.id), func.max(Reclamo.actualizado_en))
+            .where(Reclamo.departamento_id.in_(ids))
+        ).one()
+        adherentes, ultimo_adherente = db.session.execute(
+            select(func.count(AdherenteReclamo.id), func.max(AdherenteReclamo.id))
+            .join(Reclamo, Reclamo.id == AdherenteReclamo.reclamo_id)
+            .where(Reclamo.departamento_id.in_(ids))
+        ).one()
+        modificacion = ultima_modificacion.isoformat() if ultima_modificacion else "-"
+        return f"{cantidad}:{ultimo_id or 0}:{modificacion}:{adherentes}:{ultimo_adherente or 0}"
+
     # ── Adherentes ───────────────────────────────────────────────────
 
     @staticmethod
@@ -356,9 +578,12 @@ class Reclamo(db.Model):
         return adherente is not None
 
     @staticmethod
-    def obtener_por_usuario(usuario_id: int) -> list["Reclamo"]:
+    def obtener_por_usuario(usuario_id: int, precargar: bool = False) -> list["Reclamo"]:
+        query = db.session.query(Reclamo)
+        if precargar:
+            query = query.options(*Reclamo.opciones_precarga())
         reclamos = (
-            db.session.query(Reclamo)
+            query
             .filter_by(creador_id=usuario_id)
             .order_by(Reclamo.creado_en.desc())
             .all()
@@ -366,10 +591,13 @@ class Reclamo(db.Model):
         return reclamos
 
     @staticmethod
-    def obtener_adheridos_por_usuario(usuario_id: int) -> list["Reclamo"]:
+    def obtener_adheridos_por_usuario(usuario_id: int, precargar: bool = False) -> list["Reclamo"]:
         from modules.adherente_reclamo import AdherenteReclamo
+        query = db.session.query(Reclamo)
+        if precargar:
+            query = query.options(*Reclamo.opciones_precarga())
         reclamos = (
-            db.session.query(Reclamo)
+            query
             .join(AdherenteReclamo, Reclamo.id == AdherenteReclamo.reclamo_id)
             .filter(AdherenteReclamo.usuario_id == usuario_id)
             .order_by(AdherenteReclamo.creado_en.desc())
@@ -378,17 +606,53 @@ class Reclamo(db.Model):
         return reclamos
 
     @staticmethod
-    def obtener_por_departamentos(departamentos: list["Departamento"]) -> list["Reclamo"]:
+    def obtener_por_departamentos(
+        departamentos: list["Departamento"], precargar: bool = False
+    ) -> list["Reclamo"]:
         if not departamentos:
             return []
         ids = [d.id for d in departamentos]
+        query = db.session.query(Reclamo)
+        if precargar:
+            query = query.options(*Reclamo.opciones_precarga())
         return (
-            db.session.query(Reclamo)
+            query
             .filter(Reclamo.departamento_id.in_(ids))
             .order_by(Reclamo.creado_en.desc())
             .all()
         )
 
+    @staticmethod
+    def iterar_para_reporte(
+        departamentos: list["Departamento"], tamano_bloque: int = 500
+    ) -> Iterator[Row]:
+        """
+        Recorre los reclamos de los departamentos, del más nuevo al más viejo,
+        como filas livianas (id, estado, detalle, nombre_departamento,
+        cantidad_adherentes, creado_en) leídas de a `tamano_bloque`. No crea
+        objetos Reclamo ni hace consultas por fila.
+        """
+        from modules.departamento import Departamento
+
+        if not departamentos:
+            return
+        cantidad_adherentes = Reclamo.subconsulta_adherentes()
+        query = (
+            select(
+                Reclamo.id,
+                Reclamo.estado,
+                Reclamo.detalle,
+                Departamento.nombre_mostrar.label("nombre_departamento"),
+                cantidad_adherentes.label("cantidad_adherentes"),
+                Reclamo.creado_en,
+            )
+            .join(Departamento, Departamento.id == Reclamo.departamento_id)
+            .where(Reclamo.departamento_id.in_([d.id for d in departamentos]))
+            .order_by(Reclamo.creado_en.desc())
+            .execution_options(yield_per=tamano_bloque)
+        )
+        yield from db.session.execute(query)
+
     @staticmethod
     def obtener_ids_adherentes(reclamo_id: int) -> list[int]:
         from modules.adherente_reclamo import AdherenteReclamo
@@ -399,3 +663,20 @@ class Reclamo(db.Model):
             .all()
         )
         return [int(usuario_id) for (usuario_id,) in filas]
+
+    @staticmethod
+    def obtener_ids_adherentes_por_reclamos(reclamo_ids: list[int]) -> dict[int, list[int]]:
+        """Igual que obtener_ids_adherentes, para varios reclamos en una consulta."""
+        from modules.adherente_reclamo import AdherenteReclamo
+        ids_por_reclamo: dict[int, list[int]] = {reclamo_id: [] for reclamo_id in reclamo_ids}
+        if not reclamo_ids:
+            return ids_por_reclamo
+        filas = (
+            db.session.query(AdherenteReclamo.reclamo_id, AdherenteReclamo.usuario_id)
+            .filter(AdherenteReclamo.reclamo_id.in_(reclamo_ids))
+            .order_by(AdherenteReclamo.creado_en.asc())
+            .all()
+        )
+        for reclamo_id, usuario_id in filas:
+            ids_por_reclamo[reclamo_id].append(int(usuario_id))
+        return ids_por_reclamo
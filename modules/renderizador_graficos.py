@@ -0,0 +1,158 @@
+"""
+Renderizado de gráficos de analíticas en un pool de procesos.
+
+Dibujar con matplotlib o WordCloud consume CPU y retiene el GIL; hecho en el
+hilo del request, varios administradores que abren las analíticas a la vez
+se esperan entre sí. Acá cada gráfico se dibuja en un proceso aparte y el
+resultado se guarda en el cache de gráficos del proceso web.
+
+La cantidad de trabajos en curso está acotada: si la cola está llena o el
+gráfico no termina dentro del tiempo de espera se lanza GraficoNoDisponible
+y la ruta responde con una imagen provisoria.
+"""
+
+from __future__ import annotations
+
+import multiprocessing
+import threading
+from concurrent.futures import Future, ProcessPoolExecutor, TimeoutError as TiempoAgotado
+from concurrent.futures.process import BrokenProcessPool
+
+from flask import current_app
+
+from modules.cache_graficos import cache_graficos
+from modules.generador_analiticas import GeneradorAnaliticas
+
+# Imagen que se sirve mientras el gráfico real no está listo
+IMAGEN_PROVISORIA = (
+    b'<svg xmlns="http://www.w3.org/2000/svg" width="800" height="400" viewBox="0 0 800 400">'
+    b'<rect width="800" height="400" fill="#f2f2f2"/>'
+    b'<text x="400" y="200" font-family="sans-serif" font-size="22" fill="#6c757d" '
+    b'text-anchor="middle">Generando gr\xc3\xa1fico\xe2\x80\xa6 recargue la p\xc3\xa1gina en unos segundos</text>'
+    b"</svg>"
+)
+
+
+class GraficoNoDisponible(Exception):
+    """El gráfico no se pudo dibujar a tiempo: la cola está llena o se superó la espera."""
+
+
+def _iniciar_proceso():
+    # matplotlib se importa una vez por proceso, no en cada gráfico
+    GeneradorAnaliticas._pyplot()
+
+
+class RenderizadorGraficos:
+    """
+    Pool de procesos para dibujar gráficos, con una cola acotada.
+
+    La cantidad de procesos se toma de GRAFICOS_PROCESOS en la configuración
+    de la app; con 0 los gráficos se dibujan en el mismo hilo (lo que usan los
+    tests). Los pedidos del mismo gráfico con los mismos datos comparten un
+    único trabajo.
+    """
+
+    PROCESOS_POR_DEFECTO = 2
+    MAX_EN_COLA = 8
+    ESPERA_SEGUNDOS = 5.0
+
+    def __init__(self, max_en_cola: int = MAX_EN_COLA):
+        self.max_en_cola = max_en_cola
+        self.__lock = threading.Lock()
+        self.__pool: ProcessPoolExecutor | None = None
+        self.__en_curso: dict[str, Future] = {}
+
+    def __len__(self) -> int:
+        return len(self.__en_curso)
+
+    def enviar(self, tipo: str, datos: dict, formato: str = "png") -> Future:
+        """
+        Empieza a dibujar un gráfico y devuelve un futuro con la imagen (o None
+        si no hay datos). Si ya está en el cache, el futuro está resuelto.
+        Debe llamarse dentro de un contexto de la app.
+        """
+        clave = GeneradorAnaliticas.huella_grafico(tipo, datos, formato)
+        imagen = cache_graficos.obtener(clave)
+        if imagen is not None:
+            return self.__resuelto(imagen)
+
+        procesos = current_app.config.get("GRAFICOS_PROCESOS", self.PROCESOS_POR_DEFECTO)
+        if procesos <= 0:
+            return self.__resuelto(GeneradorAnaliticas.renderizar_grafico(tipo, datos, formato))
+
+        with self.__lock:
+            futuro = self.__en_curso.get(clave)
+            if futuro is not None:
+                return futuro
+            if len(self.__en_curso) >= self.max_en_cola:
+                raise GraficoNoDisponible("renderizador de gráficos: cola llena")
+            futuro = self.__obtener_pool(procesos).submit(
+                GeneradorAnaliticas.dibujar_grafico, tipo, datos, formato
+            )
+            self.__en_curso[clave] = futuro
+        # Fuera del lock: si el futuro ya terminó, el callback corre en este hilo
+        futuro.add_done_callback(lambda f: self.__terminar(clave, f))
+        return futuro
+
+    def renderizar(
+        self, tipo: str, datos: dict, formato: str = "png", espera: float | None = None
+    ) -> bytes | None:
+        """
+        Devuelve la imagen esperando como máximo `espera` segundos (por defecto
+        GRAFICOS_ESPERA_SEGUNDOS). Lanza GraficoNoDisponible si no llega a tiempo;
+        el trabajo sigue en curso y su resultado queda en el cache.
+        """
+        if espera is None:
+            espera = current_app.config.get("GRAFICOS_ESPERA_SEGUNDOS", self.ESPERA_SEGUNDOS)
+        futuro = self.enviar(tipo, datos, formato)
+        try:
+            return futuro.result(timeout=espera)
+        except TiempoAgotado:
+            raise GraficoNoDisponible(
+                f"renderizador de gráficos: se superó la espera de {espera:.2f} s"
+            ) from None
+
+    def reiniciar(self) -> None:
+        """Descarta los trabajos en curso y cierra el pool (para tests)."""
+        with self.__lock:
+            pool, self.__pool = self.__pool, None
+            self.__en_curso.clear()
+        if pool is not None:
+            pool.shutdown(wait=False, cancel_futures=True)
+
+    # ── Helpers privados ─────────────────────────────────────────────
+
+    @staticmethod
+    def __resuelto(imagen: bytes | None) -> Future:
+        futuro: Future = Future()
+        futuro.set_result(imagen)
+        return futuro
+
+    def __terminar(self, clave: str, futuro: Future) -> None:
+        # Primero se guarda en el cache y después se saca de los trabajos en curso,
+        # para que un pedido concurrente siempre encuentre uno de los dos
+        error = None if futuro.cancelled() else futuro.exception()
+        if isinstance(error, BrokenProcessPool):
+            # Un proceso murió: el próximo pedido crea un pool nuevo
+            with self.__lock:
+                self.__pool = None
+        elif not futuro.cancelled() and error is None and futuro.result() is not None:
+            cache_graficos.guardar(clave, futuro.result())
+        with self.__lock:
+            if self.__en_curso.get(clave) is futuro:
+                del self.__en_curso[clave]
+
+    def __obtener_pool(self, procesos: int) -> ProcessPoolExecutor:
+        # Se llama con el lock tomado. Se usa "spawn" porque el proceso web
+        # tiene hilos (trabajadores de clasificación, servidor) y fork no es seguro
+        if self.__pool is None:
+            self.__pool = ProcessPoolExecutor(
+                max_workers=procesos,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_iniciar_proceso,
+            )
+        return self.__pool
+
+
+# Instancia global del renderizador
+renderizador_graficos = RenderizadorGraficos()
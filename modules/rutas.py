@@ -1,12 +1,13 @@
 from __future__ import annotations
 
 import os
-from datetime import datetime
+from concurrent.futures import wait
+from datetime import date, datetime
 from typing import Type
 
 from flask import (
-    Response, flash, jsonify, redirect, render_template, request,
-    send_from_directory, session, url_for,
+    Response, abort, flash, has_request_context, jsonify, redirect, render_template, request,
+    send_file, send_from_directory, session, stream_with_context, url_for,
 )
 from flask_login import current_user, login_required, login_user, logout_user
 
@@ -22,6 +23,12 @@ from modules.ayudante_admin import AyudanteAdmin
 from modules.generador_analiticas import GeneradorAnaliticas
 from modules.manejador_imagen import ManejadorImagen
 from modules.similitud import buscador_similitud
+from modules.banda_lsh import BandaLSH
+from modules.cola_clasificacion import cola_clasificacion
+from modules.renderizador_graficos import (
+    IMAGEN_PROVISORIA, GraficoNoDisponible, renderizador_graficos,
+)
+from modules.trabajos_reportes import EstadoTrabajo, TrabajoReporte, trabajos_reportes
 from modules.utils.decoradores import (
     admin_requerido, puede_gestionar_reclamo, usuario_final_requerido,
 )
@@ -48,6 +55,31 @@ def _manejar_login(
     return redirect(url_for(ruta_fallo))
 
 
+# Días que puede abarcar la serie de actividad pedida por query string
+_MAX_DIAS_ACTIVIDAD = 366
+
+
+def _leer_rango_actividad() -> dict:
+    """
+    Lee from/to (AAAA-MM-DD) y group (day/week) de la query string; 400 si son
+    inválidos o si el rango abarca más de un año.
+    """
+    agrupaciones = {"day": "dia", "week": "semana"}
+    try:
+        desde = date.fromisoformat(request.args["from"]) if request.args.get("from") else None
+        hasta = date.fromisoformat(request.args["to"]) if request.args.get("to") else None
+    except ValueError:
+        abort(400)
+    agrupar = agrupaciones.get(request.args.get("group", "day"))
+    if agrupar is None or (desde and hasta and desde > hasta):
+        abort(400)
+    # Sin "to" la serie llega hasta hoy; sin "from" son los últimos días de la tendencia
+    fin = hasta or date.today()
+    if desde and (fin - desde).days + 1 > _MAX_DIAS_ACTIVIDAD:
+        abort(400)
+    return {"desde": desde, "hasta": hasta, "agrupar": agrupar}
+
+
 def _manejar_subida_imagen() -> str | None:
     if "image" in request.files:
         archivo = request.files["image"]
@@ -60,6 +92,34 @@ def _manejar_subida_imagen() -> str | None:
     return None
 
 
+def _obtener_trabajo_reporte(clave: str) -> TrabajoReporte | None:
+    """Trabajo de reporte, si existe y sus departamentos son visibles para el admin actual."""
+    departamentos = Departamento.obtener_para_admin(current_user)
+    trabajo = trabajos_reportes.obtener(clave)
+    if trabajo is None:
+        # El trabajo puede venir de otro proceso o de antes de un reinicio: si la
+        # clave es la del reporte actual del admin, se toma del disco (o se genera)
+        es_secretario_tecnico = current_user.es_secretario_tecnico
+        if trabajos_reportes.clave(departamentos, es_secretario_tecnico) != clave:
+            return None
+        return trabajos_reportes.solicitar(departamentos, es_secretario_tecnico)
+    if not set(trabajo.departamento_ids) <= {d.id for d in departamentos}:
+        return None
+    return trabajo
+
+
+def _enviar_reporte_pdf(trabajo: TrabajoReporte):
+    ruta = trabajos_reportes.obtener_archivo(trabajo.clave)
+    if ruta is None:
+        # El archivo se desalojó del disco: se vuelve a pedir
+        return redirect(url_for("admin.download_report", format="pdf"))
+    generado_en = trabajo.terminado_en or datetime.fromtimestamp(os.path.getmtime(ruta))
+    return send_file(
+        ruta, mimetype="application/pdf", as_attachment=True,
+        download_name=f"reporte_reclamos_{generado_en.strftime('%Y%m%d_%H%M%S')}.pdf",
+    )
+
+
 @login_manager.user_loader
 def cargar_usuario(usuario_id):
     return Usuario.obtener_por_id(int(usuario_id))
@@ -67,7 +127,8 @@ def cargar_usuario(usuario_id):
 
 @app.context_processor
 def inyectar_notificaciones():
-    if current_user.is_authenticated:
+    # Sin request (p. ej. un reporte generado en segundo plano) no hay usuario
+    if has_request_context() and current_user.is_authenticated:
         conteo_no_leidas = NotificacionUsuario.obtener_conteo_no_leidas(current_user.id)
         ctx: dict = {"unread_notifications_count": conteo_no_leidas}
         if isinstance(current_user, UsuarioAdmin):
@@ -84,6 +145,15 @@ def archivo_subido(filename):
     return send_from_directory(directorio_subidas, filename)
 
 
+@app.route("/ready", endpoint="main.ready")
+def listo():
+    from modules.precarga import esta_listo
+
+    if esta_listo():
+        return jsonify({"ready": True})
+    return jsonify({"ready": False}), 503
+
+
 @app.route("/", endpoint="main.index")
 @login_required
 def indice():
@@ -152,8 +222,16 @@ def admin_login():
 def admin_dashboard():
     usuario_admin: UsuarioAdmin = current_user
     departamentos = Departamento.obtener_para_admin(usuario_admin)
-    conteos_dashboard = Reclamo.obtener_conteos_dashboard(departamentos)
     conteos_por_depto = Reclamo.obtener_conteos_dashboard_departamento(departamentos)
+    # Los totales salen de los mismos contadores, sin otra consulta
+    conteos_dashboard = {
+        clave_total: sum(conteos.get(clave, 0) for conteos in conteos_por_depto.values())
+        for clave_total, clave in (
+            ("total_reclamos", "total"), ("reclamos_pendientes", "pendientes"),
+            ("reclamos_en_proceso", "en_proceso"), ("reclamos_resueltos", "resueltos"),
+            ("reclamos_invalidos", "invalidos"),
+        )
+    }
     stats_depto = [
         {
             "department": depto,
@@ -175,6 +253,27 @@ def admin_dashboard():
     )
 
 
+@app.route("/admin/memory", endpoint="admin.memory")
+@admin_requerido
+def admin_memory():
+    from modules.memoria import reporte_memoria
+
+    return jsonify(reporte_memoria())
+
+
+@app.route("/admin/classifier/status", endpoint="admin.classifier_status")
+@admin_requerido
+def admin_classifier_status():
+    from modules.clasificador import clasificador, cortacircuitos_clasificador
+    from modules.cola_clasificacion import cola_clasificacion
+
+    return jsonify({
+        "model_ready": clasificador.listo,
+        "circuit_breaker": cortacircuitos_clasificador.estadisticas(),
+        "queued_claims": len(cola_clasificacion),
+    })
+
+
 @app.route("/admin/help", endpoint="admin.help")
 @admin_requerido
 def admin_help():
@@ -186,9 +285,9 @@ def admin_help():
 def admin_claims_list():
     usuario_admin: UsuarioAdmin = current_user
     reclamos = AyudanteAdmin.obtener_reclamos_para_admin(usuario_admin)
-    ids_adherentes_por_reclamo = {
-        reclamo.id: Reclamo.obtener_ids_adherentes(reclamo.id) for reclamo in reclamos
-    }
+    ids_adherentes_por_reclamo = Reclamo.obtener_ids_adherentes_por_reclamos(
+        [reclamo.id for reclamo in reclamos]
+    )
     return render_template(
         "admin/claims_list.html", claims=reclamos, supporters_ids_by_claim=ids_adherentes_por_reclamo,
     )
@@ -225,19 +324,95 @@ def admin_analytics():
         "status_counts": datos_analiticas["estadisticas"].get("conteos_estado", {}),
         "status_percentages": datos_analiticas["estadisticas"].get("porcentajes_estado", {}),
     }
+    # Los gráficos se empiezan a dibujar mientras se envía la página
+    graficos = (
+        ("torta", stats_template["status_counts"], "svg", datos_analiticas["huella_torta"]),
+        ("nube", datos_analiticas["palabras_clave"], "png", datos_analiticas["huella_nube"]),
+        ("actividad", datos_analiticas["actividad"], "svg", datos_analiticas["huella_actividad"]),
+    )
+    for tipo, datos, formato, huella in graficos:
+        if huella is not None:
+            try:
+                renderizador_graficos.enviar(tipo, datos, formato)
+            except GraficoNoDisponible:
+                pass
     return render_template(
         "admin/analytics.html",
-        stats=stats_template, pie_chart=datos_analiticas["grafico_torta"],
-        wordcloud=datos_analiticas["nube_palabras"], keywords=datos_analiticas["palabras_clave"],
+        stats=stats_template, pie_chart=datos_analiticas["huella_torta"],
+        wordcloud=datos_analiticas["huella_nube"], keywords=datos_analiticas["palabras_clave"],
+        activity_chart=datos_analiticas["huella_actividad"],
+        resolution_metrics=datos_analiticas["metricas_resolucion"],
         departments=departamentos,
     )
 
 
+# Nombre del gráfico en la URL -> tipo en GeneradorAnaliticas
+_GRAFICOS_ANALITICAS = {"status": "torta", "wordcloud": "nube", "activity": "actividad"}
+
+
+@app.route("/admin/analytics/activity", endpoint="admin.analytics_activity")
+@admin_requerido
+def admin_analytics_activity():
+    usuario_admin: UsuarioAdmin = current_user
+    departamentos = Departamento.obtener_para_admin(usuario_admin)
+    serie = GeneradorAnaliticas.obtener_tendencia(departamentos, **_leer_rango_actividad())
+    return jsonify([
+        {
+            "date": periodo["fecha"].isoformat(),
+            "created": periodo["creados"],
+            "resolved": periodo["resueltos"],
+            "invalidated": periodo["invalidados"],
+        }
+        for periodo in serie
+    ])
+
+
+@app.route("/admin/analytics/charts/<grafico>.<formato>", endpoint="admin.analytics_chart")
+@admin_requerido
+def admin_analytics_chart(grafico: str, formato: str):
+    tipo = _GRAFICOS_ANALITICAS.get(grafico)
+    if tipo is None or formato not in GeneradorAnaliticas.FORMATOS_GRAFICO:
+        abort(404)
+    usuario_admin: UsuarioAdmin = current_user
+    departamentos = Departamento.obtener_para_admin(usuario_admin)
+    rango = _leer_rango_actividad() if tipo == "actividad" else {}
+    datos = GeneradorAnaliticas.obtener_datos_grafico(tipo, departamentos, **rango)
+    huella = GeneradorAnaliticas.huella_grafico(tipo, datos, formato)
+
+    respuesta = Response(mimetype=GeneradorAnaliticas.FORMATOS_GRAFICO[formato])
+    # Sólo ETag: la huella cambia con los datos dibujados, incluida una derivación
+    respuesta.set_etag(huella)
+    respuesta.cache_control.private = True
+    if request.args.get("v") == huella:
+        # La URL lleva la huella: si los datos cambian, la página pide otra URL
+        respuesta.cache_control.max_age = 86400
+    else:
+        respuesta.cache_control.no_cache = True
+
+    # Si el navegador ya tiene esta versión se responde 304 sin dibujar nada
+    respuesta.make_conditional(request)
+    if respuesta.status_code == 304:
+        return respuesta
+    try:
+        imagen = renderizador_graficos.renderizar(tipo, datos, formato)
+    except GraficoNoDisponible:
+        # El gráfico sigue dibujándose; se muestra una imagen provisoria que no se cachea
+        return Response(
+            IMAGEN_PROVISORIA, mimetype="image/svg+xml",
+            headers={"Cache-Control": "no-store", "Retry-After": "2"},
+        )
+    if imagen is None:
+        abort(404)
+    respuesta.set_data(imagen)
+    return respuesta
+
+
 @app.route("/admin/reports", endpoint="admin.reports")
 def admin_reports():
     usuario_admin: UsuarioAdmin = current_user
     departamentos = Departamento.obtener_para_admin(usuario_admin)
-    return render_template("admin/reports.html", departments=departamentos)
+    trabajo = _obtener_trabajo_reporte(request.args.get("job")) if request.args.get("job") else None
+    return render_template("admin/reports.html", departments=departamentos, report_job=trabajo)
 
 
 @app.route("/admin/reports/download", endpoint="admin.download_report")
@@ -248,20 +423,54 @@ def admin_download_report():
     departamentos = Departamento.obtener_para_admin(usuario_admin)
     formato_reporte = request.args.get("format", "html")
 
+    if formato_reporte == "pdf":
+        # El PDF se genera en segundo plano; si ya está en disco se envía directamente
+        trabajo = trabajos_reportes.solicitar(departamentos, usuario_admin.es_secretario_tecnico)
+        if trabajo.estado is EstadoTrabajo.LISTO:
+            return _enviar_reporte_pdf(trabajo)
+        if trabajo.estado is EstadoTrabajo.ERROR:
+            flash("No se pudo generar el reporte.", "error")
+            return redirect(url_for("admin.reports"))
+        return redirect(url_for("admin.reports", job=trabajo.clave))
+
     reporte = crear_reporte(formato_reporte, departamentos, usuario_admin.es_secretario_tecnico)
-    contenido = reporte.generar()
-    tipo_contenido = "application/pdf" if formato_reporte == "pdf" else "text/html"
-    if contenido is None:
-        flash("No se pudo generar el reporte.", "error")
-        return redirect(url_for("admin.reports"))
+    # El HTML se envía a medida que se genera, sin armarlo entero en memoria
+    contenido = stream_with_context(reporte.generar_stream())
     return Response(
-        contenido, mimetype=tipo_contenido,
+        contenido, mimetype="text/html",
         headers={
-            f"Content-Disposition": f"attachment; filename=reporte_reclamos_{datetime.now().strftime('%Y%m%d_%H%M%S')}.{'pdf' if formato_reporte == 'pdf' else 'html'}"
+            f"Content-Disposition": f"attachment; filename=reporte_reclamos_{datetime.now().strftime('%Y%m%d_%H%M%S')}.html"
         },
     )
 
 
+@app.route("/admin/reports/jobs/<clave>", endpoint="admin.report_job")
+@admin_requerido
+def admin_report_job(clave: str):
+    trabajo = _obtener_trabajo_reporte(clave)
+    if trabajo is None:
+        abort(404)
+    listo = trabajo.estado is EstadoTrabajo.LISTO
+    return jsonify({
+        "id": trabajo.clave,
+        "status": trabajo.estado.value,
+        "created_at": trabajo.creado_en.isoformat(),
+        "finished_at": trabajo.terminado_en.isoformat() if trabajo.terminado_en else None,
+        "download_url": url_for("admin.report_job_download", clave=trabajo.clave) if listo else None,
+    })
+
+
+@app.route("/admin/reports/jobs/<clave>/download", endpoint="admin.report_job_download")
+@admin_requerido
+def admin_report_job_download(clave: str):
+    trabajo = _obtener_trabajo_reporte(clave)
+    if trabajo is None:
+        abort(404)
+    if trabajo.estado is not EstadoTrabajo.LISTO:
+        return redirect(url_for("admin.reports", job=trabajo.clave))
+    return _enviar_reporte_pdf(trabajo)
+
+
 @app.route(
     "/admin/claims/<int:claim_id>/transfers", methods=["GET", "POST"], endpoint="admin.transfers",
 )
@@ -321,8 +530,13 @@ def claims_list():
         ruta_imagen = reclamo_pendiente.get("image_path")
         session.pop("pending_claim", None)
 
+        # Departamento ya clasificado en la vista previa (queda en el cache de
+        # clasificaciones del servidor); si no llegó a clasificarse, lo hace la cola
+        departamento_id = Reclamo.obtener_departamento_clasificado(detalle) if detalle else None
+
         reclamo, error = Reclamo.crear(
-            usuario_id=current_user.id, detalle=detalle, ruta_imagen=ruta_imagen,
+            usuario_id=current_user.id, detalle=detalle, departamento_id=departamento_id,
+            ruta_imagen=ruta_imagen,
         )
 
         if error or not reclamo:
@@ -346,7 +560,7 @@ def claims_list():
             flash("Estado de reclamo no válido", "error")
 
     reclamos = Reclamo.obtener_todos_con_filtros(
-        filtro_departamento=filtro_departamento, filtro_estado=estado_enum
+        filtro_departamento=filtro_departamento, filtro_estado=estado_enum, precargar=True
     )
     departamentos = Departamento.obtener_todos()
 
@@ -372,14 +586,25 @@ def claims_preview():
         return redirect(url_for("claims.new"))
 
     ruta_imagen = _manejar_subida_imagen()
+    # La clasificación corre mientras se buscan similares y guarda su resultado
+    # en el cache de clasificaciones; al confirmar no hace falta invocar al modelo
+    clasificacion = cola_clasificacion.anticipar(detalle)
     reclamos_similares = buscador_similitud.buscar_reclamos_similares(texto=detalle)
+    ids_similares = {reclamo.id for reclamo, _ in reclamos_similares}
+    casi_duplicados = [
+        (reclamo, similitud)
+        for reclamo, similitud in BandaLSH.buscar_casi_duplicados(detalle)
+        if reclamo.id not in ids_similares
+    ]
 
-    session["pending_claim"] = {
-        "detail": detalle, "image_path": ruta_imagen,
-    }
+    # Se espera a lo sumo el presupuesto del clasificador; si no termina a
+    # tiempo, el reclamo se clasifica en la cola después de confirmarlo
+    wait([clasificacion], timeout=app.config.get("CLASIFICACION_PRESUPUESTO_SEGUNDOS"))
+    session["pending_claim"] = {"detail": detalle, "image_path": ruta_imagen}
 
     return render_template(
-        "claims/preview.html", detail=detalle, similar_claims=reclamos_similares, image_path=ruta_imagen,
+        "claims/preview.html", detail=detalle, similar_claims=reclamos_similares,
+        near_duplicates=casi_duplicados, image_path=ruta_imagen,
     )
 
 
@@ -452,14 +677,14 @@ def claims_update_status(id: int):
 @app.route("/users/me/claims", methods=["GET"], endpoint="users.my_claims")
 @usuario_final_requerido
 def users_my_claims():
-    reclamos = Reclamo.obtener_por_usuario(current_user.id)
+    reclamos = Reclamo.obtener_por_usuario(current_user.id, precargar=True)
     return render_template("users/my_claims.html", claims=reclamos)
 
 
 @app.route("/users/me/supported-claims", methods=["GET"], endpoint="users.my_supported_claims")
 @usuario_final_requerido
 def users_my_supported_claims():
-    reclamos = Reclamo.obtener_adheridos_por_usuario(current_user.id)
+    reclamos = Reclamo.obtener_adheridos_por_usuario(current_user.id, precargar=True)
     return render_template("users/my_supported_claims.html", claims=reclamos)
 
 
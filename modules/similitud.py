@@ -3,27 +3,104 @@ Detector de reclamos similares usando TF-IDF y similitud coseno.
 """
 
 from __future__ import annotations
+import heapq
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from typing import TYPE_CHECKING
-from sklearn.feature_extraction.text import TfidfVectorizer
-from sklearn.metrics.pairwise import cosine_similarity
-from modules.utils.constantes import STOPWORDS_ESPANOL
-from modules.utils.texto import normalizar_texto
+from modules.indice_similitud import IndiceSimilitud, VocabularioSimilitud
 
 if TYPE_CHECKING:
     from modules.reclamo import Reclamo
 
 
 class BuscadorSimilitud:
-    """Buscador de reclamos similares"""
+    """
+    Buscador de reclamos similares.
+
+    El índice está particionado por departamento: cada partición se construye
+    la primera vez que se consulta y puede reconstruirse por separado. Una
+    consulta sin departamento se reparte entre las particiones en un pool de
+    hilos y se combinan los mejores resultados de cada una.
+
+    Todas las particiones vectorizan con un VocabularioSimilitud común,
+    ajustado sobre los reclamos pendientes de todos los departamentos: con
+    vocabulario e IDF propios los puntajes de particiones distintas no serían
+    comparables al combinarlos.
+
+    Los cambios hechos fuera de este proceso sin pasar por sincronizar_reclamo
+    se detectan con VersionSimilitud: al consultar, las particiones cuya
+    versión quedó atrás se reconstruyen.
+    """
+
+    MAX_HILOS_CONSULTA = 4
 
     def __init__(self):
-        self.vectorizador = TfidfVectorizer(
-            stop_words=STOPWORDS_ESPANOL,
-            min_df=1,
-            ngram_range=(1, 2),
-            max_features=1000,
-            preprocessor=normalizar_texto,
-        )
+        self.__lock = threading.Lock()
+        self.__lock_vocabulario = threading.Lock()
+        self.__particiones: dict[int, IndiceSimilitud] = {}
+        # Versión de VersionSimilitud con la que se construyó cada partición
+        self.__versiones: dict[int, int] = {}
+        self.__vocabulario = VocabularioSimilitud()
+        self.__pool: ThreadPoolExecutor | None = None
+
+    def construir_indice(self) -> None:
+        """Construye las particiones de todos los departamentos."""
+        from modules.departamento import Departamento
+
+        for departamento in Departamento.obtener_todos():
+            self.reconstruir_departamento(departamento.id)
+
+    def reconstruir_departamento(self, departamento_id: int, version: int | None = None) -> IndiceSimilitud:
+        """Reconstruye sólo la partición del departamento indicado."""
+        from modules.reclamo import Reclamo
+        from modules.version_similitud import VersionSimilitud
+
+        # La versión se lee antes que los reclamos: si cambia en el medio, la
+        # próxima consulta vuelve a reconstruir
+        if version is None:
+            version = VersionSimilitud.obtener([departamento_id])[departamento_id]
+        self.__asegurar_vocabulario()
+        reclamos = Reclamo.obtener_pendientes(filtro_departamento_id=departamento_id)
+        particion = IndiceSimilitud(self.__vocabulario)
+        particion.construir([(r.id, r.detalle) for r in reclamos])
+        with self.__lock:
+            self.__particiones[departamento_id] = particion
+            self.__versiones[departamento_id] = version
+        return particion
+
+    def particion(self, departamento_id: int) -> IndiceSimilitud | None:
+        """Devuelve la partición del departamento si ya fue construida."""
+        return self.__particiones.get(departamento_id)
+
+    def reiniciar(self) -> None:
+        with self.__lock:
+            self.__particiones = {}
+            self.__versiones = {}
+            self.__vocabulario = VocabularioSimilitud()
+
+    def sincronizar_reclamo(
+        self, reclamo: "Reclamo", departamento_anterior_id: int | None = None
+    ) -> None:
+        """
+        Refleja en el índice el estado actual de un reclamo ya persistido.
+        Si el reclamo cambió de departamento, se quita de la partición anterior.
+        """
+        from modules.reclamo import EstadoReclamo
+
+        if departamento_anterior_id is not None and departamento_anterior_id != reclamo.departamento_id:
+            anterior = self.particion(departamento_anterior_id)
+            if anterior is not None:
+                anterior.quitar(reclamo.id)
+
+        actual = self.particion(reclamo.departamento_id)
+        if actual is None:
+            return
+        if reclamo.estado == EstadoReclamo.PENDIENTE:
+            if reclamo.id not in actual:
+                self.__vocabulario.registrar_alta()
+            actual.agregar(reclamo.id, reclamo.detalle)
+        else:
+            actual.quitar(reclamo.id)
 
     def buscar_reclamos_similares(
         self,
@@ -35,31 +112,74 @@ class BuscadorSimilitud:
         if not texto or not texto.strip():
             return []
 
-        from modules.reclamo import Reclamo
+        from modules.reclamo import Reclamo, EstadoReclamo
+        from modules.departamento import Departamento
+        from modules.version_similitud import VersionSimilitud
 
-        reclamos = Reclamo.obtener_pendientes(filtro_departamento_id=departamento_id)
+        if departamento_id is not None:
+            ids_departamentos = [departamento_id]
+        else:
+            ids_departamentos = [d.id for d in Departamento.obtener_todos()]
 
-        if not reclamos:
+        self.__asegurar_vocabulario()
+        versiones = VersionSimilitud.obtener(ids_departamentos)
+        particiones = [
+            self.__particion_vigente(depto_id, versiones[depto_id])
+            for depto_id in ids_departamentos
+        ]
+        resultados = self.__consultar_particiones(particiones, texto, umbral, limite)
+        if not resultados:
             return []
 
-        textos = [texto] + [r.detalle for r in reclamos]
+        # El índice puede ir por detrás de la base: se descartan los reclamos
+        # que ya se resolvieron o se derivaron a otro departamento
+        reclamos = {r.id: r for r in Reclamo.obtener_por_ids([rid for rid, _ in resultados])}
+        return [
+            (reclamos[rid], sim)
+            for rid, sim in resultados
+            if rid in reclamos
+            and reclamos[rid].estado == EstadoReclamo.PENDIENTE
+            and (departamento_id is None or reclamos[rid].departamento_id == departamento_id)
+        ]
 
-        try:
-            matriz_tfidf = self.vectorizador.fit_transform(textos)
-        except ValueError:
-            return []
+    # ── Helpers privados ─────────────────────────────────────────────
 
-        similitudes = cosine_similarity(matriz_tfidf[0:1], matriz_tfidf[1:]).flatten()
+    def __particion_vigente(self, departamento_id: int, version: int) -> IndiceSimilitud:
+        particion = self.particion(departamento_id)
+        if particion is None or self.__versiones.get(departamento_id) != version:
+            particion = self.reconstruir_departamento(departamento_id, version)
+        return particion
 
-        similares = [
-            (reclamos[i], float(sim))
-            for i, sim in enumerate(similitudes)
-            if sim > umbral
-        ]
+    def __asegurar_vocabulario(self) -> None:
+        if not self.__vocabulario.requiere_reajuste():
+            return
+        from modules.reclamo import Reclamo
 
-        similares.sort(key=lambda x: x[1], reverse=True)
+        with self.__lock_vocabulario:
+            if not self.__vocabulario.requiere_reajuste():
+                return
+            self.__vocabulario.ajustar([r.detalle for r in Reclamo.obtener_pendientes()])
 
-        return similares[:limite]
+    def __consultar_particiones(
+        self, particiones: list[IndiceSimilitud], texto: str, umbral: float, limite: int
+    ) -> list[tuple[int, float]]:
+        particiones = [p for p in particiones if len(p) > 0]
+        if not particiones:
+            return []
+        if len(particiones) == 1:
+            return particiones[0].consultar(texto, umbral=umbral, limite=limite)
+
+        if self.__pool is None:
+            with self.__lock:
+                if self.__pool is None:
+                    self.__pool = ThreadPoolExecutor(
+                        max_workers=self.MAX_HILOS_CONSULTA, thread_name_prefix="similitud"
+                    )
+        futuros = [
+            self.__pool.submit(p.consultar, texto, umbral, limite) for p in particiones
+        ]
+        combinados = (resultado for futuro in futuros for resultado in futuro.result())
+        return heapq.nlargest(limite, combinados, key=lambda x: x[1])
 
 
 # Instancia global del buscador de similitud
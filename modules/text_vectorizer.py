@@ -1,9 +1,15 @@
 import numpy as np
+import scipy.sparse as sp
 import spacy
 from sklearn.base import BaseEstimator, TransformerMixin
 
 
 class TextVectorizer(BaseEstimator, TransformerMixin):
+    # Componentes del pipeline de spaCy cuyo resultado nunca se usa
+    UNUSED_COMPONENTS = ("parser", "ner")
+    DEFAULT_BATCH_SIZE = 256
+    DEFAULT_N_PROCESS = 1
+
     def __init__(self, p_language_model='es_core_news_sm'):
         """
         Vectorizador de texto basado en spaCy (para español).
@@ -13,34 +19,66 @@ class TextVectorizer(BaseEstimator, TransformerMixin):
         self.__word2idx = {}
         self.__vocabulary = None
 
-    def __get_tokens(self, texto):
+    def set_token_cache(self, token_cache):
         """
-        Procesa el texto: minúsculas, lematización, eliminación de stopwords y puntuación.
+        Conecta un cache de textos lematizados (ver CacheLemas); None lo desactiva.
+        Los textos presentes en el cache no vuelven a pasar por spaCy.
         """
-        doc = self.__nlp(texto.lower())
+        self.token_cache = token_cache
+        return self
+
+    def __disabled_components(self):
+        return [name for name in self.UNUSED_COMPONENTS if name in self.__nlp.pipe_names]
+
+    @staticmethod
+    def __doc_to_tokens(doc):
         word_tokens = [
             token.lemma_ for token in doc
                 if not token.is_stop and not token.is_punct and not token.is_space and not token.like_num
         ]
         return ' '.join(word_tokens)
 
-    def __text_to_vector(self, texto):
+    def __get_tokens(self, texto):
+        """
+        Procesa el texto: minúsculas, lematización, eliminación de stopwords y puntuación.
+        """
+        doc = self.__nlp(texto.lower(), disable=self.__disabled_components())
+        return self.__doc_to_tokens(doc)
+
+    def tokenize(self, X, batch_size=None, n_process=None):
         """
-        Convierte un texto en un vector de frecuencia de palabras basado en el vocabulario aprendido.
+        Procesa una lista de textos en lotes con nlp.pipe y devuelve sus lemas separados por espacios.
+        batch_size y n_process valen sólo para esta llamada: el vectorizador se comparte entre hilos.
         """
-        word_vector = np.zeros(len(self.__vocabulary), dtype=np.int_)
-        texto = self.__get_tokens(texto)
-        for word in texto.split(" "):
-            idx = self.__word2idx.get(word)
-            if idx is not None:
-                word_vector[idx] += 1
-        return word_vector
+        token_cache = getattr(self, "token_cache", None)
+        if token_cache is None:
+            return self.__tokenize_uncached(X, batch_size, n_process)
+
+        tokens = [token_cache.obtener(texto) for texto in X]
+        missing = [i for i, t in enumerate(tokens) if t is None]
+        if missing:
+            processed = self.__tokenize_uncached([X[i] for i in missing], batch_size, n_process)
+            for i, texto_tokens in zip(missing, processed):
+                tokens[i] = texto_tokens
+                token_cache.guardar(X[i], texto_tokens)
+        return tokens
+
+    def __tokenize_uncached(self, X, batch_size=None, n_process=None):
+        if len(X) == 1:
+            return [self.__get_tokens(X[0])]
+        docs = self.__nlp.pipe(
+            (texto.lower() for texto in X),
+            batch_size=batch_size or self.DEFAULT_BATCH_SIZE,
+            n_process=n_process or self.DEFAULT_N_PROCESS,
+            disable=self.__disabled_components(),
+        )
+        return [self.__doc_to_tokens(doc) for doc in docs]
 
     def fit(self, X, y=None):
         """
         Construye el vocabulario a partir del conjunto de textos de entrenamiento.
         """
-        X_processed = [self.__get_tokens(text) for text in X]
+        X_processed = self.tokenize(X)
 
         words = set()
         for text in X_processed:
@@ -53,11 +91,37 @@ class TextVectorizer(BaseEstimator, TransformerMixin):
 
         return self
 
+    def get_feature_names_out(self, input_features=None):
+        """
+        Devuelve las palabras del vocabulario en el orden de las columnas.
+        """
+        return np.asarray(self.__vocabulary, dtype=object)
+
+    def transform_sparse(self, X, batch_size=None, n_process=None):
+        """
+        Transforma una lista de textos en una matriz CSR de frecuencias de palabras.
+        Sólo se almacenan las palabras presentes, no el vocabulario completo.
+        """
+        indptr = [0]
+        indices = []
+        data = []
+        for text in self.tokenize(X, batch_size, n_process):
+            counts = {}
+            for word in text.split(" "):
+                idx = self.__word2idx.get(word)
+                if idx is not None:
+                    counts[idx] = counts.get(idx, 0) + 1
+            for idx in sorted(counts):
+                indices.append(idx)
+                data.append(counts[idx])
+            indptr.append(len(indices))
+        return sp.csr_matrix(
+            (np.array(data, dtype=np.int_), np.array(indices, dtype=np.int32), np.array(indptr, dtype=np.int32)),
+            shape=(len(X), len(self.__vocabulary)),
+        )
+
     def transform(self, X, y=None):
         """
         Transforma una lista de textos en una matriz de vectores.
         """
-        word_vectors = np.zeros((len(X), len(self.__vocabulary)), dtype=np.int_)
-        for i, text in enumerate(X):
-            word_vectors[i] = self.__text_to_vector(text)
-        return word_vectors
\ No newline at end of file
+        return self.transform_sparse(X).toarray()
\ No newline at end of file
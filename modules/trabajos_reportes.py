@@ -0,0 +1,269 @@
+"""
+Generación de reportes PDF en segundo plano.
+
+Convertir el reporte a PDF con xhtml2pdf puede tardar decenas de segundos.
+En lugar de hacerlo en el request, se encola un trabajo que corre en un pool
+de hilos y guarda el PDF en disco. El hilo arma el HTML (que necesita la base)
+y la conversión, que consume CPU y retiene el GIL, corre en un pool de
+procesos como el de modules/renderizador_graficos.py. La clave del archivo combina los
+departamentos del reporte y la versión de sus datos: mientras los reclamos no
+cambien, pedir de nuevo el mismo reporte lo sirve desde el disco sin
+volver a generarlo, y dos pedidos iguales comparten un único trabajo.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import multiprocessing
+import os
+import threading
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from datetime import datetime as Datetime
+from enum import Enum
+
+from flask import Flask, current_app
+
+from modules.departamento import Departamento
+
+RUTA_REPORTES = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data", "reportes"
+)
+
+
+def _iniciar_proceso():
+    # xhtml2pdf se importa una vez por proceso, no en cada reporte
+    try:
+        from xhtml2pdf import pisa  # noqa: F401
+    except ImportError:
+        pass
+
+
+class EstadoTrabajo(Enum):
+    """Estado de un trabajo de reporte"""
+
+    EN_COLA = "en_cola"
+    EN_CURSO = "en_curso"
+    LISTO = "listo"
+    ERROR = "error"
+
+
+class TrabajoReporte:
+    """Pedido de un reporte PDF; su id es la clave del archivo en disco."""
+
+    def __init__(self, clave: str, departamento_ids: list[int], es_secretario_tecnico: bool):
+        self.clave = clave
+        self.departamento_ids = departamento_ids
+        self.es_secretario_tecnico = es_secretario_tecnico
+        self.estado = EstadoTrabajo.EN_COLA
+        self.creado_en = Datetime.now()
+        self.terminado_en: Datetime | None = None
+
+    def __repr__(self):
+        return f"<TrabajoReporte {self.clave} {self.estado.value}>"
+
+
+class TrabajosReportes:
+    """
+    Cola de trabajos de reportes PDF con un pool de hilos y almacenamiento en disco.
+
+    La cantidad de hilos, y de procesos para la conversión a PDF, se toma de
+    REPORTES_TRABAJADORES en la configuración de la app; con 0 el reporte se
+    genera entero en el hilo que lo pide (lo que usan los tests). En disco se guardan hasta `max_bytes_disco` bytes, tras lo cual
+    se borran los reportes usados hace más tiempo.
+    """
+
+    TRABAJADORES_POR_DEFECTO = 1
+    MAX_BYTES_DISCO = 200 * 1024 * 1024
+    # Trabajos terminados que se recuerdan para responder las consultas de estado
+    MAX_TRABAJOS = 256
+
+    def __init__(self, directorio: str = RUTA_REPORTES, max_bytes_disco: int = MAX_BYTES_DISCO):
+        self.directorio = directorio
+        self.max_bytes_disco = max_bytes_disco
+        self.__lock = threading.Lock()
+        self.__pool: ThreadPoolExecutor | None = None
+        self.__pool_procesos: ProcessPoolExecutor | None = None
+        self.__trabajos: OrderedDict[str, TrabajoReporte] = OrderedDict()
+
+    def __len__(self) -> int:
+        with self.__lock:
+            return sum(
+                1 for trabajo in self.__trabajos.values()
+                if trabajo.estado in (EstadoTrabajo.EN_COLA, EstadoTrabajo.EN_CURSO)
+            )
+
+    @staticmethod
+    def clave(departamentos: list[Departamento], es_secretario_tecnico: bool) -> str:
+        """Huella de los departamentos, del tipo de reporte y de la versión de los datos."""
+        from modules.reclamo import Reclamo
+
+        contenido = json.dumps({
+            "departamentos": sorted(d.id for d in departamentos),
+            "secretario_tecnico": es_secretario_tecnico,
+            "version": Reclamo.obtener_version_datos(departamentos),
+        }, sort_keys=True)
+        return hashlib.blake2b(contenido.encode("utf-8"), digest_size=16).hexdigest()
+
+    def solicitar(self, departamentos: list[Departamento], es_secretario_tecnico: bool) -> TrabajoReporte:
+        """
+        Devuelve el trabajo del reporte. Si el PDF ya está en disco el trabajo
+        está listo sin generar nada; si ya hay un trabajo igual en curso se
+        devuelve ese. Debe llamarse dentro de un contexto de la app.
+        """
+        clave = self.clave(departamentos, es_secretario_tecnico)
+        with self.__lock:
+            trabajo = self.__trabajos.get(clave)
+            if trabajo is not None and trabajo.estado is not EstadoTrabajo.ERROR:
+                if trabajo.estado is not EstadoTrabajo.LISTO or self.obtener_archivo(clave):
+                    self.__trabajos.move_to_end(clave)
+                    return trabajo
+            trabajo = TrabajoReporte(clave, [d.id for d in departamentos], es_secretario_tecnico)
+            if self.obtener_archivo(clave) is not None:
+                trabajo.estado = EstadoTrabajo.LISTO
+                trabajo.terminado_en = trabajo.creado_en
+            self.__recordar(trabajo)
+        if trabajo.estado is EstadoTrabajo.LISTO:
+            return trabajo
+
+        app = current_app._get_current_object()
+        trabajadores = app.config.get("REPORTES_TRABAJADORES", self.TRABAJADORES_POR_DEFECTO)
+        if trabajadores <= 0:
+            self.__generar(app, trabajo, None)
+        else:
+            self.__obtener_pool(trabajadores).submit(self.__generar, app, trabajo, trabajadores)
+        return trabajo
+
+    def obtener(self, clave: str) -> TrabajoReporte | None:
+        return self.__trabajos.get(clave)
+
+    def obtener_archivo(self, clave: str) -> str | None:
+        """Ruta del PDF en disco, o None si no existe."""
+        ruta = self.__ruta(clave)
+        try:
+            # La fecha de modificación hace de "último uso" para el desalojo
+            os.utime(ruta)
+        except OSError:
+            return None
+        return ruta
+
+    def reiniciar(self) -> None:
+        """Olvida los trabajos y cierra el pool (para tests). No borra los archivos."""
+        with self.__lock:
+            pool, self.__pool = self.__pool, None
+            pool_procesos, self.__pool_procesos = self.__pool_procesos, None
+            self.__trabajos.clear()
+        for pool in (pool, pool_procesos):
+            if pool is not None:
+                pool.shutdown(wait=False, cancel_futures=True)
+
+    # ── Helpers privados ─────────────────────────────────────────────
+
+    def __recordar(self, trabajo: TrabajoReporte) -> None:
+        # Se llama con el lock tomado
+        self.__trabajos[trabajo.clave] = trabajo
+        self.__trabajos.move_to_end(trabajo.clave)
+        while len(self.__trabajos) > self.MAX_TRABAJOS:
+            clave, anterior = next(iter(self.__trabajos.items()))
+            if anterior.estado in (EstadoTrabajo.EN_COLA, EstadoTrabajo.EN_CURSO):
+                break
+            del self.__trabajos[clave]
+
+    def __generar(self, app: Flask, trabajo: TrabajoReporte, procesos: int | None) -> None:
+        from modules.generador_reportes import ReporteHTML
+
+        # El estado lo leen otros hilos (solicitar, las rutas de estado)
+        with self.__lock:
+            trabajo.estado = EstadoTrabajo.EN_CURSO
+        try:
+            with app.app_context():
+                departamentos = [
+                    departamento for departamento in map(Departamento.obtener_por_id, trabajo.departamento_ids)
+                    if departamento is not None
+                ]
+                contenido_html = ReporteHTML(departamentos, trabajo.es_secretario_tecnico).generar()
+            pdf = self.__convertir(contenido_html, procesos)
+            if pdf is None:
+                app.logger.error("No se pudo convertir a PDF el reporte %s", trabajo.clave)
+            else:
+                self.__escribir(trabajo.clave, pdf)
+        except Exception:
+            # Un fallo no debe detener al trabajador: se registra, el trabajo queda
+            # en error y el próximo pedido del mismo reporte lo vuelve a encolar
+            app.logger.exception("Falló la generación del reporte %s", trabajo.clave)
+            pdf = None
+        with self.__lock:
+            trabajo.terminado_en = Datetime.now()
+            trabajo.estado = EstadoTrabajo.ERROR if pdf is None else EstadoTrabajo.LISTO
+
+    def __convertir(self, contenido_html: str, procesos: int | None) -> bytes | None:
+        from modules.generador_reportes import ReportePDF
+
+        if procesos is None:
+            return ReportePDF.convertir_html(contenido_html)
+        with self.__lock:
+            pool = self.__obtener_pool_procesos(procesos)
+        try:
+            return pool.submit(ReportePDF.convertir_html, contenido_html).result()
+        except BrokenProcessPool:
+            # Un proceso murió: el próximo reporte crea un pool nuevo
+            with self.__lock:
+                if self.__pool_procesos is pool:
+                    self.__pool_procesos = None
+            raise
+
+    def __ruta(self, clave: str) -> str:
+        return os.path.join(self.directorio, f"{clave}.pdf")
+
+    def __escribir(self, clave: str, pdf: bytes) -> None:
+        os.makedirs(self.directorio, exist_ok=True)
+        temporal = f"{self.__ruta(clave)}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(temporal, "wb") as archivo:
+            archivo.write(pdf)
+        os.replace(temporal, self.__ruta(clave))
+        self.__desalojar_disco()
+
+    def __desalojar_disco(self) -> None:
+        archivos = []
+        for entrada in os.scandir(self.directorio):
+            if entrada.name.endswith(".pdf"):
+                try:
+                    estado = entrada.stat()
+                except OSError:
+                    continue
+                archivos.append((entrada.path, estado.st_size, estado.st_mtime))
+        total = sum(tamano for _, tamano, _ in archivos)
+        for ruta, tamano, _ in sorted(archivos, key=lambda a: a[2]):
+            if total <= self.max_bytes_disco:
+                return
+            try:
+                os.remove(ruta)
+            except OSError:
+                continue
+            total -= tamano
+
+    def __obtener_pool(self, trabajadores: int) -> ThreadPoolExecutor:
+        if self.__pool is None:
+            with self.__lock:
+                if self.__pool is None:
+                    self.__pool = ThreadPoolExecutor(
+                        max_workers=trabajadores, thread_name_prefix="reportes"
+                    )
+        return self.__pool
+
+    def __obtener_pool_procesos(self, procesos: int) -> ProcessPoolExecutor:
+        # Se llama con el lock tomado. Se usa "spawn" porque el proceso web
+        # tiene hilos y fork no es seguro
+        if self.__pool_procesos is None:
+            self.__pool_procesos = ProcessPoolExecutor(
+                max_workers=procesos,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_iniciar_proceso,
+            )
+        return self.__pool_procesos
+
+
+# Instancia global de los trabajos de reportes
+trabajos_reportes = TrabajosReportes()
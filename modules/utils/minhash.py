@@ -0,0 +1,65 @@
+"""Firmas MinHash y bandas LSH para detectar textos casi idénticos."""
+
+from __future__ import annotations
+
+import re
+import zlib
+
+import numpy as np
+
+from modules.utils.texto import normalizar_texto
+
+NUM_PERMUTACIONES = 64
+NUM_BANDAS = 16
+FILAS_POR_BANDA = NUM_PERMUTACIONES // NUM_BANDAS
+TAMANO_SHINGLE = 4
+
+# Primo de Mersenne 2^31 - 1: a * h < 2^62 no desborda uint64.
+_PRIMO = np.uint64((1 << 31) - 1)
+_generador = np.random.RandomState(20240601)
+_COEF_A = _generador.randint(1, (1 << 31) - 1, size=NUM_PERMUTACIONES).astype(np.uint64)
+_COEF_B = _generador.randint(0, (1 << 31) - 1, size=NUM_PERMUTACIONES).astype(np.uint64)
+
+
+def _shingles(texto: str) -> set[str]:
+    texto = re.sub(r"[^\w]+", " ", normalizar_texto(texto)).strip()
+    if len(texto) <= TAMANO_SHINGLE:
+        return {texto} if texto else set()
+    return {texto[i:i + TAMANO_SHINGLE] for i in range(len(texto) - TAMANO_SHINGLE + 1)}
+
+
+def calcular_firma(texto: str) -> np.ndarray | None:
+    """
+    Devuelve la firma MinHash (NUM_PERMUTACIONES valores uint32) del texto, o
+    None si no tiene ningún shingle (todos esos textos tendrían la misma firma).
+    """
+    shingles = _shingles(texto)
+    if not shingles:
+        return None
+    hashes = np.fromiter(
+        (zlib.crc32(s.encode("utf-8")) for s in shingles), dtype=np.uint64, count=len(shingles)
+    ) % _PRIMO
+    permutados = (np.outer(hashes, _COEF_A) + _COEF_B) % _PRIMO
+    return permutados.min(axis=0).astype(np.uint32)
+
+
+def firma_a_bytes(firma: np.ndarray) -> bytes:
+    return firma.astype("<u4").tobytes()
+
+
+def firma_desde_bytes(datos: bytes) -> np.ndarray:
+    return np.frombuffer(datos, dtype="<u4")
+
+
+def calcular_bandas(firma: np.ndarray) -> list[int]:
+    """Agrupa la firma en NUM_BANDAS y devuelve el hash de cada banda."""
+    datos = firma.astype("<u4")
+    return [
+        zlib.crc32(datos[i * FILAS_POR_BANDA:(i + 1) * FILAS_POR_BANDA].tobytes())
+        for i in range(NUM_BANDAS)
+    ]
+
+
+def similitud_estimada(firma_a: np.ndarray, firma_b: np.ndarray) -> float:
+    """Estimación de la similitud de Jaccard entre los textos de ambas firmas."""
+    return float(np.mean(firma_a == firma_b))
@@ -2,8 +2,13 @@
 
 from __future__ import annotations
 
+import re
 import unicodedata
 
+from modules.utils.constantes import STOPWORDS_ESPANOL_SET
+
+_PATRON_PALABRA = re.compile(r"\b\w+\b")
+
 
 def normalizar_texto(texto: str) -> str:
     """
@@ -14,3 +19,15 @@ def normalizar_texto(texto: str) -> str:
         c for c in unicodedata.normalize("NFD", texto) if unicodedata.category(c) != "Mn"
     )
     return texto
+
+
+def extraer_palabras_clave(texto: str) -> list[str]:
+    """
+    Palabras del texto normalizado, sin stopwords, números ni palabras de
+    menos de tres letras.
+    """
+    return [
+        p
+        for p in _PATRON_PALABRA.findall(normalizar_texto(texto))
+        if p not in STOPWORDS_ESPANOL_SET and len(p) > 2 and not p.isdigit()
+    ]
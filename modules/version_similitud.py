@@ -0,0 +1,54 @@
+from __future__ import annotations
+
+from sqlalchemy import ForeignKey, select
+from sqlalchemy.dialects.sqlite import insert
+from sqlalchemy.orm import Mapped, mapped_column
+
+from modules.config import db
+
+
+class VersionSimilitud(db.Model):
+    """
+    Versión de la partición de similitud de cada departamento.
+
+    Los procesos que mueven reclamos en bloque sin pasar por el buscador de
+    similitud (p. ej. reclasificar_reclamos.py) incrementan la versión de los
+    departamentos afectados; cada servidor compara estas versiones con las de
+    sus particiones en memoria al consultar y reconstruye las que quedaron
+    atrás. Un departamento sin fila tiene versión 0.
+    """
+
+    __tablename__ = "version_similitud"
+
+    departamento_id: Mapped[int] = mapped_column(ForeignKey("departamento.id"), primary_key=True)
+    version: Mapped[int] = mapped_column(default=0, nullable=False)
+
+    def __init__(self, departamento_id: int, version: int = 0):
+        self.departamento_id = departamento_id
+        self.version = version
+
+    def __repr__(self):
+        return f"<VersionSimilitud depto={self.departamento_id} v{self.version}>"
+
+    @staticmethod
+    def incrementar(departamento_ids) -> None:
+        """Invalida las particiones de los departamentos indicados. No hace commit."""
+        filas = [{"departamento_id": departamento_id, "version": 1} for departamento_id in set(departamento_ids)]
+        if not filas:
+            return
+        sentencia = insert(VersionSimilitud).values(filas)
+        db.session.execute(sentencia.on_conflict_do_update(
+            index_elements=[VersionSimilitud.departamento_id],
+            set_={"version": VersionSimilitud.version + 1},
+        ))
+
+    @staticmethod
+    def obtener(departamento_ids: list[int]) -> dict[int, int]:
+        """Devuelve {departamento_id: version}; los que no tienen fila quedan en 0."""
+        versiones = dict.fromkeys(departamento_ids, 0)
+        if departamento_ids:
+            versiones.update(db.session.execute(
+                select(VersionSimilitud.departamento_id, VersionSimilitud.version)
+                .where(VersionSimilitud.departamento_id.in_(departamento_ids))
+            ).all())
+        return versiones
@@ -0,0 +1,200 @@
+"""
+Script para volver a clasificar los reclamos existentes con el modelo actual.
+Ejecutar después de reemplazar data/claims_clf.pkl.
+
+Los reclamos se recorren por id en bloques; los textos que no están en la
+caché de clasificación se clasifican en un pool de procesos, donde cada
+proceso carga el modelo una sola vez. Los cambios de
+departamento se escriben en bloque y el avance se guarda en un archivo de
+control, de modo que una ejecución interrumpida continúa donde quedó. Los
+reclamos derivados a mano no se tocan.
+
+Los servidores en marcha no se enteran de los movimientos en sus índices de
+similitud en memoria: cada bloque incrementa VersionSimilitud de los
+departamentos afectados, y cada servidor reconstruye esas particiones en su
+siguiente búsqueda de similares. No hace falta reiniciarlos.
+"""
+
+import argparse
+import json
+import os
+from collections import Counter, deque
+from concurrent.futures import Future, ProcessPoolExecutor
+
+from sqlalchemy import select, update
+
+from modules.config import create_app, db
+from modules.cache_clasificacion import CacheClasificacion
+from modules.clasificador import Clasificador
+from modules.conteo_reclamos import ConteoReclamos
+from modules.frecuencia_palabra import FrecuenciaPalabra
+from modules.metrica_resolucion import MetricaResolucion
+from modules.departamento import Departamento
+from modules.derivacion_reclamo import DerivacionReclamo
+from modules.reclamo import Reclamo
+from modules.version_similitud import VersionSimilitud
+from modules.utils.texto import extraer_palabras_clave
+
+RUTA_CONTROL = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "reclasificacion.json")
+TAMANO_BLOQUE = 500
+
+# Clasificador del proceso trabajador, creado por _iniciar_trabajador
+_clasificador: Clasificador | None = None
+
+
+def _iniciar_trabajador():
+    global _clasificador
+    _clasificador = Clasificador()
+
+
+def _clasificar_bloque(textos: list[str]) -> list[str]:
+    return _clasificador.clasificar_lote(textos)
+
+
+def _leer_control(ruta: str, huella: dict) -> dict:
+    if os.path.exists(ruta):
+        with open(ruta, encoding="utf-8") as archivo:
+            control = json.load(archivo)
+        # Un archivo de control de otro modelo no sirve para retomar
+        if control.get("modelo") == huella:
+            return control
+    return {"modelo": huella, "ultimo_id": 0, "procesados": 0, "reasignados": 0}
+
+
+def _guardar_control(ruta: str, control: dict) -> None:
+    os.makedirs(os.path.dirname(ruta), exist_ok=True)
+    temporal = f"{ruta}.tmp"
+    with open(temporal, "w", encoding="utf-8") as archivo:
+        json.dump(control, archivo)
+    os.replace(temporal, ruta)
+
+
+def _leer_bloques(desde_id: int, tamano_bloque: int):
+    """Genera bloques de filas (id, detalle, departamento_id, estado, clasificacion_pendiente) ordenados por id."""
+    derivados = select(DerivacionReclamo.reclamo_id)
+    ultimo_id = desde_id
+    while True:
+        filas = db.session.execute(
+            select(
+                Reclamo.id, Reclamo.detalle, Reclamo.departamento_id, Reclamo.estado,
+                Reclamo.clasificacion_pendiente,
+            )
+            .where(Reclamo.id > ultimo_id, Reclamo.id.not_in(derivados))
+            .order_by(Reclamo.id)
+            .limit(tamano_bloque)
+        ).all()
+        if not filas:
+            return
+        ultimo_id = filas[-1].id
+        yield filas
+
+
+def _aplicar_bloque(filas, nombres_predichos: list[str], ids_por_nombre: dict[str, int]) -> int:
+    cambios = []
+    deltas: dict = {}
+    deltas_palabras: Counter = Counter()
+    movidos: list[int] = []
+    departamentos_afectados: set[int] = set()
+    for fila, nombre in zip(filas, nombres_predichos):
+        departamento_id = ids_por_nombre.get(nombre, fila.departamento_id)
+        if departamento_id != fila.departamento_id:
+            movidos.append(fila.id)
+            departamentos_afectados.update((fila.departamento_id, departamento_id))
+            deltas[(fila.departamento_id, fila.estado)] = deltas.get((fila.departamento_id, fila.estado), 0) - 1
+            deltas[(departamento_id, fila.estado)] = deltas.get((departamento_id, fila.estado), 0) + 1
+            for palabra in extraer_palabras_clave(fila.detalle):
+                deltas_palabras[(fila.departamento_id, palabra)] -= 1
+                deltas_palabras[(departamento_id, palabra)] += 1
+        if departamento_id != fila.departamento_id or fila.clasificacion_pendiente:
+            cambios.append({
+                "id": fila.id, "departamento_id": departamento_id, "clasificacion_pendiente": False,
+            })
+    if cambios:
+        db.session.execute(update(Reclamo), cambios)
+        ConteoReclamos.ajustar_varios(deltas)
+        FrecuenciaPalabra.ajustar_varios(dict(deltas_palabras))
+        MetricaResolucion.mover(movidos, departamentos_afectados)
+        VersionSimilitud.incrementar(departamentos_afectados)
+        db.session.commit()
+    return len(movidos)
+
+
+def reclasificar(
+    tamano_bloque: int = TAMANO_BLOQUE,
+    procesos: int | None = None,
+    ruta_control: str = RUTA_CONTROL,
+) -> dict:
+    """
+    Reclasifica los reclamos no derivados; debe llamarse dentro de un contexto
+    de la app. Con procesos=0 se clasifica en el proceso actual.
+    """
+    control = _leer_control(ruta_control, Clasificador.huella_modelo())
+    version_modelo = Clasificador.version_modelo()
+    ids_por_nombre = {d.nombre: d.id for d in Departamento.obtener_todos()}
+    bloques = _leer_bloques(control["ultimo_id"], tamano_bloque)
+
+    def faltantes(filas) -> tuple[dict[str, str], list[str]]:
+        en_cache = CacheClasificacion.obtener_varios([f.detalle for f in filas], version_modelo)
+        return en_cache, [
+            f.detalle for f in filas if CacheClasificacion.calcular_clave(f.detalle) not in en_cache
+        ]
+
+    def registrar(filas, en_cache, textos_clasificados, predichos):
+        CacheClasificacion.guardar_varios(list(zip(textos_clasificados, predichos)), version_modelo)
+        for texto, nombre in zip(textos_clasificados, predichos):
+            en_cache[CacheClasificacion.calcular_clave(texto)] = nombre
+        nombres_predichos = [en_cache[CacheClasificacion.calcular_clave(f.detalle)] for f in filas]
+        control["reasignados"] += _aplicar_bloque(filas, nombres_predichos, ids_por_nombre)
+        control["procesados"] += len(filas)
+        control["ultimo_id"] = filas[-1].id
+        _guardar_control(ruta_control, control)
+        print(f"  {control['procesados']} reclamos procesados (último id {control['ultimo_id']})")
+
+    if procesos == 0:
+        _iniciar_trabajador()
+        for filas in bloques:
+            en_cache, textos = faltantes(filas)
+            registrar(filas, en_cache, textos, _clasificar_bloque(textos))
+    else:
+        procesos = procesos or os.cpu_count() or 1
+        with ProcessPoolExecutor(max_workers=procesos, initializer=_iniciar_trabajador) as pool:
+            # Los resultados se aplican en orden de id para que el punto de
+            # control nunca saltee un bloque sin terminar
+            en_curso: deque[tuple[list, dict, list[str], Future]] = deque()
+            for filas in bloques:
+                en_cache, textos = faltantes(filas)
+                en_curso.append((filas, en_cache, textos, pool.submit(_clasificar_bloque, textos)))
+                if len(en_curso) >= 2 * procesos:
+                    *bloque, futuro = en_curso.popleft()
+                    registrar(*bloque, futuro.result())
+            while en_curso:
+                *bloque, futuro = en_curso.popleft()
+                registrar(*bloque, futuro.result())
+
+    if os.path.exists(ruta_control):
+        os.remove(ruta_control)
+    return control
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--tamano-bloque", type=int, default=TAMANO_BLOQUE)
+    parser.add_argument("--procesos", type=int, default=None, help="0 para clasificar sin pool de procesos")
+    parser.add_argument("--control", default=RUTA_CONTROL, help="archivo de control para retomar")
+    argumentos = parser.parse_args()
+
+    if not os.path.exists(Clasificador.RUTA_MODELO):
+        print(f"No se encontró el modelo en {Clasificador.RUTA_MODELO}")
+        return
+
+    app = create_app()
+    with app.app_context():
+        print("\n=== Reclasificando reclamos ===\n")
+        resultado = reclasificar(argumentos.tamano_bloque, argumentos.procesos, argumentos.control)
+        print(f"\n{resultado['procesados']} reclamos procesados, {resultado['reasignados']} reasignados")
+        if resultado["reasignados"]:
+            print("Los servidores en marcha reconstruyen sus índices de similitud en la próxima búsqueda")
+
+
+if __name__ == "__main__":
+    main()
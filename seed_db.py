@@ -8,6 +8,8 @@ from modules.usuario_admin import RolAdmin, UsuarioAdmin
 from modules.reclamo import Reclamo, EstadoReclamo
 from modules.departamento import Departamento
 from modules.usuario_final import Claustro, UsuarioFinal
+from modules.actividad_diaria import ActividadDiaria
+from modules.metrica_resolucion import MetricaResolucion
 
 
 def limpiar_base_datos():
@@ -17,12 +19,28 @@ def limpiar_base_datos():
     from modules.historial_estado_reclamo import HistorialEstadoReclamo
     from modules.adherente_reclamo import AdherenteReclamo
     from modules.derivacion_reclamo import DerivacionReclamo
+    from modules.banda_lsh import BandaLSH
+    from modules.cache_clasificacion import CacheClasificacion
+    from modules.conteo_reclamos import ConteoReclamos
+    from modules.frecuencia_palabra import FrecuenciaPalabra
+    from modules.actividad_diaria import MarcaActividad
+    from modules.metrica_resolucion import MarcaMetricaResolucion
+    from modules.version_similitud import VersionSimilitud
 
     try:
         NotificacionUsuario.query.delete()
         HistorialEstadoReclamo.query.delete()
         AdherenteReclamo.query.delete()
         DerivacionReclamo.query.delete()
+        BandaLSH.query.delete()
+        CacheClasificacion.query.delete()
+        ConteoReclamos.query.delete()
+        FrecuenciaPalabra.query.delete()
+        ActividadDiaria.query.delete()
+        MarcaActividad.query.delete()
+        MetricaResolucion.query.delete()
+        MarcaMetricaResolucion.query.delete()
+        VersionSimilitud.query.delete()
         Reclamo.query.delete()
         UsuarioFinal.query.delete()
         UsuarioAdmin.query.delete()
@@ -310,6 +328,12 @@ def main():
         print("4. Creando reclamos de prueba...")
         conteo_reclamos = crear_reclamos_ejemplo()
         print(f"   {conteo_reclamos} reclamos nuevos creados\n")
+        print("5. Agregando la actividad diaria...")
+        conteo_actividad = ActividadDiaria.actualizar()
+        print(f"   {conteo_actividad} reclamos y cambios de estado agregados\n")
+        print("6. Calculando las métricas de resolución...")
+        conteo_metricas = MetricaResolucion.actualizar()
+        print(f"   {conteo_metricas} departamentos con métricas recalculadas\n")
         print("=== Inicialización completada ===\n")
 
         print("Departamentos en el sistema:")
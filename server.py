@@ -5,10 +5,13 @@ Este módulo importa la app y las rutas, y ejecuta el servidor de desarrollo.
 
 # Import app from config
 from modules.config import app
+from modules.precarga import precalentar
 
 # Import routes to register them with the app
 import modules.rutas  # noqa: F401
 
 
 if __name__ == "__main__":
+    # El modelo y el índice de similitud se cargan en segundo plano
+    precalentar(app)
     app.run(host="0.0.0.0", debug=True)
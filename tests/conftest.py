@@ -18,6 +18,12 @@ class CasoTestBase(unittest.TestCase):
     def setUp(self):
         """Crea la aplicación y base de datos para cada test."""
         from modules.config import create_app, db
+        from modules.similitud import buscador_similitud
+        from modules.cola_clasificacion import cola_clasificacion
+        from modules.clasificador import cortacircuitos_clasificador
+        from modules.cache_graficos import cache_graficos
+        from modules.renderizador_graficos import renderizador_graficos
+        from modules.trabajos_reportes import trabajos_reportes
 
         # Crear aplicación de prueba
         self.app = create_app({
@@ -25,6 +31,12 @@ class CasoTestBase(unittest.TestCase):
             "SQLALCHEMY_DATABASE_URI": "sqlite:///:memory:",
             "WTF_CSRF_ENABLED": False,
             "SECRET_KEY": "test-secret-key",
+            # Sin hilos trabajadores: los tests procesan la cola con drenar()
+            "CLASIFICACION_TRABAJADORES": 0,
+            # Los gráficos se dibujan en el mismo hilo, sin pool de procesos
+            "GRAFICOS_PROCESOS": 0,
+            # Los reportes PDF se generan en el hilo que los pide
+            "REPORTES_TRABAJADORES": 0,
         })
 
         self.app_context = self.app.app_context()
@@ -34,6 +46,16 @@ class CasoTestBase(unittest.TestCase):
         # Crear tablas
         db.create_all()
 
+        # Los índices en memoria no deben sobrevivir entre bases de prueba
+        buscador_similitud.reiniciar()
+        cola_clasificacion.reiniciar()
+        cortacircuitos_clasificador.reiniciar()
+        # Los gráficos de prueba no se escriben en el cache de disco del proyecto
+        cache_graficos.directorio = None
+        cache_graficos.limpiar()
+        renderizador_graficos.reiniciar()
+        trabajos_reportes.reiniciar()
+
         # Crear datos de prueba básicos
         self._crear_departamentos_prueba()
 
@@ -45,6 +67,77 @@ class CasoTestBase(unittest.TestCase):
         db.drop_all()
         self.app_context.pop()
 
+    def _registrar_rutas(self):
+        """Registra en la app de prueba las rutas de modules/rutas.py, definidas sobre la app global."""
+        import modules.rutas  # noqa: F401
+        from modules.config import app
+
+        for regla in app.url_map.iter_rules():
+            if regla.endpoint == "static":
+                continue
+            self.app.add_url_rule(
+                regla.rule, endpoint=regla.endpoint,
+                view_func=app.view_functions[regla.endpoint], methods=regla.methods,
+            )
+        procesadores = self.app.template_context_processors[None]
+        procesadores.extend(p for p in app.template_context_processors[None] if p not in procesadores)
+
+    def _iniciar_sesion(self, usuario_id: int):
+        """Deja al cliente de prueba con la sesión del usuario indicado."""
+        with self.client.session_transaction() as sesion:
+            sesion["_user_id"] = str(usuario_id)
+
+    def _crear_usuarios_finales(self, cantidad: int = 1) -> list:
+        """Crea usuarios finales de prueba (testusuario0, testusuario1, ...)."""
+        from modules.config import db
+        from modules.usuario_final import Claustro, UsuarioFinal
+
+        usuarios = []
+        for i in range(cantidad):
+            usuario = UsuarioFinal(
+                nombre="Test", apellido=f"Usuario{i}",
+                correo=f"usuario{i}@test.com", nombre_usuario=f"testusuario{i}",
+                claustro=Claustro.ESTUDIANTE,
+            )
+            usuario.establecer_contrasena("test123")
+            db.session.add(usuario)
+            usuarios.append(usuario)
+        db.session.commit()
+        return usuarios
+
+    def _crear_admin(self, rol_admin=None, departamento_id: int | None = None):
+        """Crea un admin de prueba; por defecto, el Secretario Técnico."""
+        from modules.usuario_admin import RolAdmin, UsuarioAdmin
+
+        rol_admin = rol_admin or RolAdmin.SECRETARIO_TECNICO
+        if departamento_id is None:
+            departamento_id = self.departamentos_prueba["st_id"]
+        admin, _ = UsuarioAdmin.crear(
+            nombre="Admin", apellido="Test", correo="admin@test.com",
+            nombre_usuario="admin", rol_admin=rol_admin,
+            contrasena="admin123", departamento_id=departamento_id,
+        )
+        return admin
+
+    def _crear_reclamos(
+        self, usuario_ids: list[int], departamento_ids: list[int], cantidad: int,
+    ) -> list[int]:
+        """
+        Crea `cantidad` reclamos "Reclamo de prueba número i", repartidos en
+        orden entre los usuarios y los departamentos. Devuelve sus ids.
+        """
+        from modules.reclamo import Reclamo
+
+        ids = []
+        for i in range(cantidad):
+            reclamo, _ = Reclamo.crear(
+                usuario_id=usuario_ids[i % len(usuario_ids)],
+                detalle=f"Reclamo de prueba número {i}",
+                departamento_id=departamento_ids[i % len(departamento_ids)],
+            )
+            ids.append(reclamo.id)
+        return ids
+
     def _crear_departamentos_prueba(self):
         """Crea departamentos de prueba."""
         from modules.config import db
@@ -0,0 +1,131 @@
+"""
+Tests para la actividad diaria de reclamos por departamento.
+"""
+
+import unittest
+from datetime import date, datetime, timedelta
+
+from tests.conftest import CasoTestBase
+from modules.config import db
+from modules.actividad_diaria import ActividadDiaria
+from modules.generador_analiticas import GeneradorAnaliticas
+from modules.reclamo import Reclamo, EstadoReclamo
+
+
+class TestActividadDiaria(CasoTestBase):
+    """Tests del agregado incremental y de la serie por día o semana."""
+
+    def setUp(self):
+        """Crea un usuario, un admin y dos reclamos en Ciencias."""
+        super().setUp()
+
+        self.usuario_id = self._crear_usuarios_finales()[0].id
+        self.admin_id = self._crear_admin().id
+        self.ciencias = self.departamentos_prueba["depto1_id"]
+
+        self.reclamo_a = self._crear_reclamo("Se rompió el proyector del aula")
+        self.reclamo_b = self._crear_reclamo("No hay agua en el edificio")
+        self.hoy = date.today()
+
+    def _crear_reclamo(self, detalle):
+        """Crea un reclamo en Ciencias y devuelve su id."""
+        reclamo, _ = Reclamo.crear(
+            usuario_id=self.usuario_id, detalle=detalle, departamento_id=self.ciencias,
+        )
+        return reclamo.id
+
+    def _serie_de_hoy(self):
+        """Período de hoy en la serie diaria de Ciencias."""
+        return ActividadDiaria.obtener_serie([self.ciencias], self.hoy, self.hoy)[0]
+
+    def test_agrega_creados_resueltos_e_invalidados(self):
+        """Verifica que se cuentan altas, resoluciones e invalidaciones del día."""
+        Reclamo.actualizar_estado(self.reclamo_a, EstadoReclamo.RESUELTO, self.admin_id)
+        Reclamo.actualizar_estado(self.reclamo_b, EstadoReclamo.INVALIDO, self.admin_id)
+
+        self.assertEqual(ActividadDiaria.actualizar(), 4)
+
+        periodo = self._serie_de_hoy()
+        self.assertEqual(
+            (periodo["creados"], periodo["resueltos"], periodo["invalidados"]), (2, 1, 1)
+        )
+
+    def test_actualizar_solo_agrega_lo_nuevo(self):
+        """Verifica que una segunda ejecución sólo procesa lo posterior a la marca."""
+        ActividadDiaria.actualizar()
+        self.assertEqual(ActividadDiaria.actualizar(), 0)
+
+        self._crear_reclamo("Falta iluminación en el pasillo")
+        Reclamo.actualizar_estado(self.reclamo_a, EstadoReclamo.EN_PROCESO, self.admin_id)
+        self.assertEqual(ActividadDiaria.actualizar(), 1)
+
+        self.assertEqual(self._serie_de_hoy()["creados"], 3)
+
+    def test_reconstruir_da_el_mismo_resultado(self):
+        """Verifica que regenerar la tabla da la misma serie que el agregado incremental."""
+        Reclamo.actualizar_estado(self.reclamo_a, EstadoReclamo.RESUELTO, self.admin_id)
+        ActividadDiaria.actualizar()
+        antes = self._serie_de_hoy()
+
+        ActividadDiaria.reconstruir()
+
+        self.assertEqual(self._serie_de_hoy(), antes)
+
+    def test_usa_la_fecha_de_creacion_y_completa_dias_vacios(self):
+        """Verifica que la serie usa la fecha de creación y rellena con ceros, por día y por semana."""
+        hace_diez_dias = datetime.now() - timedelta(days=10)
+        Reclamo.query.filter_by(id=self.reclamo_b).update({"creado_en": hace_diez_dias})
+        db.session.commit()
+        ActividadDiaria.actualizar()
+
+        serie = ActividadDiaria.obtener_serie([self.ciencias], self.hoy - timedelta(days=13), self.hoy)
+        self.assertEqual(len(serie), 14)
+        self.assertEqual(serie[3]["fecha"], hace_diez_dias.date())
+        self.assertEqual(serie[3]["creados"], 1)
+        self.assertEqual(serie[-1]["creados"], 1)
+
+        semanal = ActividadDiaria.obtener_serie([self.ciencias], self.hoy - timedelta(days=13), self.hoy, "semana")
+        self.assertTrue(all(periodo["fecha"].weekday() == 0 for periodo in semanal))
+        self.assertEqual(sum(periodo["creados"] for periodo in semanal), 2)
+
+    def test_filtra_por_departamento(self):
+        """Verifica que la serie sólo suma los departamentos pedidos."""
+        ActividadDiaria.actualizar()
+        otro = self.departamentos_prueba["depto2_id"]
+        self.assertEqual(ActividadDiaria.obtener_serie([otro], self.hoy, self.hoy)[0]["creados"], 0)
+        self.assertEqual(ActividadDiaria.obtener_serie([], self.hoy, self.hoy)[0]["creados"], 0)
+
+    def test_grafico_de_actividad(self):
+        """Verifica los datos del gráfico de actividad y que sin actividad no hay imagen."""
+        ActividadDiaria.actualizar()
+        datos = GeneradorAnaliticas.obtener_datos_grafico("actividad", None)
+
+        self.assertEqual(len(datos["fechas"]), GeneradorAnaliticas.DIAS_TENDENCIA)
+        self.assertEqual(datos["creados"][-1], 2)
+        self.assertIn(b"<svg", GeneradorAnaliticas.renderizar_grafico("actividad", datos, "svg"))
+
+        sin_actividad = GeneradorAnaliticas.obtener_datos_grafico(
+            "actividad", None, desde=self.hoy - timedelta(days=60), hasta=self.hoy - timedelta(days=40)
+        )
+        self.assertIsNone(GeneradorAnaliticas.renderizar_grafico("actividad", sin_actividad, "svg"))
+
+    def test_ruta_rechaza_rangos_de_mas_de_un_año(self):
+        """Verifica que la ruta de actividad responde 400 si el rango supera un año."""
+        self._registrar_rutas()
+        self._iniciar_sesion(self.admin_id)
+        ruta = "/admin/analytics/activity"
+
+        hace_un_año = (self.hoy - timedelta(days=365)).isoformat()
+        respuesta = self.client.get(ruta, query_string={"from": hace_un_año, "to": self.hoy.isoformat()})
+        self.assertEqual(respuesta.status_code, 200)
+        self.assertEqual(len(respuesta.get_json()), 366)
+
+        mas_de_un_año = (self.hoy - timedelta(days=366)).isoformat()
+        self.assertEqual(self.client.get(ruta, query_string={"from": mas_de_un_año}).status_code, 400)
+        self.assertEqual(
+            self.client.get(ruta, query_string={"from": "2000-01-01", "to": "2001-06-01"}).status_code, 400
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
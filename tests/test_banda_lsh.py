@@ -0,0 +1,105 @@
+"""
+Tests para la detección de reclamos casi duplicados (BandaLSH).
+"""
+
+import unittest
+from tests.conftest import CasoTestBase
+from modules.config import db
+from modules.banda_lsh import BandaLSH
+from modules.reclamo import Reclamo, EstadoReclamo
+from modules.usuario_final import UsuarioFinal, Claustro
+from modules.usuario_admin import UsuarioAdmin, RolAdmin
+from modules.utils.minhash import NUM_BANDAS, calcular_firma, similitud_estimada
+
+
+class TestBandaLSH(CasoTestBase):
+    """Tests para firmas MinHash y buckets LSH."""
+
+    def setUp(self):
+        """Crea usuario, admin y un reclamo de prueba."""
+        super().setUp()
+
+        usuario = UsuarioFinal(
+            nombre="Test", apellido="Usuario",
+            correo="usuario@test.com", nombre_usuario="testusuario",
+            claustro=Claustro.ESTUDIANTE,
+        )
+        usuario.establecer_contrasena("test123")
+        db.session.add(usuario)
+        db.session.commit()
+        self.usuario_id = usuario.id
+
+        admin, _ = UsuarioAdmin.crear(
+            nombre="Admin", apellido="Test", correo="admin@test.com",
+            nombre_usuario="admin", rol_admin=RolAdmin.SECRETARIO_TECNICO,
+            contrasena="admin123", departamento_id=self.departamentos_prueba["st_id"],
+        )
+        self.admin_id = admin.id
+
+        reclamo, _ = Reclamo.crear(
+            usuario_id=self.usuario_id, detalle="No anda el wifi del aula 3",
+            departamento_id=self.departamentos_prueba["depto1_id"],
+        )
+        self.reclamo_id = reclamo.id
+
+    def test_crear_guarda_firma_y_bandas(self):
+        """Verifica que Reclamo.crear persiste la firma y una banda por grupo."""
+        reclamo = Reclamo.obtener_por_id(self.reclamo_id)
+
+        self.assertIsNotNone(reclamo.firma_minhash)
+        self.assertEqual(len(reclamo.bandas_lsh), NUM_BANDAS)
+
+    def test_firma_textos_iguales(self):
+        """Verifica que la firma ignora mayúsculas y acentos."""
+        firma_a = calcular_firma("No anda el WiFi del aula")
+        firma_b = calcular_firma("no anda el wifi del aúla")
+        self.assertEqual(similitud_estimada(firma_a, firma_b), 1.0)
+
+    def test_detecta_casi_duplicado(self):
+        """Verifica que un texto casi idéntico se detecta como candidato."""
+        resultados = BandaLSH.buscar_casi_duplicados("no anda el wifi del aula 3!!")
+
+        self.assertEqual([r.id for r, _ in resultados], [self.reclamo_id])
+
+    def test_detecta_casi_duplicado_resuelto(self):
+        """Verifica que se detectan reclamos que ya no están pendientes."""
+        Reclamo.actualizar_estado(self.reclamo_id, EstadoReclamo.RESUELTO, self.admin_id)
+
+        resultados = BandaLSH.buscar_casi_duplicados("No anda el wifi del aula 3")
+
+        self.assertEqual([r.id for r, _ in resultados], [self.reclamo_id])
+
+    def test_texto_distinto_no_es_duplicado(self):
+        """Verifica que un texto distinto no se reporta."""
+        resultados = BandaLSH.buscar_casi_duplicados("Se rompió la canilla del baño")
+
+        self.assertEqual(resultados, [])
+
+    def test_texto_sin_shingles_no_se_indexa(self):
+        """Verifica que los textos sin shingles no se indexan ni coinciden entre sí."""
+        reclamo, _ = Reclamo.crear(
+            usuario_id=self.usuario_id, detalle="¡¡¡!!!",
+            departamento_id=self.departamentos_prueba["depto1_id"],
+        )
+
+        self.assertIsNone(reclamo.firma_minhash)
+        self.assertEqual(reclamo.bandas_lsh, [])
+        self.assertEqual(BandaLSH.buscar_casi_duplicados("???"), [])
+
+    def test_reconstruir_indexa_reclamos_anteriores(self):
+        """Verifica que reconstruir completa las firmas de reclamos sin indexar."""
+        reclamo = Reclamo.obtener_por_id(self.reclamo_id)
+        reclamo.firma_minhash = None
+        reclamo.bandas_lsh = []
+        db.session.commit()
+        self.assertEqual(BandaLSH.buscar_casi_duplicados("No anda el wifi del aula 3"), [])
+
+        indexados = BandaLSH.reconstruir(tamano_bloque=1)
+
+        self.assertEqual(indexados, 1)
+        resultados = BandaLSH.buscar_casi_duplicados("No anda el wifi del aula 3")
+        self.assertEqual([r.id for r, _ in resultados], [self.reclamo_id])
+
+
+if __name__ == "__main__":
+    unittest.main()
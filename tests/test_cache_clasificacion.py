@@ -0,0 +1,98 @@
+"""
+Tests para la caché persistente de clasificaciones.
+"""
+
+import unittest
+from datetime import timedelta
+from unittest import mock
+from tests.conftest import CasoTestBase
+from modules.config import db
+from modules.cache_clasificacion import CacheClasificacion
+from modules.clasificador import clasificador
+from modules.reclamo import Reclamo
+
+
+class TestCacheClasificacion(CasoTestBase):
+    """Tests para CacheClasificacion y su uso desde Reclamo."""
+
+    def test_clave_ignora_mayusculas_acentos_y_espacios(self):
+        """Verifica que textos trivialmente distintos comparten clave."""
+        self.assertEqual(
+            CacheClasificacion.calcular_clave("No anda  el WiFi del aula"),
+            CacheClasificacion.calcular_clave(" no anda el wifi del áula "),
+        )
+
+    def test_guardar_y_obtener(self):
+        """Verifica que una clasificación guardada se recupera con la misma versión."""
+        CacheClasificacion.guardar("No anda el wifi", "v1", "soporte")
+        self.assertEqual(CacheClasificacion.obtener("no anda el WIFI", "v1"), "soporte")
+
+    def test_version_nueva_invalida_entradas(self):
+        """Verifica que consultar con otra versión descarta las entradas anteriores."""
+        CacheClasificacion.guardar("No anda el wifi", "v1", "soporte")
+
+        self.assertIsNone(CacheClasificacion.obtener("No anda el wifi", "v2"))
+        self.assertEqual(CacheClasificacion.query.count(), 0)
+
+    def test_consultar_no_escribe(self):
+        """Verifica que consultar no invalida otras versiones ni actualiza usado_en."""
+        CacheClasificacion.guardar("No anda el wifi", "v1", "soporte")
+        usado_en = CacheClasificacion.query.one().usado_en
+
+        self.assertEqual(CacheClasificacion.consultar("no anda el WIFI", "v1"), "soporte")
+        self.assertIsNone(CacheClasificacion.consultar("No anda el wifi", "v2"))
+        db.session.expire_all()
+        self.assertEqual(CacheClasificacion.query.one().usado_en, usado_en)
+
+    def test_desalojo_por_tamano(self):
+        """Verifica que al superar el máximo se eliminan las entradas menos usadas."""
+        with mock.patch.object(CacheClasificacion, "MAX_ENTRADAS", 10), \
+                mock.patch.object(CacheClasificacion, "ALTAS_ENTRE_DESALOJOS", 1):
+            for i in range(11):
+                CacheClasificacion.guardar(f"Texto {i}", "v1", "soporte")
+
+            self.assertLessEqual(CacheClasificacion.query.count(), 10)
+            self.assertIsNone(CacheClasificacion.obtener("Texto 0", "v1"))
+            self.assertEqual(CacheClasificacion.obtener("Texto 10", "v1"), "soporte")
+
+    def test_desalojo_cada_varias_altas(self):
+        """Verifica que el tamaño no se controla en cada alta."""
+        CacheClasificacion.limpiar()
+        with mock.patch.object(CacheClasificacion, "MAX_ENTRADAS", 2), \
+                mock.patch.object(CacheClasificacion, "ALTAS_ENTRE_DESALOJOS", 4):
+            for i in range(3):
+                CacheClasificacion.guardar(f"Texto {i}", "v1", "soporte")
+            self.assertEqual(CacheClasificacion.query.count(), 3)
+
+            CacheClasificacion.guardar("Texto 3", "v1", "soporte")
+            self.assertLessEqual(CacheClasificacion.query.count(), 2)
+
+    def test_consulta_reciente_no_escribe(self):
+        """Verifica que un acierto sólo actualiza usado_en si pasó INTERVALO_USO."""
+        CacheClasificacion.guardar("No anda el wifi", "v1", "soporte")
+        CacheClasificacion.obtener("No anda el wifi", "v1")
+        hace_un_rato = CacheClasificacion.query.one().usado_en
+
+        with mock.patch.object(db.session, "commit") as commit:
+            self.assertEqual(CacheClasificacion.obtener("No anda el wifi", "v1"), "soporte")
+        commit.assert_not_called()
+
+        with mock.patch.object(CacheClasificacion, "INTERVALO_USO", timedelta(0)):
+            CacheClasificacion.obtener("No anda el wifi", "v1")
+        db.session.expire_all()
+        self.assertGreater(CacheClasificacion.query.one().usado_en, hace_un_rato)
+
+    def test_clasificar_departamento_usa_cache(self):
+        """Verifica que el segundo texto equivalente no invoca al modelo."""
+        nombre = clasificador.clasificar("No funciona el wifi del aula")
+        with mock.patch.object(clasificador, "clasificar", return_value=nombre) as clasificar:
+            Reclamo._clasificar_departamento("No funciona el wifi del aula")
+            Reclamo._clasificar_departamento("no funciona el WIFI del aula")
+
+        clasificar.assert_called_once()
+        db.session.expire_all()
+        self.assertEqual(CacheClasificacion.query.count(), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
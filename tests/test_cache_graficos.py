@@ -0,0 +1,198 @@
+"""
+Tests del cache de gráficos renderizados (modules/cache_graficos.py).
+"""
+
+import os
+import tempfile
+import time
+import unittest
+from unittest import mock
+
+from tests.conftest import CasoTestBase
+from modules.cache_graficos import CacheGraficos
+from modules.config import db
+from modules.departamento import Departamento
+from modules.derivacion_reclamo import DerivacionReclamo
+from modules.generador_analiticas import GeneradorAnaliticas
+from modules.reclamo import Reclamo
+from modules.usuario_admin import RolAdmin, UsuarioAdmin
+from modules.usuario_final import Claustro, UsuarioFinal
+
+
+class TestCacheGraficos(unittest.TestCase):
+    """Tests del cache en memoria y en disco, sin base de datos."""
+
+    def setUp(self):
+        """Crea un directorio temporal para el nivel en disco."""
+        self.directorio = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        """Borra el directorio temporal."""
+        self.directorio.cleanup()
+
+    def _crear_cache(self, **kwargs):
+        return CacheGraficos(directorio=self.directorio.name, **kwargs)
+
+    def test_clave_depende_del_orden_de_los_datos(self):
+        """Verifica que la clave sigue el orden de los datos pero no el de los parámetros."""
+        clave_a = CacheGraficos.clave("torta", {"Pendiente": 2, "Resuelto": 1}, {"dpi": 100, "ancho": 6})
+        clave_b = CacheGraficos.clave("torta", {"Resuelto": 1, "Pendiente": 2}, {"dpi": 100, "ancho": 6})
+        self.assertNotEqual(clave_a, clave_b)
+        self.assertEqual(
+            clave_a, CacheGraficos.clave("torta", {"Pendiente": 2, "Resuelto": 1}, {"ancho": 6, "dpi": 100})
+        )
+        self.assertNotEqual(clave_a, CacheGraficos.clave("torta", {"Pendiente": 3, "Resuelto": 1}, {"dpi": 100}))
+        self.assertNotEqual(clave_a, CacheGraficos.clave("torta", {"Pendiente": 2, "Resuelto": 1}, {"dpi": 200}))
+
+    def test_obtener_o_generar_solo_genera_una_vez(self):
+        """Verifica que los pedidos repetidos se sirven desde memoria."""
+        cache = self._crear_cache()
+        llamadas = []
+
+        def generar():
+            llamadas.append(1)
+            return b"png"
+
+        for _ in range(3):
+            self.assertEqual(cache.obtener_o_generar("torta", {"a": 1}, None, generar), b"png")
+        self.assertEqual(len(llamadas), 1)
+        self.assertEqual(cache.estadisticas()["aciertos_memoria"], 2)
+
+    def test_nivel_disco_sobrevive_a_nueva_instancia(self):
+        """Verifica que otra instancia lee la imagen guardada en disco."""
+        self._crear_cache().obtener_o_generar("nube", {"aula": 3}, None, lambda: b"imagen")
+
+        otra = self._crear_cache()
+        resultado = otra.obtener_o_generar("nube", {"aula": 3}, None, lambda: self.fail("no debe generar"))
+        self.assertEqual(resultado, b"imagen")
+        self.assertEqual(otra.estadisticas()["aciertos_disco"], 1)
+
+    def test_no_guarda_resultados_vacios(self):
+        """Verifica que un gráfico sin imagen no se guarda."""
+        cache = self._crear_cache()
+        self.assertIsNone(cache.obtener_o_generar("nube", {"a": 1}, None, lambda: None))
+        self.assertEqual(cache.estadisticas()["en_disco"], 0)
+
+    def test_desalojo_en_memoria(self):
+        """Verifica que la memoria no supera su capacidad."""
+        cache = self._crear_cache(capacidad_memoria=2)
+        for i in range(3):
+            cache.guardar(f"clave{i}", b"x")
+        self.assertEqual(cache.estadisticas()["en_memoria"], 2)
+
+    def test_desalojo_en_disco_borra_los_menos_usados(self):
+        """Verifica que al pasar el límite de bytes se borra el archivo más viejo."""
+        cache = self._crear_cache(max_bytes_disco=25)
+        cache.guardar("vieja", b"0" * 10)
+        ruta_vieja = os.path.join(self.directorio.name, "vieja.bin")
+        hace_un_rato = time.time() - 60
+        os.utime(ruta_vieja, (hace_un_rato, hace_un_rato))
+        cache.guardar("media", b"1" * 10)
+        cache.guardar("nueva", b"2" * 10)
+
+        self.assertFalse(os.path.exists(ruta_vieja))
+        self.assertEqual(cache.estadisticas()["bytes_disco"], 20)
+
+
+class TestGeneradorAnaliticasCache(CasoTestBase):
+    """El generador de analíticas reutiliza los gráficos ya renderizados."""
+
+    def test_grafico_torta_se_renderiza_una_vez(self):
+        """Verifica que los mismos conteos reutilizan la imagen y otro orden la vuelve a dibujar."""
+        conteos = {"Pendiente": 3, "Resuelto": 1, "Inválido": 0}
+        with mock.patch.object(
+            GeneradorAnaliticas, "_renderizar_torta", return_value=b"png"
+        ) as renderizar:
+            primero = GeneradorAnaliticas.generar_grafico_torta(conteos)
+            segundo = GeneradorAnaliticas.generar_grafico_torta(dict(conteos))
+            renderizar.assert_called_once()
+            # Las porciones se dibujan en el orden de los datos
+            GeneradorAnaliticas.generar_grafico_torta(dict(reversed(conteos.items())))
+
+        self.assertEqual(primero, segundo)
+        self.assertEqual(renderizar.call_count, 2)
+
+    def test_huella_depende_del_formato(self):
+        """Verifica que la huella ignora los ceros y cambia con el formato."""
+        conteos = {"Pendiente": 3, "Resuelto": 1}
+        self.assertEqual(
+            GeneradorAnaliticas.huella_grafico("torta", conteos, "svg"),
+            GeneradorAnaliticas.huella_grafico("torta", {**conteos, "Inválido": 0}, "svg"),
+        )
+        self.assertNotEqual(
+            GeneradorAnaliticas.huella_grafico("torta", conteos, "svg"),
+            GeneradorAnaliticas.huella_grafico("torta", conteos, "png"),
+        )
+
+    def test_grafico_torta_en_svg(self):
+        """Verifica que la torta se dibuja en SVG y que sin datos no hay imagen."""
+        imagen = GeneradorAnaliticas.renderizar_grafico("torta", {"Pendiente": 2}, "svg")
+        self.assertIn(b"<svg", imagen)
+        self.assertIsNone(GeneradorAnaliticas.renderizar_grafico("torta", {}, "svg"))
+
+    def test_analiticas_completas_no_dibujan_graficos(self):
+        """Verifica que las analíticas sólo calculan las huellas de los gráficos."""
+        usuario = UsuarioFinal(
+            nombre="Test", apellido="Usuario",
+            correo="usuario@test.com", nombre_usuario="testusuario",
+            claustro=Claustro.ESTUDIANTE,
+        )
+        usuario.establecer_contrasena("test123")
+        db.session.add(usuario)
+        db.session.commit()
+        Reclamo.crear(
+            usuario_id=usuario.id, detalle="La calefacción del aula no funciona",
+            departamento_id=self.departamentos_prueba["depto1_id"],
+        )
+        departamentos = [Departamento.obtener_por_id(self.departamentos_prueba["depto1_id"])]
+
+        with mock.patch.object(GeneradorAnaliticas, "_renderizar_torta") as renderizar:
+            datos = GeneradorAnaliticas.obtener_analiticas_completas(departamentos)
+        renderizar.assert_not_called()
+        self.assertEqual(
+            datos["huella_torta"],
+            GeneradorAnaliticas.huella_grafico(
+                "torta", GeneradorAnaliticas.obtener_datos_grafico("torta", departamentos), "svg"
+            ),
+        )
+
+    def test_ruta_grafico_usa_solo_etag(self):
+        """Verifica que la ruta del gráfico valida con ETag, sin Last-Modified."""
+        self._registrar_rutas()
+        ciencias = self.departamentos_prueba["depto1_id"]
+        admin, _ = UsuarioAdmin.crear(
+            nombre="Admin", apellido="Test", correo="admin@test.com",
+            nombre_usuario="admin", rol_admin=RolAdmin.JEFE_DEPARTAMENTO,
+            contrasena="admin123", departamento_id=ciencias,
+        )
+        usuario = UsuarioFinal(
+            nombre="Test", apellido="Usuario",
+            correo="usuario@test.com", nombre_usuario="testusuario",
+            claustro=Claustro.ESTUDIANTE,
+        )
+        usuario.establecer_contrasena("test123")
+        db.session.add(usuario)
+        db.session.commit()
+        reclamos = [
+            Reclamo.crear(usuario_id=usuario.id, detalle=detalle, departamento_id=ciencias)[0]
+            for detalle in ("No anda el proyector", "Falta tiza en el aula")
+        ]
+        with self.client.session_transaction() as sesion:
+            sesion["_user_id"] = str(admin.id)
+
+        respuesta = self.client.get("/admin/analytics/charts/status.svg")
+        self.assertEqual(respuesta.status_code, 200)
+        self.assertIsNone(respuesta.last_modified)
+        etag, _ = respuesta.get_etag()
+        repetida = self.client.get("/admin/analytics/charts/status.svg", headers={"If-None-Match": f'"{etag}"'})
+        self.assertEqual(repetida.status_code, 304)
+
+        # Derivar un reclamo a otro departamento cambia los datos del gráfico
+        DerivacionReclamo.derivar(reclamos[0].id, self.departamentos_prueba["depto2_id"], admin.id)
+        derivada = self.client.get("/admin/analytics/charts/status.svg", headers={"If-None-Match": f'"{etag}"'})
+        self.assertEqual(derivada.status_code, 200)
+        self.assertNotEqual(derivada.get_etag()[0], etag)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,53 @@
+"""Tests para CacheLemas."""
+
+import pickle
+import unittest
+from modules.cache_lemas import CacheLemas
+from modules.clasificador import Clasificador
+
+
+class TestCacheLemas(unittest.TestCase):
+    """Tests para el cache LRU de textos lematizados."""
+
+    def test_acierto_y_fallo(self):
+        """Verifica los contadores de aciertos y fallos."""
+        cache = CacheLemas(capacidad=2)
+        self.assertIsNone(cache.obtener("Hola mundo"))
+        cache.guardar("Hola mundo", "hola mundo")
+
+        self.assertEqual(cache.obtener("hola MUNDO"), "hola mundo")
+        self.assertEqual(cache.aciertos, 1)
+        self.assertEqual(cache.fallos, 1)
+
+    def test_desalojo_lru(self):
+        """Verifica que se descarta la entrada usada hace más tiempo."""
+        cache = CacheLemas(capacidad=2)
+        cache.guardar("a", "a")
+        cache.guardar("b", "b")
+        cache.obtener("a")
+        cache.guardar("c", "c")
+
+        self.assertEqual(len(cache), 2)
+        self.assertIsNone(cache.obtener("b"))
+        self.assertEqual(cache.obtener("a"), "a")
+
+    def test_serializable(self):
+        """Verifica que el cache puede serializarse con pickle."""
+        cache = CacheLemas(capacidad=2)
+        cache.guardar("a", "a")
+        copia = pickle.loads(pickle.dumps(cache))
+        self.assertEqual(copia.obtener("a"), "a")
+
+    def test_textos_repetidos_no_pasan_por_spacy(self):
+        """Verifica que el clasificador reutiliza los lemas de textos ya vistos."""
+        clasificador = Clasificador()
+        texto = "No funciona el proyector del aula 5"
+        primero = clasificador.clasificar(texto)
+        aciertos_previos = clasificador.cache_lemas.aciertos
+
+        self.assertEqual(clasificador.clasificar(texto), primero)
+        self.assertEqual(clasificador.cache_lemas.aciertos, aciertos_previos + 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
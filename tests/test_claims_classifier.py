@@ -0,0 +1,43 @@
+"""Tests para ClaimsClassifier con el modelo entrenado del proyecto."""
+
+import os
+import pickle
+import unittest
+
+from modules.clasificador import Clasificador
+
+TEXTOS_PRUEBA = [
+    "No funciona el wifi del aula 3 desde el lunes",
+    "Se rompió la canilla del baño del segundo piso",
+    "Los proyectores del laboratorio de informática no encienden",
+    "Quiero presentar una queja formal porque nadie responde mis reclamos",
+    "Hay bancos rotos en el aula magna y las ventanas no cierran",
+    "La impresora de la sala de profesores no imprime",
+    "Las luces del pasillo están quemadas",
+    "",
+    "1234",
+]
+
+
+@unittest.skipUnless(os.path.exists(Clasificador.RUTA_MODELO), "falta data/claims_clf.pkl")
+class TestClaimsClassifier(unittest.TestCase):
+    """Tests de paridad de la predicción dispersa con el Pipeline original."""
+
+    @classmethod
+    def setUpClass(cls):
+        """Carga el pickle del modelo del proyecto."""
+        with open(Clasificador.RUTA_MODELO, "rb") as archivo:
+            cls.clf = pickle.load(archivo)
+
+    def test_prediccion_dispersa_coincide_con_pipeline_denso(self):
+        """Verifica que classify da lo mismo que Pipeline.predict sobre la matriz densa."""
+        pipeline = self.clf._ClaimsClassifier__clf
+        codificador = self.clf._ClaimsClassifier__encoder
+        esperadas = list(codificador.inverse_transform(pipeline.predict(TEXTOS_PRUEBA)))
+
+        self.assertEqual(list(self.clf.classify(TEXTOS_PRUEBA)), esperadas)
+        self.assertEqual(list(self.clf.classify_batch(TEXTOS_PRUEBA, batch_size=4)), esperadas)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -11,6 +11,9 @@ class _DummyClassifier:
     def classify(self, X):
         return [self._etiqueta]
 
+    def classify_batch(self, X, batch_size=None, n_process=None):
+        return [self._etiqueta for _ in X]
+
 
 class TestClasificador(unittest.TestCase):
     """Tests para el clasificador automático."""
@@ -41,6 +44,18 @@ class TestClasificador(unittest.TestCase):
         resultado = self.clasificador.clasificar("Texto de prueba")
         self.assertEqual(resultado, "Maestranza - maestranza")
 
+    def test_clasificar_lote_mapea_cada_texto(self):
+        """Verifica que clasificar_lote devuelve un departamento por texto."""
+        self.clasificador._Clasificador__clf = _DummyClassifier("maestranza")
+        resultado = self.clasificador.clasificar_lote(["Texto uno", "Texto dos"])
+        self.assertEqual(resultado, ["Maestranza - maestranza"] * 2)
+
+    def test_clasificar_lote_coincide_con_clasificar(self):
+        """Verifica que el modelo real da el mismo resultado por lote que de a uno."""
+        textos = ["No funciona el wifi del aula", "Se rompió la canilla del baño"]
+        individuales = [self.clasificador.clasificar(t) for t in textos]
+        self.assertEqual(self.clasificador.clasificar_lote(textos), individuales)
+
     def test_modelo_disponible_verdadero(self):
         """Verifica que modelo_disponible retorna True cuando hay modelo cargado."""
         self.assertTrue(self.clasificador.modelo_disponible())
@@ -51,6 +66,24 @@ class TestClasificador(unittest.TestCase):
         clasificador_vacio._Clasificador__clf = None
         self.assertFalse(clasificador_vacio.modelo_disponible())
 
+    def test_carga_diferida_carga_en_primer_uso(self):
+        """Verifica que con carga diferida el modelo se carga al clasificar."""
+        diferido = Clasificador(carga_diferida=True)
+        self.assertFalse(diferido.listo)
+        self.assertIsNone(diferido._Clasificador__clf)
+        self.assertEqual(
+            diferido.clasificar("No funciona el wifi del aula"),
+            self.clasificador.clasificar("No funciona el wifi del aula"),
+        )
+        self.assertTrue(diferido.listo)
+
+    def test_precalentar_en_segundo_plano(self):
+        """Verifica que precalentar deja el modelo listo."""
+        diferido = Clasificador(carga_diferida=True)
+        diferido.precalentar().join()
+        self.assertTrue(diferido.listo)
+        self.assertTrue(diferido.modelo_disponible())
+
 
 if __name__ == "__main__":
     unittest.main()
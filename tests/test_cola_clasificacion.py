@@ -0,0 +1,154 @@
+"""
+Tests para la cola de clasificación de reclamos.
+"""
+
+import unittest
+from unittest import mock
+from tests.conftest import CasoTestBase
+from modules.config import db
+from modules.clasificador import clasificador
+from modules.reclamo import Reclamo
+from modules.derivacion_reclamo import DerivacionReclamo
+from modules.cola_clasificacion import cola_clasificacion
+from modules.conteo_reclamos import ConteoReclamos
+from modules.usuario_final import UsuarioFinal, Claustro
+from modules.usuario_admin import UsuarioAdmin, RolAdmin
+
+
+class TestColaClasificacion(CasoTestBase):
+    """Tests para la clasificación en segundo plano."""
+
+    def setUp(self):
+        """Crea un usuario final y parchea el clasificador."""
+        super().setUp()
+
+        usuario = UsuarioFinal(
+            nombre="Test", apellido="Usuario",
+            correo="usuario@test.com", nombre_usuario="testusuario",
+            claustro=Claustro.ESTUDIANTE,
+        )
+        usuario.establecer_contrasena("test123")
+        db.session.add(usuario)
+        db.session.commit()
+        self.usuario_id = usuario.id
+
+        parche = mock.patch.object(
+            Reclamo, "_clasificar_departamento",
+            return_value=self.departamentos_prueba["depto1_id"],
+        )
+        self.clasificar = parche.start()
+        self.addCleanup(parche.stop)
+
+    def test_crear_deja_reclamo_provisorio_en_secretaria(self):
+        """Verifica que crear no clasifica y deja el reclamo en la Secretaría Técnica."""
+        reclamo, error = Reclamo.crear(usuario_id=self.usuario_id, detalle="No anda el wifi")
+
+        self.assertIsNone(error)
+        self.assertEqual(reclamo.departamento_id, self.departamentos_prueba["st_id"])
+        self.assertTrue(reclamo.clasificacion_pendiente)
+        self.assertEqual(len(cola_clasificacion), 1)
+        self.clasificar.assert_not_called()
+
+    def test_drenar_asigna_departamento_predicho(self):
+        """Verifica que al drenar la cola el reclamo pasa al departamento predicho."""
+        reclamo, _ = Reclamo.crear(usuario_id=self.usuario_id, detalle="No anda el wifi")
+
+        self.assertEqual(cola_clasificacion.drenar(), 1)
+
+        reclamo = Reclamo.obtener_por_id(reclamo.id)
+        self.assertEqual(reclamo.departamento_id, self.departamentos_prueba["depto1_id"])
+        self.assertFalse(reclamo.clasificacion_pendiente)
+        self.assertEqual(len(cola_clasificacion), 0)
+        self.assertEqual(ConteoReclamos.verificar(), [])
+
+    def test_derivacion_manual_prevalece(self):
+        """Verifica que un reclamo derivado a mano no se reasigna al clasificarlo."""
+        admin, _ = UsuarioAdmin.crear(
+            nombre="Admin", apellido="Test", correo="admin@test.com",
+            nombre_usuario="admin", rol_admin=RolAdmin.SECRETARIO_TECNICO,
+            contrasena="admin123", departamento_id=self.departamentos_prueba["st_id"],
+        )
+        reclamo, _ = Reclamo.crear(usuario_id=self.usuario_id, detalle="No anda el wifi")
+        DerivacionReclamo.derivar(reclamo.id, self.departamentos_prueba["depto2_id"], admin.id)
+
+        cola_clasificacion.drenar()
+
+        reclamo = Reclamo.obtener_por_id(reclamo.id)
+        self.assertEqual(reclamo.departamento_id, self.departamentos_prueba["depto2_id"])
+        self.clasificar.assert_not_called()
+
+    def test_fallo_se_registra_y_se_reintenta(self):
+        """Verifica que un fallo se registra y se reintenta hasta MAX_INTENTOS veces."""
+        reclamo, _ = Reclamo.crear(usuario_id=self.usuario_id, detalle="No anda el wifi")
+        aplicar = mock.patch.object(Reclamo, "aplicar_clasificacion", side_effect=RuntimeError("falla"))
+
+        with aplicar as aplicar_clasificacion, self.assertLogs(self.app.logger, "ERROR") as registros:
+            self.assertEqual(cola_clasificacion.drenar(), 0)
+
+        self.assertEqual(aplicar_clasificacion.call_count, cola_clasificacion.MAX_INTENTOS)
+        self.assertEqual(len(registros.records), cola_clasificacion.MAX_INTENTOS)
+        self.assertIsNotNone(registros.records[-1].exc_info)
+        reclamo = Reclamo.obtener_por_id(reclamo.id)
+        self.assertFalse(reclamo.clasificacion_pendiente)
+        self.assertEqual(reclamo.departamento_id, self.departamentos_prueba["st_id"])
+
+    def test_proceso_hijo_no_hereda_los_hilos(self):
+        """Verifica que tras un fork la cola descarta los hilos del proceso padre."""
+        hilos = cola_clasificacion._ColaClasificacion__hilos
+        hilos.append(mock.Mock(name="hilo del padre"))
+
+        with mock.patch("modules.cola_clasificacion.os.getpid", return_value=-1):
+            reclamo, _ = Reclamo.crear(usuario_id=self.usuario_id, detalle="No anda el wifi")
+
+        self.assertEqual(cola_clasificacion._ColaClasificacion__hilos, [])
+        self.assertEqual(len(cola_clasificacion), 1)
+        self.assertEqual(cola_clasificacion.drenar(), 1)
+        self.assertFalse(Reclamo.obtener_por_id(reclamo.id).clasificacion_pendiente)
+
+    def test_departamento_explicito_no_se_encola(self):
+        """Verifica que un reclamo con departamento explícito no pasa por la cola."""
+        reclamo, _ = Reclamo.crear(
+            usuario_id=self.usuario_id, detalle="Reclamo directo",
+            departamento_id=self.departamentos_prueba["depto2_id"],
+        )
+
+        self.assertFalse(reclamo.clasificacion_pendiente)
+        self.assertEqual(len(cola_clasificacion), 0)
+
+    def test_anticipar_devuelve_departamento_predicho(self):
+        """Verifica que la clasificación anticipada resuelve el departamento en otro hilo."""
+        futuro = cola_clasificacion.anticipar("No anda el wifi")
+        self.assertEqual(futuro.result(), self.departamentos_prueba["depto1_id"])
+
+
+class TestErroresClasificador(CasoTestBase):
+    """Tests de la cola cuando falla el modelo."""
+
+    def setUp(self):
+        """Crea un usuario final y hace fallar al modelo."""
+        super().setUp()
+        self.usuario_id = self._crear_usuarios_finales()[0].id
+
+        parche_version = mock.patch.object(clasificador, "version_sin_cargar", return_value="version-test")
+        parche_version.start()
+        self.addCleanup(parche_version.stop)
+        parche = mock.patch.object(clasificador, "clasificar", side_effect=RuntimeError("falla"))
+        self.clasificar = parche.start()
+        self.addCleanup(parche.stop)
+
+    def test_error_del_modelo_se_reintenta_en_la_cola(self):
+        """Verifica que un error del modelo no desmarca el reclamo sin registrarlo ni reintentar."""
+        reclamo, _ = Reclamo.crear(usuario_id=self.usuario_id, detalle="No anda el wifi")
+
+        with self.assertLogs(self.app.logger, "ERROR") as registros:
+            self.assertEqual(cola_clasificacion.drenar(), 0)
+
+        self.assertEqual(self.clasificar.call_count, cola_clasificacion.MAX_INTENTOS)
+        self.assertEqual(len(registros.records), cola_clasificacion.MAX_INTENTOS)
+        reclamo = Reclamo.obtener_por_id(reclamo.id)
+        self.assertFalse(reclamo.clasificacion_pendiente)
+        self.assertEqual(reclamo.departamento_id, self.departamentos_prueba["st_id"])
+
+
+if __name__ == "__main__":
+    unittest.main()
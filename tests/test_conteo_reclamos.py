@@ -0,0 +1,87 @@
+"""
+Tests para los contadores de reclamos por departamento y estado.
+"""
+
+import unittest
+from tests.conftest import CasoTestBase
+from modules.config import db
+from modules.conteo_reclamos import ConteoReclamos
+from modules.derivacion_reclamo import DerivacionReclamo
+from modules.reclamo import Reclamo, EstadoReclamo
+from modules.usuario_final import UsuarioFinal, Claustro
+from modules.usuario_admin import UsuarioAdmin, RolAdmin
+
+
+class TestConteoReclamos(CasoTestBase):
+    """Tests para ConteoReclamos."""
+
+    def setUp(self):
+        """Crea usuario, admin y dos reclamos en Ciencias."""
+        super().setUp()
+
+        usuario = UsuarioFinal(
+            nombre="Test", apellido="Usuario",
+            correo="usuario@test.com", nombre_usuario="testusuario",
+            claustro=Claustro.ESTUDIANTE,
+        )
+        usuario.establecer_contrasena("test123")
+        db.session.add(usuario)
+        db.session.commit()
+
+        admin, _ = UsuarioAdmin.crear(
+            nombre="Admin", apellido="Test", correo="admin@test.com",
+            nombre_usuario="admin", rol_admin=RolAdmin.SECRETARIO_TECNICO,
+            contrasena="admin123", departamento_id=self.departamentos_prueba["st_id"],
+        )
+        self.admin_id = admin.id
+
+        self.ids = [
+            Reclamo.crear(
+                usuario_id=usuario.id, detalle=f"Reclamo {i}",
+                departamento_id=self.departamentos_prueba["depto1_id"],
+            )[0].id
+            for i in range(2)
+        ]
+
+    def test_crear_incrementa_pendientes(self):
+        """Verifica que crear suma al contador de pendientes del departamento."""
+        conteos = ConteoReclamos.obtener([self.departamentos_prueba["depto1_id"]])
+        self.assertEqual(conteos[self.departamentos_prueba["depto1_id"]], {EstadoReclamo.PENDIENTE: 2})
+
+    def test_cambio_estado_y_derivacion_mueven_contadores(self):
+        """Verifica que actualizar_estado y derivar mantienen los contadores al día."""
+        ciencias, humanidades = self.departamentos_prueba["depto1_id"], self.departamentos_prueba["depto2_id"]
+        Reclamo.actualizar_estado(self.ids[0], EstadoReclamo.RESUELTO, self.admin_id)
+        DerivacionReclamo.derivar(self.ids[1], humanidades, self.admin_id)
+
+        conteos = ConteoReclamos.obtener()
+        self.assertEqual(conteos[ciencias], {EstadoReclamo.PENDIENTE: 0, EstadoReclamo.RESUELTO: 1})
+        self.assertEqual(conteos[humanidades], {EstadoReclamo.PENDIENTE: 1})
+        self.assertEqual(ConteoReclamos.verificar(), [])
+
+    def test_conteos_dashboard_desde_contadores(self):
+        """Verifica que los conteos del dashboard salen de los contadores."""
+        Reclamo.actualizar_estado(self.ids[0], EstadoReclamo.EN_PROCESO, self.admin_id)
+
+        conteos = Reclamo.obtener_conteos_dashboard()
+
+        self.assertEqual(conteos["total_reclamos"], 2)
+        self.assertEqual(conteos["reclamos_pendientes"], 1)
+        self.assertEqual(conteos["reclamos_en_proceso"], 1)
+
+    def test_verificar_y_reconstruir(self):
+        """Verifica que se detecta un contador desfasado y se regenera."""
+        ConteoReclamos.ajustar(self.departamentos_prueba["depto1_id"], EstadoReclamo.PENDIENTE, 5)
+        db.session.commit()
+
+        diferencias = ConteoReclamos.verificar()
+        self.assertEqual(
+            diferencias, [(self.departamentos_prueba["depto1_id"], EstadoReclamo.PENDIENTE, 7, 2)]
+        )
+
+        ConteoReclamos.reconstruir()
+        self.assertEqual(ConteoReclamos.verificar(), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
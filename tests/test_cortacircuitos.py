@@ -0,0 +1,108 @@
+"""
+Tests para el cortacircuitos del clasificador.
+"""
+
+import threading
+import unittest
+from unittest import mock
+from tests.conftest import CasoTestBase
+from modules.config import db
+from modules.clasificador import clasificador, cortacircuitos_clasificador
+from modules.cola_clasificacion import cola_clasificacion
+from modules.cortacircuitos import Cortacircuitos, EstadoCortacircuitos, ServicioNoDisponible
+from modules.reclamo import Reclamo
+from modules.usuario_final import UsuarioFinal, Claustro
+
+
+def _fallar():
+    raise RuntimeError("falla")
+
+
+class TestCortacircuitos(unittest.TestCase):
+    """Tests para los estados del cortacircuitos."""
+
+    def test_se_abre_tras_fallos_consecutivos(self):
+        """Verifica que tras el umbral de fallos rechaza sin llamar a la función."""
+        cortacircuitos = Cortacircuitos("prueba", umbral_fallos=2)
+        for _ in range(2):
+            with self.assertRaises(RuntimeError):
+                cortacircuitos.ejecutar(_fallar)
+
+        funcion = mock.Mock(return_value="ok")
+        with self.assertRaises(ServicioNoDisponible):
+            cortacircuitos.ejecutar(funcion)
+
+        funcion.assert_not_called()
+        estadisticas = cortacircuitos.estadisticas()
+        self.assertEqual(estadisticas["estado"], EstadoCortacircuitos.ABIERTO.value)
+        self.assertEqual(estadisticas["aperturas"], 1)
+        self.assertEqual(estadisticas["rechazos"], 1)
+
+    def test_se_cierra_si_la_prueba_funciona(self):
+        """Verifica que pasada la espera una llamada exitosa cierra el cortacircuitos."""
+        cortacircuitos = Cortacircuitos("prueba", umbral_fallos=1, espera_reapertura=0.0)
+        with self.assertRaises(RuntimeError):
+            cortacircuitos.ejecutar(_fallar)
+
+        self.assertEqual(cortacircuitos.estado, EstadoCortacircuitos.SEMIABIERTO)
+        self.assertEqual(cortacircuitos.ejecutar(lambda: "ok"), "ok")
+        self.assertEqual(cortacircuitos.estado, EstadoCortacircuitos.CERRADO)
+
+    def test_presupuesto_agotado(self):
+        """Verifica que una llamada más lenta que el presupuesto se corta y cuenta como fallo."""
+        cortacircuitos = Cortacircuitos("prueba")
+        liberar = threading.Event()
+        self.addCleanup(liberar.set)
+
+        with self.assertRaises(ServicioNoDisponible):
+            cortacircuitos.ejecutar(liberar.wait, presupuesto=0.05)
+
+        self.assertEqual(cortacircuitos.estadisticas()["tiempos_agotados"], 1)
+
+
+class TestClasificacionConPresupuesto(CasoTestBase):
+    """Tests para la creación de reclamos con el clasificador lento."""
+
+    def setUp(self):
+        super().setUp()
+        self.app.config["CLASIFICACION_ASINCRONA"] = False
+        self.app.config["CLASIFICACION_PRESUPUESTO_SEGUNDOS"] = 0.05
+
+        usuario = UsuarioFinal(
+            nombre="Test", apellido="Usuario",
+            correo="usuario@test.com", nombre_usuario="testusuario",
+            claustro=Claustro.ESTUDIANTE,
+        )
+        usuario.establecer_contrasena("test123")
+        db.session.add(usuario)
+        db.session.commit()
+        self.usuario_id = usuario.id
+
+    def test_clasificador_lento_deriva_a_secretaria_y_encola(self):
+        """Verifica que si se agota el presupuesto el reclamo va a la Secretaría Técnica y se encola."""
+        liberar = threading.Event()
+        self.addCleanup(liberar.set)
+        with mock.patch.object(clasificador, "clasificar", side_effect=lambda texto: liberar.wait()):
+            reclamo, error = Reclamo.crear(usuario_id=self.usuario_id, detalle="Texto muy largo")
+
+        self.assertIsNone(error)
+        self.assertEqual(reclamo.departamento_id, self.departamentos_prueba["st_id"])
+        self.assertTrue(reclamo.clasificacion_pendiente)
+        self.assertEqual(len(cola_clasificacion), 1)
+        self.assertEqual(cortacircuitos_clasificador.estadisticas()["tiempos_agotados"], 1)
+
+    def test_error_del_modelo_deriva_a_secretaria_y_encola(self):
+        """Verifica que un error del modelo se trata como una caída: Secretaría Técnica y cola."""
+        fallo = mock.patch.object(clasificador, "clasificar", side_effect=RuntimeError("falla"))
+        with fallo, self.assertLogs(self.app.logger, "ERROR"):
+            reclamo, error = Reclamo.crear(usuario_id=self.usuario_id, detalle="Texto muy largo")
+
+        self.assertIsNone(error)
+        self.assertEqual(reclamo.departamento_id, self.departamentos_prueba["st_id"])
+        self.assertTrue(reclamo.clasificacion_pendiente)
+        self.assertEqual(len(cola_clasificacion), 1)
+        self.assertEqual(cortacircuitos_clasificador.estadisticas()["errores"], 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,106 @@
+"""
+Tests para las frecuencias de palabras clave por departamento.
+"""
+
+import unittest
+from tests.conftest import CasoTestBase
+from modules.config import db
+from modules.frecuencia_palabra import FrecuenciaPalabra
+from modules.generador_analiticas import GeneradorAnaliticas
+from modules.departamento import Departamento
+from modules.derivacion_reclamo import DerivacionReclamo
+from modules.reclamo import Reclamo
+from modules.usuario_final import UsuarioFinal, Claustro
+from modules.usuario_admin import UsuarioAdmin, RolAdmin
+
+
+class TestFrecuenciaPalabra(CasoTestBase):
+    """Tests para FrecuenciaPalabra."""
+
+    def setUp(self):
+        """Crea reclamos en Ciencias y Humanidades."""
+        super().setUp()
+
+        usuario = UsuarioFinal(
+            nombre="Test", apellido="Usuario",
+            correo="usuario@test.com", nombre_usuario="testusuario",
+            claustro=Claustro.ESTUDIANTE,
+        )
+        usuario.establecer_contrasena("test123")
+        db.session.add(usuario)
+        db.session.commit()
+
+        self.ciencias = self.departamentos_prueba["depto1_id"]
+        self.humanidades = self.departamentos_prueba["depto2_id"]
+        self.reclamo_wifi, _ = Reclamo.crear(
+            usuario_id=usuario.id, detalle="No funciona el wifi, el wifi del aula",
+            departamento_id=self.ciencias,
+        )
+        Reclamo.crear(
+            usuario_id=usuario.id, detalle="Se cortó el wifi en la biblioteca",
+            departamento_id=self.humanidades,
+        )
+
+    def test_crear_suma_palabras_del_departamento(self):
+        """Verifica que las palabras del reclamo se cuentan en su departamento."""
+        self.assertEqual(
+            FrecuenciaPalabra.obtener_mas_frecuentes([self.ciencias]),
+            {"wifi": 2, "aula": 1, "funciona": 1},
+        )
+
+    def test_mas_frecuentes_de_varios_departamentos(self):
+        """Verifica que con varios departamentos se suman las frecuencias."""
+        frecuencias = FrecuenciaPalabra.obtener_mas_frecuentes(top_n=1)
+        self.assertEqual(frecuencias, {"wifi": 3})
+
+    def test_derivar_mueve_palabras(self):
+        """Verifica que derivar pasa las palabras al departamento destino."""
+        admin, _ = UsuarioAdmin.crear(
+            nombre="Admin", apellido="Test", correo="admin@test.com",
+            nombre_usuario="admin", rol_admin=RolAdmin.SECRETARIO_TECNICO,
+            contrasena="admin123", departamento_id=self.departamentos_prueba["st_id"],
+        )
+        DerivacionReclamo.derivar(self.reclamo_wifi.id, self.humanidades, admin.id)
+
+        self.assertEqual(FrecuenciaPalabra.obtener_mas_frecuentes([self.ciencias]), {})
+        self.assertEqual(FrecuenciaPalabra.obtener_mas_frecuentes([self.humanidades])["wifi"], 3)
+        # Las filas que quedan en cero se borran; el total general no cambia
+        self.assertEqual(
+            db.session.query(FrecuenciaPalabra).filter_by(departamento_id=self.ciencias).count(), 0
+        )
+        self.assertEqual(FrecuenciaPalabra.obtener_mas_frecuentes(top_n=1), {"wifi": 3})
+
+    def test_total_general_se_mantiene_en_el_upsert(self):
+        """Verifica que las filas sin departamento suman todas las palabras."""
+        totales = {
+            palabra: cantidad for palabra, cantidad in db.session.query(
+                FrecuenciaPalabra.palabra, FrecuenciaPalabra.cantidad
+            ).filter(FrecuenciaPalabra.departamento_id.is_(None))
+        }
+        self.assertEqual(totales["wifi"], 3)
+        self.assertEqual(totales["biblioteca"], 1)
+        todos = [self.departamentos_prueba["st_id"], self.ciencias, self.humanidades]
+        self.assertEqual(
+            FrecuenciaPalabra.obtener_mas_frecuentes(todos, top_n=50),
+            FrecuenciaPalabra.obtener_mas_frecuentes(top_n=50),
+        )
+        self.assertEqual(
+            FrecuenciaPalabra.obtener_mas_frecuentes([self.ciencias, self.humanidades], top_n=50),
+            FrecuenciaPalabra.obtener_mas_frecuentes(top_n=50),
+        )
+
+    def test_reconstruir_coincide_con_incremental(self):
+        """Verifica que regenerar la tabla da las mismas frecuencias."""
+        antes = FrecuenciaPalabra.obtener_mas_frecuentes(top_n=50)
+        FrecuenciaPalabra.reconstruir()
+        self.assertEqual(FrecuenciaPalabra.obtener_mas_frecuentes(top_n=50), antes)
+
+    def test_analiticas_usan_frecuencias(self):
+        """Verifica que GeneradorAnaliticas toma las palabras de la tabla."""
+        departamentos = [Departamento.obtener_por_id(self.humanidades)]
+        frecuencias = GeneradorAnaliticas.obtener_frecuencias_palabras(departamentos)
+        self.assertEqual(frecuencias, {"biblioteca": 1, "corto": 1, "wifi": 1})
+
+
+if __name__ == "__main__":
+    unittest.main()
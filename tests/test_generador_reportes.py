@@ -0,0 +1,62 @@
+"""
+Tests para el reporte HTML generado por partes.
+"""
+
+import unittest
+
+from tests.conftest import CasoTestBase
+from modules.departamento import Departamento
+from modules.generador_reportes import ReporteHTML
+from modules.reclamo import Reclamo
+
+
+class TestReporteHTML(CasoTestBase):
+    """Tests del recorrido por bloques y del renderizado en streaming."""
+
+    def setUp(self):
+        """Crea 25 reclamos alternados entre Ciencias y Humanidades, uno con un adherente."""
+        super().setUp()
+
+        self.usuarios = self._crear_usuarios_finales(2)
+        self.ciencias = Departamento.obtener_por_id(self.departamentos_prueba["depto1_id"])
+        self.humanidades = Departamento.obtener_por_id(self.departamentos_prueba["depto2_id"])
+        self.ids = self._crear_reclamos(
+            [self.usuarios[0].id], [self.ciencias.id, self.humanidades.id], 25
+        )
+        Reclamo.agregar_adherente(self.ids[0], self.usuarios[1].id)
+
+    def test_iterar_para_reporte_devuelve_filas_livianas(self):
+        """Verifica que el recorrido por bloques trae las columnas del reporte y los adherentes."""
+        filas = list(Reclamo.iterar_para_reporte([self.ciencias], tamano_bloque=3))
+
+        self.assertEqual(len(filas), 13)
+        self.assertTrue(all(f.nombre_departamento == "Departamento de Ciencias" for f in filas))
+        adherentes = {f.id: f.cantidad_adherentes for f in filas}
+        self.assertEqual(adherentes[self.ids[0]], 1)
+        self.assertEqual(adherentes[self.ids[2]], 0)
+        self.assertEqual(list(Reclamo.iterar_para_reporte([])), [])
+
+    def test_stream_entrega_varios_fragmentos(self):
+        """Verifica que el HTML se entrega en varios fragmentos que forman el reporte completo."""
+        reporte = ReporteHTML([self.ciencias, self.humanidades])
+        reporte.TAMANO_FRAGMENTO = 1024
+
+        fragmentos = list(reporte.generar_stream())
+
+        self.assertGreater(len(fragmentos), 1)
+        html = "".join(fragmentos)
+        self.assertIn("Detalle de Reclamos (25)", html)
+        self.assertIn("Departamento de Humanidades", html)
+        self.assertEqual(html.count("Reclamo de prueba número"), 25)
+        self.assertTrue(html.rstrip().endswith("</html>"))
+
+    def test_generar_arma_el_reporte_completo(self):
+        """Verifica que generar() devuelve el HTML con todos los reclamos del departamento."""
+        html = ReporteHTML([self.ciencias]).generar()
+
+        self.assertIn("Detalle de Reclamos (13)", html)
+        self.assertEqual(html.count("Reclamo de prueba número"), 13)
+
+
+if __name__ == "__main__":
+    unittest.main()
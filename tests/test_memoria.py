@@ -0,0 +1,26 @@
+"""Tests para el reporte de memoria de los trabajadores."""
+
+import os
+import unittest
+from modules.memoria import memoria_proceso, reporte_memoria
+
+
+@unittest.skipUnless(os.path.exists("/proc/self/smaps_rollup"), "requiere /proc/<pid>/smaps_rollup")
+class TestMemoria(unittest.TestCase):
+    """Tests para la lectura de smaps_rollup."""
+
+    def test_memoria_proceso_separa_unica_y_compartida(self):
+        """Verifica que la memoria única y compartida suman lo residente."""
+        memoria = memoria_proceso()
+        self.assertEqual(memoria["pid"], os.getpid())
+        self.assertGreater(memoria["rss_kb"], 0)
+        self.assertEqual(memoria["unica_kb"] + memoria["compartida_kb"], memoria["rss_kb"])
+
+    def test_reporte_incluye_proceso_actual(self):
+        """Verifica que el reporte incluye al proceso que lo genera."""
+        reporte = reporte_memoria()
+        self.assertIn(os.getpid(), [m["pid"] for m in reporte["procesos"]])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,159 @@
+"""
+Tests para las métricas de tiempos de resolución por departamento.
+"""
+
+import math
+import unittest
+from datetime import datetime, timedelta
+from unittest import mock
+
+from tests.conftest import CasoTestBase
+from modules.config import db
+from modules.cola_clasificacion import cola_clasificacion
+from modules.derivacion_reclamo import DerivacionReclamo
+from modules.generador_analiticas import GeneradorAnaliticas
+from modules.historial_estado_reclamo import HistorialEstadoReclamo
+from modules.metrica_resolucion import MarcaMetricaResolucion, MetricaResolucion
+from modules.reclamo import Reclamo, EstadoReclamo
+
+
+def _percentil(valores, p):
+    ordenados = sorted(valores)
+    return ordenados[math.ceil(p * len(ordenados)) - 1]
+
+
+class TestMetricaResolucion(CasoTestBase):
+    """Tests del cálculo con funciones de ventana y de su actualización."""
+
+    def setUp(self):
+        """Crea un usuario final y al Secretario Técnico."""
+        super().setUp()
+
+        self.usuario_id = self._crear_usuarios_finales()[0].id
+        self.admin_id = self._crear_admin().id
+        self.ciencias = self.departamentos_prueba["depto1_id"]
+        self.inicio = datetime(2026, 3, 2, 9, 0)
+
+    def _reclamo_con_historial(self, horas_pendiente, horas_en_proceso):
+        """Crea un reclamo que pasa a En proceso y luego a Resuelto tras las horas indicadas."""
+        reclamo, _ = Reclamo.crear(
+            usuario_id=self.usuario_id, detalle=f"Reclamo {horas_pendiente} {horas_en_proceso}",
+            departamento_id=self.ciencias,
+        )
+        reclamo.creado_en = self.inicio
+        db.session.commit()
+
+        cambios = [
+            (EstadoReclamo.EN_PROCESO, self.inicio + timedelta(hours=horas_pendiente)),
+            (EstadoReclamo.RESUELTO, self.inicio + timedelta(hours=horas_pendiente + horas_en_proceso)),
+        ]
+        for estado, momento in cambios:
+            Reclamo.actualizar_estado(reclamo.id, estado, self.admin_id)
+            entrada = (
+                HistorialEstadoReclamo.query.filter_by(reclamo_id=reclamo.id, estado_nuevo=estado).one()
+            )
+            entrada.cambiado_en = momento
+            db.session.commit()
+        return reclamo.id
+
+    def test_percentiles_por_metrica(self):
+        """Verifica la mediana y el p90 de cada métrica contra un cálculo en Python."""
+        duraciones = [(2, 10), (4, 20), (6, 30), (8, 40), (50, 100)]
+        for horas_pendiente, horas_en_proceso in duraciones:
+            self._reclamo_con_historial(horas_pendiente, horas_en_proceso)
+        MetricaResolucion.reconstruir()
+
+        metricas = MetricaResolucion.obtener([self.ciencias])[self.ciencias]
+        esperadas = {
+            "pendiente": [p for p, _ in duraciones],
+            "en_proceso": [e for _, e in duraciones],
+            "resolucion": [p + e for p, e in duraciones],
+        }
+        for metrica, valores in esperadas.items():
+            self.assertEqual(metricas[metrica]["cantidad"], len(valores))
+            self.assertAlmostEqual(metricas[metrica]["mediana_horas"], _percentil(valores, 0.5), places=3)
+            self.assertAlmostEqual(metricas[metrica]["p90_horas"], _percentil(valores, 0.9), places=3)
+
+    def test_actualizar_estado_marca_el_departamento(self):
+        """Verifica que un cambio de estado sólo marca el departamento y actualizar() lo recalcula."""
+        reclamo, _ = Reclamo.crear(
+            usuario_id=self.usuario_id, detalle="Falta calefacción", departamento_id=self.ciencias,
+        )
+        self.assertEqual(MetricaResolucion.obtener([self.ciencias]), {})
+
+        Reclamo.actualizar_estado(reclamo.id, EstadoReclamo.RESUELTO, self.admin_id)
+
+        self.assertEqual(MetricaResolucion.obtener([self.ciencias]), {})
+        self.assertEqual(MarcaMetricaResolucion.obtener(), {self.ciencias: 1})
+        self.assertEqual(MetricaResolucion.actualizar(), 1)
+        self.assertEqual(MarcaMetricaResolucion.obtener(), {})
+        metricas = MetricaResolucion.obtener([self.ciencias])[self.ciencias]
+        self.assertEqual(metricas["resolucion"]["cantidad"], 1)
+        self.assertEqual(metricas["pendiente"]["cantidad"], 1)
+        self.assertNotIn("en_proceso", metricas)
+
+    def test_solo_cuenta_la_primera_resolucion(self):
+        """Verifica que reabrir y volver a resolver no suma otra resolución."""
+        reclamo_id = self._reclamo_con_historial(1, 1)
+        Reclamo.actualizar_estado(reclamo_id, EstadoReclamo.EN_PROCESO, self.admin_id)
+        Reclamo.actualizar_estado(reclamo_id, EstadoReclamo.RESUELTO, self.admin_id)
+        MetricaResolucion.actualizar()
+
+        metricas = MetricaResolucion.obtener([self.ciencias])[self.ciencias]
+        self.assertEqual(metricas["resolucion"]["cantidad"], 1)
+        self.assertAlmostEqual(metricas["resolucion"]["mediana_horas"], 2, places=3)
+
+    def test_derivar_mueve_las_metricas(self):
+        """Verifica que derivar marca el departamento de origen y el de destino."""
+        reclamo_id = self._reclamo_con_historial(3, 5)
+        humanidades = self.departamentos_prueba["depto2_id"]
+        MetricaResolucion.actualizar()
+
+        DerivacionReclamo.derivar(reclamo_id, humanidades, self.admin_id)
+        self.assertEqual(set(MarcaMetricaResolucion.obtener()), {self.ciencias, humanidades})
+        MetricaResolucion.actualizar()
+
+        metricas = MetricaResolucion.obtener([self.ciencias, humanidades])
+        self.assertNotIn(self.ciencias, metricas)
+        self.assertAlmostEqual(metricas[humanidades]["resolucion"]["mediana_horas"], 8, places=3)
+
+    def test_clasificar_mueve_las_metricas(self):
+        """Verifica que la clasificación en segundo plano marca ambos departamentos."""
+        secretaria = self.departamentos_prueba["st_id"]
+        reclamo, _ = Reclamo.crear(usuario_id=self.usuario_id, detalle="Falta calefacción")
+        Reclamo.actualizar_estado(reclamo.id, EstadoReclamo.RESUELTO, self.admin_id)
+        MetricaResolucion.actualizar()
+        self.assertIn(secretaria, MetricaResolucion.obtener([secretaria]))
+
+        with mock.patch.object(Reclamo, "_clasificar_departamento", return_value=self.ciencias):
+            self.assertEqual(cola_clasificacion.drenar(), 1)
+        MetricaResolucion.actualizar()
+
+        metricas = MetricaResolucion.obtener([secretaria, self.ciencias])
+        self.assertNotIn(secretaria, metricas)
+        self.assertEqual(metricas[self.ciencias]["resolucion"]["cantidad"], 1)
+
+    def test_marca_nueva_durante_el_recalculo_se_conserva(self):
+        """Verifica que un cambio posterior a la lectura de las marcas no se pierde."""
+        MetricaResolucion.marcar([self.ciencias])
+        marcas = MarcaMetricaResolucion.obtener()
+        MetricaResolucion.marcar([self.ciencias])
+
+        MarcaMetricaResolucion.desmarcar(marcas)
+        db.session.commit()
+
+        self.assertEqual(MarcaMetricaResolucion.obtener(), {self.ciencias: 2})
+
+    def test_generador_lista_departamentos_con_metricas(self):
+        """Verifica que las analíticas listan sólo los departamentos con métricas."""
+        self._reclamo_con_historial(3, 5)
+        MetricaResolucion.reconstruir()
+
+        filas = GeneradorAnaliticas.obtener_metricas_resolucion()
+
+        self.assertEqual([f["departamento"] for f in filas], ["Departamento de Ciencias"])
+        self.assertAlmostEqual(filas[0]["resolucion"]["mediana_horas"], 8, places=3)
+
+
+if __name__ == "__main__":
+    unittest.main()
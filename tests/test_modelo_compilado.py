@@ -0,0 +1,114 @@
+"""Tests para el artefacto compilado del clasificador (PredictorCompilado)."""
+
+import os
+import pickle
+import shutil
+import tempfile
+import unittest
+from modules.classifier import ClaimsClassifier
+from modules.clasificador import Clasificador
+from modules.modelo_compilado import PredictorCompilado, exportar_modelo
+
+TEXTOS_ENTRENAMIENTO = [
+    ("No hay internet en el laboratorio de informática", "soporte informático"),
+    ("La computadora del aula no enciende", "soporte informático"),
+    ("El proyector está fallando y se apaga", "soporte informático"),
+    ("No funciona el WiFi en el edificio B", "soporte informático"),
+    ("La impresora de la sala de profesores no imprime", "soporte informático"),
+    ("No puedo acceder al campus virtual", "soporte informático"),
+    ("El aire acondicionado no funciona en el aula 301", "maestranza"),
+    ("Se rompió la canilla del baño del segundo piso", "maestranza"),
+    ("Las luces del pasillo están quemadas", "maestranza"),
+    ("Hay una gotera en el techo del laboratorio", "maestranza"),
+    ("La cerradura de la puerta está rota", "maestranza"),
+    ("Las baldosas del piso están rotas y peligrosas", "maestranza"),
+    ("Quiero presentar una queja formal sobre el servicio", "secretaría técnica"),
+    ("El departamento de maestranza no responde mis reclamos", "secretaría técnica"),
+    ("Solicito intervención de secretaría técnica por falta de seguimiento", "secretaría técnica"),
+    ("Nadie se hace cargo del problema y necesito una solución formal", "secretaría técnica"),
+]
+
+TEXTOS_PRUEBA = [
+    "No anda el wifi del aula 3",
+    "La puerta del baño no cierra y la canilla gotea",
+    "Quiero una queja formal porque nadie responde",
+    "El proyector y la computadora del laboratorio no encienden",
+    "",
+    "1234",
+]
+
+
+class TestModeloCompilado(unittest.TestCase):
+    """Tests de paridad entre el predictor compilado y ClaimsClassifier."""
+
+    @classmethod
+    def setUpClass(cls):
+        """Entrena un clasificador pequeño y lo exporta a un directorio temporal."""
+        textos, etiquetas = zip(*TEXTOS_ENTRENAMIENTO)
+        cls.clf = ClaimsClassifier().fit(list(textos), list(etiquetas))
+        cls.directorio = tempfile.mkdtemp()
+        exportar_modelo(cls.clf, cls.directorio, metadatos={"origen": "test"})
+        cls.predictor = PredictorCompilado.cargar(cls.directorio)
+
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(cls.directorio, ignore_errors=True)
+
+    def test_paridad_con_classify(self):
+        """Verifica que las etiquetas coinciden con ClaimsClassifier.classify."""
+        textos = [t for t, _ in TEXTOS_ENTRENAMIENTO] + TEXTOS_PRUEBA
+        esperado = list(self.clf.classify(textos))
+
+        obtenido = self.predictor.predecir(self.clf.tokenize(textos))
+
+        self.assertEqual(obtenido, esperado)
+
+    def test_paridad_de_a_un_texto(self):
+        """Verifica la paridad cuando se clasifica un único reclamo."""
+        for texto in TEXTOS_PRUEBA:
+            esperado = self.clf.classify([texto])[0]
+            self.assertEqual(self.predictor.predecir(self.clf.tokenize([texto])), [esperado])
+
+    def test_metadatos(self):
+        """Verifica que los metadatos del artefacto se conservan."""
+        self.assertEqual(self.predictor.metadatos["origen"], "test")
+
+    def test_directorio_sin_artefacto(self):
+        """Verifica que cargar un directorio vacío falla."""
+        directorio_vacio = tempfile.mkdtemp()
+        try:
+            with self.assertRaises(ValueError):
+                PredictorCompilado.cargar(directorio_vacio)
+        finally:
+            shutil.rmtree(directorio_vacio, ignore_errors=True)
+
+
+@unittest.skipUnless(os.path.exists(Clasificador.RUTA_MODELO), "falta data/claims_clf.pkl")
+class TestModeloCompiladoProyecto(unittest.TestCase):
+    """Tests de paridad del predictor compilado con el modelo entrenado del proyecto."""
+
+    @classmethod
+    def setUpClass(cls):
+        """Carga data/claims_clf.pkl y lo exporta a un directorio temporal."""
+        with open(Clasificador.RUTA_MODELO, "rb") as archivo:
+            cls.clf = pickle.load(archivo)
+        cls.directorio = tempfile.mkdtemp()
+        exportar_modelo(cls.clf, cls.directorio)
+        cls.predictor = PredictorCompilado.cargar(cls.directorio)
+
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(cls.directorio, ignore_errors=True)
+
+    def test_paridad_con_modelo_del_proyecto(self):
+        """Verifica que las etiquetas coinciden con el pickle del proyecto."""
+        textos = [t for t, _ in TEXTOS_ENTRENAMIENTO] + TEXTOS_PRUEBA
+        esperado = list(self.clf.classify(textos))
+
+        obtenido = self.predictor.predecir(self.clf.tokenize(textos))
+
+        self.assertEqual(obtenido, esperado)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,55 @@
+"""
+Tests para la precarga antes del fork de los trabajadores.
+"""
+
+import unittest
+from unittest import mock
+
+from tests.conftest import CasoTestBase
+from modules import precarga
+from modules.config import db
+
+
+class TestPrecargaAntesDeFork(CasoTestBase):
+    """Tests del callback que encola los reclamos pendientes tras el fork."""
+
+    def setUp(self):
+        """Evita cargar el modelo, cerrar la base, congelar el recolector y registrar callbacks reales."""
+        super().setUp()
+        for nombre, valor in (("_app_tras_fork", None), ("_fork_registrado", False)):
+            parche = mock.patch.object(precarga, nombre, valor)
+            parche.start()
+            self.addCleanup(parche.stop)
+        for objetivo in ("modules.precarga.precalentar", "modules.precarga.gc.freeze"):
+            parche = mock.patch(objetivo)
+            parche.start()
+            self.addCleanup(parche.stop)
+        parche = mock.patch.object(db.engine, "dispose")
+        parche.start()
+        self.addCleanup(parche.stop)
+        parche = mock.patch("modules.precarga.os.register_at_fork")
+        self.register_at_fork = parche.start()
+        self.addCleanup(parche.stop)
+        parche = mock.patch.object(precarga, "_encolar_pendientes_en_segundo_plano")
+        self.encolar = parche.start()
+        self.addCleanup(parche.stop)
+
+    def test_callback_se_registra_una_vez(self):
+        """Verifica que precargar dos veces no acumula callbacks de fork."""
+        precarga.precargar_antes_de_fork(self.app)
+        precarga.precargar_antes_de_fork(self.app)
+
+        self.register_at_fork.assert_called_once_with(after_in_child=precarga._tras_fork)
+
+    def test_solo_el_primer_fork_encola(self):
+        """Verifica que un proceso creado por un trabajador no vuelve a encolar los pendientes."""
+        precarga.precargar_antes_de_fork(self.app)
+
+        precarga._tras_fork()
+        precarga._tras_fork()
+
+        self.encolar.assert_called_once_with(self.app)
+
+
+if __name__ == "__main__":
+    unittest.main()
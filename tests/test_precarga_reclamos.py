@@ -0,0 +1,106 @@
+"""
+Tests de las variantes con precarga de las consultas de listados de reclamos.
+"""
+
+import unittest
+
+from sqlalchemy import event
+
+from tests.conftest import CasoTestBase
+from modules.ayudante_admin import AyudanteAdmin
+from modules.config import db
+from modules.departamento import Departamento
+from modules.reclamo import Reclamo
+from modules.usuario_admin import RolAdmin, UsuarioAdmin
+
+
+class TestPrecargaReclamos(CasoTestBase):
+    """Los listados con precarga se renderizan sin consultas por reclamo."""
+
+    def setUp(self):
+        """Crea 12 reclamos de tres usuarios en dos departamentos, dos de ellos con adherentes."""
+        super().setUp()
+
+        self.usuarios = self._crear_usuarios_finales(3)
+        self.ciencias = Departamento.obtener_por_id(self.departamentos_prueba["depto1_id"])
+        self.humanidades = Departamento.obtener_por_id(self.departamentos_prueba["depto2_id"])
+        self.ids = self._crear_reclamos(
+            [usuario.id for usuario in self.usuarios], [self.ciencias.id, self.humanidades.id], 12
+        )
+        Reclamo.agregar_adherente(self.ids[0], self.usuarios[1].id)
+        Reclamo.agregar_adherente(self.ids[0], self.usuarios[2].id)
+        Reclamo.agregar_adherente(self.ids[3], self.usuarios[1].id)
+        self.ids_usuarios = [usuario.id for usuario in self.usuarios]
+        # Las consultas de cada test arrancan con la sesión vacía, como en un request
+        db.session.expunge_all()
+
+    def _contar_consultas(self, funcion):
+        """Ejecuta la función y devuelve su resultado y la cantidad de consultas SQL."""
+        consultas = []
+
+        def registrar(*args):
+            consultas.append(args[2])
+
+        event.listen(db.engine, "before_cursor_execute", registrar)
+        try:
+            resultado = funcion()
+        finally:
+            event.remove(db.engine, "before_cursor_execute", registrar)
+        return resultado, len(consultas)
+
+    @staticmethod
+    def _renderizar(reclamos):
+        # Lo que leen las plantillas de listados por cada reclamo
+        return [
+            (r.departamento.nombre_mostrar, r.creador.nombre_completo, r.cantidad_adherentes)
+            for r in reclamos
+        ]
+
+    def test_listado_con_precarga_usa_una_consulta(self):
+        """Verifica que el listado general con precarga se renderiza con una sola consulta."""
+        filas, consultas = self._contar_consultas(
+            lambda: self._renderizar(Reclamo.obtener_todos_con_filtros(precargar=True))
+        )
+
+        self.assertEqual(len(filas), 12)
+        self.assertEqual(consultas, 1)
+
+    def test_precarga_cuenta_adherentes_sin_cargarlos(self):
+        """Verifica que la cantidad de adherentes sale de la consulta sin cargar la relación."""
+        departamentos = Departamento.obtener_todos()
+        reclamos = {r.id: r for r in Reclamo.obtener_por_departamentos(departamentos, precargar=True)}
+
+        self.assertEqual(reclamos[self.ids[0]].cantidad_adherentes, 2)
+        self.assertEqual(reclamos[self.ids[3]].cantidad_adherentes, 1)
+        self.assertEqual(reclamos[self.ids[1]].cantidad_adherentes, 0)
+        self.assertNotIn("adherentes", reclamos[self.ids[0]].__dict__)
+
+    def test_sin_precarga_se_mantiene_el_resultado(self):
+        """Verifica que con y sin precarga se renderizan los mismos datos."""
+        sin_precarga = self._renderizar(Reclamo.obtener_todos_con_filtros())
+        db.session.expunge_all()
+        con_precarga = self._renderizar(Reclamo.obtener_todos_con_filtros(precargar=True))
+
+        self.assertEqual(sin_precarga, con_precarga)
+
+    def test_listado_admin_con_ids_de_adherentes(self):
+        """Verifica que el listado de un admin y sus adherentes no hacen consultas por reclamo."""
+        admin_id = self._crear_admin(RolAdmin.JEFE_DEPARTAMENTO, self.departamentos_prueba["depto1_id"]).id
+        db.session.expunge_all()
+        admin = db.session.get(UsuarioAdmin, admin_id)
+
+        def listar():
+            reclamos = AyudanteAdmin.obtener_reclamos_para_admin(admin)
+            ids = Reclamo.obtener_ids_adherentes_por_reclamos([r.id for r in reclamos])
+            return self._renderizar(reclamos), ids
+
+        (filas, ids), consultas = self._contar_consultas(listar)
+
+        self.assertEqual(len(filas), 6)
+        self.assertEqual(ids[self.ids[0]], self.ids_usuarios[1:])
+        self.assertEqual(ids[self.ids[2]], [])
+        self.assertLessEqual(consultas, 3)
+
+
+if __name__ == "__main__":
+    unittest.main()
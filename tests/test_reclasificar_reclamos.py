@@ -0,0 +1,131 @@
+"""
+Tests para el script de reclasificación de reclamos.
+"""
+
+import json
+import os
+import tempfile
+import unittest
+from unittest import mock
+from tests.conftest import CasoTestBase
+from modules.config import db
+from modules.clasificador import Clasificador
+from modules.metrica_resolucion import MetricaResolucion
+from modules.reclamo import Reclamo, EstadoReclamo
+from modules.similitud import buscador_similitud
+from modules.departamento import Departamento
+from modules.derivacion_reclamo import DerivacionReclamo
+from modules.usuario_final import UsuarioFinal, Claustro
+from modules.usuario_admin import UsuarioAdmin, RolAdmin
+import reclasificar_reclamos
+
+
+class TestReclasificarReclamos(CasoTestBase):
+    """Tests para la reclasificación por bloques con punto de control."""
+
+    def setUp(self):
+        """Crea reclamos en Humanidades y un clasificador que predice Ciencias."""
+        super().setUp()
+
+        usuario = UsuarioFinal(
+            nombre="Test", apellido="Usuario",
+            correo="usuario@test.com", nombre_usuario="testusuario",
+            claustro=Claustro.ESTUDIANTE,
+        )
+        usuario.establecer_contrasena("test123")
+        db.session.add(usuario)
+        db.session.commit()
+
+        self.ids = []
+        for i in range(5):
+            reclamo, _ = Reclamo.crear(
+                usuario_id=usuario.id, detalle=f"Reclamo número {i}",
+                departamento_id=self.departamentos_prueba["depto2_id"],
+            )
+            self.ids.append(reclamo.id)
+
+        self.ruta_control = os.path.join(tempfile.mkdtemp(), "control.json")
+        parche = mock.patch.object(
+            Clasificador, "clasificar_lote", side_effect=lambda textos: ["ciencias"] * len(textos)
+        )
+        parche.start()
+        self.addCleanup(parche.stop)
+
+    def _departamentos(self) -> list[int]:
+        db.session.expire_all()
+        return [Reclamo.obtener_por_id(rid).departamento_id for rid in self.ids]
+
+    def test_reasigna_departamento_predicho(self):
+        """Verifica que los reclamos pasan al departamento predicho."""
+        resultado = reclasificar_reclamos.reclasificar(
+            tamano_bloque=2, procesos=0, ruta_control=self.ruta_control
+        )
+
+        self.assertEqual(resultado["procesados"], 5)
+        self.assertEqual(resultado["reasignados"], 5)
+        self.assertEqual(self._departamentos(), [self.departamentos_prueba["depto1_id"]] * 5)
+        self.assertFalse(os.path.exists(self.ruta_control))
+
+    def test_recalcula_metricas_de_los_departamentos_afectados(self):
+        """Verifica que la reasignación en bloque mueve las métricas de resolución."""
+        admin, _ = UsuarioAdmin.crear(
+            nombre="Admin", apellido="Test", correo="admin@test.com",
+            nombre_usuario="admin", rol_admin=RolAdmin.SECRETARIO_TECNICO,
+            contrasena="admin123", departamento_id=self.departamentos_prueba["st_id"],
+        )
+        Reclamo.actualizar_estado(self.ids[0], EstadoReclamo.RESUELTO, admin.id)
+        MetricaResolucion.actualizar()
+        ciencias, humanidades = self.departamentos_prueba["depto1_id"], self.departamentos_prueba["depto2_id"]
+        self.assertIn(humanidades, MetricaResolucion.obtener([humanidades]))
+
+        reclasificar_reclamos.reclasificar(procesos=0, ruta_control=self.ruta_control)
+        MetricaResolucion.actualizar()
+
+        metricas = MetricaResolucion.obtener([ciencias, humanidades])
+        self.assertNotIn(humanidades, metricas)
+        self.assertEqual(metricas[ciencias]["resolucion"]["cantidad"], 1)
+
+    def test_indice_de_similitud_ve_los_reclamos_movidos(self):
+        """Verifica que las particiones de similitud ya construidas se reconstruyen tras mover en bloque."""
+        ciencias, humanidades = self.departamentos_prueba["depto1_id"], self.departamentos_prueba["depto2_id"]
+        buscador_similitud.construir_indice()
+
+        reclasificar_reclamos.reclasificar(procesos=0, ruta_control=self.ruta_control)
+
+        similares = buscador_similitud.buscar_reclamos_similares("Reclamo número 3", departamento_id=ciencias)
+        self.assertIn(self.ids[3], [r.id for r, _ in similares])
+        self.assertEqual(buscador_similitud.buscar_reclamos_similares("Reclamo número 3", departamento_id=humanidades), [])
+        self.assertEqual(len(buscador_similitud.particion(humanidades)), 0)
+
+    def test_retoma_desde_punto_de_control(self):
+        """Verifica que una ejecución interrumpida continúa después del último id guardado."""
+        with open(self.ruta_control, "w", encoding="utf-8") as archivo:
+            json.dump({
+                "modelo": Clasificador.huella_modelo(), "ultimo_id": self.ids[2],
+                "procesados": 3, "reasignados": 0,
+            }, archivo)
+
+        resultado = reclasificar_reclamos.reclasificar(
+            tamano_bloque=2, procesos=0, ruta_control=self.ruta_control
+        )
+
+        self.assertEqual(resultado["procesados"], 5)
+        ciencias, humanidades = self.departamentos_prueba["depto1_id"], self.departamentos_prueba["depto2_id"]
+        self.assertEqual(self._departamentos(), [humanidades] * 3 + [ciencias] * 2)
+
+    def test_no_modifica_reclamos_derivados(self):
+        """Verifica que un reclamo derivado a mano conserva su departamento."""
+        admin, _ = UsuarioAdmin.crear(
+            nombre="Admin", apellido="Test", correo="admin@test.com",
+            nombre_usuario="admin", rol_admin=RolAdmin.SECRETARIO_TECNICO,
+            contrasena="admin123", departamento_id=self.departamentos_prueba["st_id"],
+        )
+        DerivacionReclamo.derivar(self.ids[0], self.departamentos_prueba["st_id"], admin.id)
+
+        reclasificar_reclamos.reclasificar(procesos=0, ruta_control=self.ruta_control)
+
+        self.assertEqual(self._departamentos()[0], self.departamentos_prueba["st_id"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,75 @@
+"""
+Tests del renderizador de gráficos en un pool de procesos.
+"""
+
+import time
+import unittest
+from concurrent.futures import Future
+from unittest import mock
+
+from tests.conftest import CasoTestBase
+from modules.cache_graficos import cache_graficos
+from modules.generador_analiticas import GeneradorAnaliticas
+from modules.renderizador_graficos import (
+    GraficoNoDisponible, RenderizadorGraficos, renderizador_graficos,
+)
+
+CONTEOS = {"Pendiente": 3, "Resuelto": 1}
+
+
+class TestRenderizadorGraficos(CasoTestBase):
+    """Tests del envío de trabajos, la cola acotada y el tiempo de espera."""
+
+    def test_sin_procesos_dibuja_en_el_mismo_hilo(self):
+        """Verifica que con GRAFICOS_PROCESOS=0 el gráfico se dibuja sin pool."""
+        imagen = renderizador_graficos.renderizar("torta", CONTEOS, "svg")
+        self.assertIn(b"<svg", imagen)
+        self.assertEqual(len(renderizador_graficos), 0)
+
+    def test_sin_datos_devuelve_none(self):
+        """Verifica que un gráfico sin datos no produce imagen."""
+        self.assertIsNone(renderizador_graficos.renderizar("torta", {"Pendiente": 0}, "png"))
+
+    def test_usa_el_cache_sin_enviar_trabajos(self):
+        """Verifica que una imagen cacheada se devuelve sin crear el pool."""
+        clave = GeneradorAnaliticas.huella_grafico("torta", CONTEOS, "png")
+        cache_graficos.guardar(clave, b"png cacheado")
+        self.app.config["GRAFICOS_PROCESOS"] = 1
+
+        with mock.patch.object(RenderizadorGraficos, "_RenderizadorGraficos__obtener_pool") as pool:
+            self.assertEqual(renderizador_graficos.renderizar("torta", CONTEOS, "png"), b"png cacheado")
+        pool.assert_not_called()
+
+    def test_cola_llena_y_tiempo_agotado(self):
+        """Verifica que la cola llena y la espera agotada lanzan GraficoNoDisponible."""
+        self.app.config["GRAFICOS_PROCESOS"] = 1
+        renderizador = RenderizadorGraficos(max_en_cola=1)
+        pool = mock.Mock()
+        pool.submit.side_effect = lambda *args: Future()
+
+        with mock.patch.object(RenderizadorGraficos, "_RenderizadorGraficos__obtener_pool", return_value=pool):
+            with self.assertRaises(GraficoNoDisponible):
+                renderizador.renderizar("torta", CONTEOS, "png", espera=0.01)
+            # El mismo gráfico reutiliza el trabajo en curso
+            renderizador.enviar("torta", CONTEOS, "png")
+            self.assertEqual(pool.submit.call_count, 1)
+            with self.assertRaises(GraficoNoDisponible):
+                renderizador.enviar("nube", {"aula": 2}, "png")
+
+    def test_pool_de_procesos_guarda_en_el_cache(self):
+        """Verifica que la imagen dibujada en otro proceso queda en el cache."""
+        self.app.config["GRAFICOS_PROCESOS"] = 1
+        imagen = renderizador_graficos.renderizar("torta", CONTEOS, "svg", espera=60)
+
+        self.assertIn(b"<svg", imagen)
+        # El callback que guarda en el cache corre después de entregar el resultado
+        for _ in range(100):
+            if len(renderizador_graficos) == 0:
+                break
+            time.sleep(0.01)
+        clave = GeneradorAnaliticas.huella_grafico("torta", CONTEOS, "svg")
+        self.assertEqual(cache_graficos.obtener(clave), imagen)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,140 @@
+"""
+Tests para BuscadorSimilitud y su índice incremental.
+"""
+
+import unittest
+from tests.conftest import CasoTestBase
+from sqlalchemy import update
+from modules.config import db
+from modules.indice_similitud import IndiceSimilitud
+from modules.reclamo import Reclamo, EstadoReclamo
+from modules.similitud import buscador_similitud
+from modules.usuario_final import UsuarioFinal, Claustro
+from modules.usuario_admin import UsuarioAdmin, RolAdmin
+
+
+class TestBuscadorSimilitud(CasoTestBase):
+    """Tests para la búsqueda de reclamos similares."""
+
+    def setUp(self):
+        """Crea usuario, admin y reclamos pendientes de prueba."""
+        super().setUp()
+
+        usuario = UsuarioFinal(
+            nombre="Test", apellido="Usuario",
+            correo="usuario@test.com", nombre_usuario="testusuario",
+            claustro=Claustro.ESTUDIANTE,
+        )
+        usuario.establecer_contrasena("test123")
+        db.session.add(usuario)
+        db.session.commit()
+        self.usuario_id = usuario.id
+
+        admin, _ = UsuarioAdmin.crear(
+            nombre="Admin", apellido="Test", correo="admin@test.com",
+            nombre_usuario="admin", rol_admin=RolAdmin.SECRETARIO_TECNICO,
+            contrasena="admin123", departamento_id=self.departamentos_prueba["st_id"],
+        )
+        self.admin_id = admin.id
+
+        self.reclamo_wifi = self._crear("No funciona el wifi en el aula 3", "depto1_id")
+        self._crear("Se rompió la canilla del baño del segundo piso", "depto2_id")
+
+    def _crear(self, detalle: str, clave_depto: str) -> int:
+        reclamo, _ = Reclamo.crear(
+            usuario_id=self.usuario_id, detalle=detalle,
+            departamento_id=self.departamentos_prueba[clave_depto],
+        )
+        return reclamo.id
+
+    def _ids_similares(self, texto: str, **kwargs) -> list[int]:
+        return [r.id for r, _ in buscador_similitud.buscar_reclamos_similares(texto, **kwargs)]
+
+    def test_encuentra_reclamo_similar(self):
+        """Verifica que se detecta un reclamo pendiente parecido."""
+        self.assertEqual(self._ids_similares("el wifi del aula 3 no funciona"), [self.reclamo_wifi])
+
+    def test_texto_vacio(self):
+        """Verifica que un texto vacío no devuelve resultados."""
+        self.assertEqual(buscador_similitud.buscar_reclamos_similares("   "), [])
+
+    def test_reclamo_creado_despues_de_construir(self):
+        """Verifica que Reclamo.crear agrega el reclamo al índice ya construido."""
+        self._ids_similares("wifi")
+        particion = buscador_similitud.particion(self.departamentos_prueba["depto1_id"])
+        self.assertIsNotNone(particion)
+
+        nuevo_id = self._crear("No funciona el wifi del laboratorio", "depto1_id")
+
+        self.assertIn(nuevo_id, particion)
+        self.assertIn(nuevo_id, self._ids_similares("no funciona el wifi"))
+
+    def test_reclamo_fuera_de_pendiente_se_quita(self):
+        """Verifica que un reclamo que deja de estar pendiente sale del índice."""
+        self._ids_similares("wifi")
+
+        Reclamo.actualizar_estado(self.reclamo_wifi, EstadoReclamo.EN_PROCESO, self.admin_id)
+
+        particion = buscador_similitud.particion(self.departamentos_prueba["depto1_id"])
+        self.assertNotIn(self.reclamo_wifi, particion)
+        self.assertEqual(self._ids_similares("el wifi del aula 3 no funciona"), [])
+
+    def test_filtro_departamento(self):
+        """Verifica que el filtro por departamento excluye otros departamentos."""
+        ids = self._ids_similares(
+            "el wifi del aula 3 no funciona",
+            departamento_id=self.departamentos_prueba["depto2_id"],
+        )
+        self.assertEqual(ids, [])
+
+    def test_derivacion_mueve_reclamo_de_particion(self):
+        """Verifica que derivar un reclamo lo mueve entre particiones."""
+        from modules.derivacion_reclamo import DerivacionReclamo
+
+        self._ids_similares("wifi")
+        DerivacionReclamo.derivar(
+            reclamo_id=self.reclamo_wifi,
+            departamento_destino_id=self.departamentos_prueba["depto2_id"],
+            derivado_por_id=self.admin_id,
+        )
+
+        self.assertNotIn(self.reclamo_wifi, buscador_similitud.particion(self.departamentos_prueba["depto1_id"]))
+        self.assertIn(self.reclamo_wifi, buscador_similitud.particion(self.departamentos_prueba["depto2_id"]))
+        ids = self._ids_similares(
+            "el wifi del aula 3 no funciona",
+            departamento_id=self.departamentos_prueba["depto2_id"],
+        )
+        self.assertEqual(ids, [self.reclamo_wifi])
+
+    def test_puntajes_de_particiones_en_la_misma_escala(self):
+        """Verifica que combinar particiones da los mismos puntajes que un índice único."""
+        self._crear("El wifi de la biblioteca anda lento", "depto2_id")
+        self._crear("No hay wifi en el laboratorio de química", "depto1_id")
+        texto = "no anda el wifi del aula"
+
+        combinados = {
+            r.id: sim for r, sim in buscador_similitud.buscar_reclamos_similares(texto, umbral=0.0, limite=10)
+        }
+        indice_unico = IndiceSimilitud()
+        indice_unico.construir([(r.id, r.detalle) for r in Reclamo.obtener_pendientes()])
+        esperados = dict(indice_unico.consultar(texto, umbral=0.0, limite=10))
+
+        self.assertEqual(combinados.keys(), esperados.keys())
+        for reclamo_id, similitud in esperados.items():
+            self.assertAlmostEqual(combinados[reclamo_id], similitud)
+
+    def test_reclamo_movido_fuera_del_indice_no_aparece_en_su_departamento_anterior(self):
+        """Verifica que un reclamo que ya no es del departamento pedido se descarta."""
+        depto1 = self.departamentos_prueba["depto1_id"]
+        self.assertEqual(self._ids_similares("wifi del aula 3", departamento_id=depto1), [self.reclamo_wifi])
+        db.session.execute(
+            update(Reclamo).where(Reclamo.id == self.reclamo_wifi)
+            .values(departamento_id=self.departamentos_prueba["depto2_id"])
+        )
+        db.session.commit()
+
+        self.assertEqual(self._ids_similares("wifi del aula 3", departamento_id=depto1), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,77 @@
+"""Tests para TextVectorizer."""
+
+import unittest
+from collections import Counter
+
+import scipy.sparse as sp
+
+from modules.text_vectorizer import TextVectorizer
+
+TEXTOS_MUESTRA = [
+    "No funciona el wifi del aula 3 desde el lunes.",
+    "Se rompió la canilla del baño del segundo piso y pierde agua.",
+    "Los proyectores del laboratorio de informática no encienden.",
+    "Hay bancos rotos en el aula magna, y las ventanas no cierran.",
+    "Solicito que limpien los pasillos del edificio central, ¡están muy sucios!",
+]
+
+
+class TestTextVectorizer(unittest.TestCase):
+    """Tests de la tokenización del vectorizador."""
+
+    @classmethod
+    def setUpClass(cls):
+        """Carga el modelo de spaCy una sola vez."""
+        cls.vectorizador = TextVectorizer()
+        cls.nlp = cls.vectorizador._TextVectorizer__nlp
+
+    def _tokens_pipeline_completo(self, texto):
+        # Lo que hacía el vectorizador al entrenar el modelo: el pipeline entero
+        return TextVectorizer._TextVectorizer__doc_to_tokens(self.nlp(texto.lower()))
+
+    def test_componentes_desactivados_no_cambian_los_tokens(self):
+        """Verifica que sin parser ni NER los lemas coinciden con el pipeline completo."""
+        self.assertTrue(self.vectorizador._TextVectorizer__disabled_components())
+        esperados = [self._tokens_pipeline_completo(texto) for texto in TEXTOS_MUESTRA]
+
+        self.assertEqual(self.vectorizador.tokenize(TEXTOS_MUESTRA), esperados)
+        self.assertEqual(
+            [self.vectorizador.tokenize([texto])[0] for texto in TEXTOS_MUESTRA], esperados
+        )
+
+    def test_parametros_de_lote_no_quedan_en_el_vectorizador(self):
+        """Verifica que batch_size y n_process valen sólo para la llamada que los recibe."""
+        atributos = dict(vars(self.vectorizador))
+
+        tokens = self.vectorizador.tokenize(TEXTOS_MUESTRA, batch_size=2, n_process=1)
+
+        self.assertEqual(tokens, self.vectorizador.tokenize(TEXTOS_MUESTRA))
+        self.assertEqual(vars(self.vectorizador), atributos)
+
+    def test_transform_sparse_cuenta_palabras_del_vocabulario(self):
+        """Verifica que la matriz CSR tiene la cuenta de cada lema conocido por texto."""
+        vectorizador = TextVectorizer().fit(TEXTOS_MUESTRA[:3])
+        textos = [TEXTOS_MUESTRA[0] + " " + TEXTOS_MUESTRA[0], TEXTOS_MUESTRA[3], ""]
+
+        matriz = vectorizador.transform_sparse(textos)
+
+        vocabulario = list(vectorizador.get_feature_names_out())
+        self.assertTrue(sp.isspmatrix_csr(matriz))
+        self.assertEqual(matriz.shape, (3, len(vocabulario)))
+        for fila, tokens in enumerate(vectorizador.tokenize(textos)):
+            esperado = {
+                palabra: cantidad for palabra, cantidad in Counter(tokens.split(" ")).items()
+                if palabra in vocabulario
+            }
+            inicio, fin = matriz.indptr[fila], matriz.indptr[fila + 1]
+            obtenido = {
+                vocabulario[columna]: cantidad
+                for columna, cantidad in zip(matriz.indices[inicio:fin], matriz.data[inicio:fin])
+            }
+            self.assertEqual(obtenido, esperado)
+        self.assertEqual(max(matriz[0].data), 2)
+        self.assertTrue((vectorizador.transform(textos) == matriz.toarray()).all())
+
+
+if __name__ == "__main__":
+    unittest.main()
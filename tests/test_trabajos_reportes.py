@@ -0,0 +1,138 @@
+"""
+Tests para los trabajos de reportes PDF en segundo plano.
+"""
+
+import os
+import shutil
+import tempfile
+import time
+import unittest
+from unittest.mock import patch
+
+from tests.conftest import CasoTestBase
+from modules.departamento import Departamento
+from modules.generador_reportes import ReportePDF
+from modules.reclamo import Reclamo
+from modules.trabajos_reportes import EstadoTrabajo, trabajos_reportes
+from modules.usuario_admin import RolAdmin
+
+
+class TestTrabajosReportes(CasoTestBase):
+    """Tests de la cola de reportes y de su almacenamiento en disco."""
+
+    def setUp(self):
+        """Usa un directorio temporal para los PDF y crea un reclamo en Ciencias."""
+        super().setUp()
+        self.directorio = tempfile.mkdtemp()
+        self.directorio_original = trabajos_reportes.directorio
+        trabajos_reportes.directorio = self.directorio
+
+        self.usuarios = self._crear_usuarios_finales(2)
+        self.ciencias = Departamento.obtener_por_id(self.departamentos_prueba["depto1_id"])
+        self.reclamo, _ = Reclamo.crear(
+            usuario_id=self.usuarios[0].id, detalle="Reclamo de prueba para el reporte",
+            departamento_id=self.ciencias.id,
+        )
+
+    def tearDown(self):
+        """Restaura el directorio de reportes y borra el temporal."""
+        trabajos_reportes.directorio = self.directorio_original
+        shutil.rmtree(self.directorio, ignore_errors=True)
+        super().tearDown()
+
+    def test_genera_el_pdf_en_disco(self):
+        """Verifica que el trabajo deja el PDF en el directorio de reportes."""
+        trabajo = trabajos_reportes.solicitar([self.ciencias], False)
+
+        self.assertEqual(trabajo.estado, EstadoTrabajo.LISTO)
+        ruta = trabajos_reportes.obtener_archivo(trabajo.clave)
+        self.assertEqual(os.path.dirname(ruta), self.directorio)
+        with open(ruta, "rb") as archivo:
+            self.assertTrue(archivo.read().startswith(b"%PDF"))
+        self.assertIs(trabajos_reportes.obtener(trabajo.clave), trabajo)
+
+    def test_convierte_en_un_pool_de_procesos(self):
+        """Verifica que con REPORTES_TRABAJADORES > 0 el PDF se genera en segundo plano."""
+        self.app.config["REPORTES_TRABAJADORES"] = 1
+        trabajo = trabajos_reportes.solicitar([self.ciencias], False)
+
+        limite = time.monotonic() + 60
+        while len(trabajos_reportes) and time.monotonic() < limite:
+            time.sleep(0.05)
+
+        self.assertEqual(trabajo.estado, EstadoTrabajo.LISTO)
+        self.assertIsNotNone(trabajos_reportes._TrabajosReportes__pool_procesos)
+        with open(trabajos_reportes.obtener_archivo(trabajo.clave), "rb") as archivo:
+            self.assertTrue(archivo.read().startswith(b"%PDF"))
+
+    def test_reporte_en_disco_no_se_vuelve_a_generar(self):
+        """Verifica que tras un reinicio el mismo reporte se sirve del disco."""
+        primero = trabajos_reportes.solicitar([self.ciencias], False)
+        # Tras un reinicio sólo queda el archivo
+        trabajos_reportes.reiniciar()
+
+        with patch.object(ReportePDF, "convertir_html", side_effect=AssertionError("no debe generarse")):
+            segundo = trabajos_reportes.solicitar([self.ciencias], False)
+
+        self.assertEqual(segundo.clave, primero.clave)
+        self.assertEqual(segundo.estado, EstadoTrabajo.LISTO)
+
+    def test_cambios_en_los_datos_cambian_la_clave(self):
+        """Verifica que un adherente o un reclamo nuevo cambian la clave del reporte."""
+        clave = trabajos_reportes.clave([self.ciencias], False)
+
+        Reclamo.agregar_adherente(self.reclamo.id, self.usuarios[1].id)
+        con_adherente = trabajos_reportes.clave([self.ciencias], False)
+        Reclamo.crear(
+            usuario_id=self.usuarios[1].id, detalle="Otro reclamo de prueba",
+            departamento_id=self.ciencias.id,
+        )
+        con_reclamo = trabajos_reportes.clave([self.ciencias], False)
+
+        self.assertEqual(len({clave, con_adherente, con_reclamo}), 3)
+        self.assertNotEqual(con_reclamo, trabajos_reportes.clave([self.ciencias], True))
+
+    def test_error_se_reintenta_en_el_proximo_pedido(self):
+        """Verifica que un trabajo fallido se vuelve a generar al pedirlo de nuevo."""
+        with patch.object(ReportePDF, "convertir_html", return_value=None):
+            fallido = trabajos_reportes.solicitar([self.ciencias], False)
+        self.assertEqual(fallido.estado, EstadoTrabajo.ERROR)
+        self.assertIsNone(trabajos_reportes.obtener_archivo(fallido.clave))
+
+        reintento = trabajos_reportes.solicitar([self.ciencias], False)
+
+        self.assertIsNot(reintento, fallido)
+        self.assertEqual(reintento.estado, EstadoTrabajo.LISTO)
+
+    def test_fallo_se_registra(self):
+        """Verifica que una excepción al generar el PDF queda en el log."""
+        with patch.object(ReportePDF, "convertir_html", side_effect=RuntimeError("xhtml2pdf")):
+            with self.assertLogs(self.app.logger, "ERROR") as registro:
+                trabajo = trabajos_reportes.solicitar([self.ciencias], False)
+
+        self.assertEqual(trabajo.estado, EstadoTrabajo.ERROR)
+        self.assertIn(trabajo.clave, registro.output[0])
+        self.assertIn("RuntimeError", registro.output[0])
+
+    def test_rutas_usan_el_disco_si_el_trabajo_no_esta_en_memoria(self):
+        """Verifica que estado y descarga responden con el PDF en disco tras un reinicio."""
+        self._registrar_rutas()
+        self._iniciar_sesion(self._crear_admin(RolAdmin.JEFE_DEPARTAMENTO, self.ciencias.id).id)
+        clave = trabajos_reportes.solicitar([self.ciencias], False).clave
+        # Como si el pedido llegara a otro proceso, o después de un reinicio
+        trabajos_reportes.reiniciar()
+
+        with patch.object(ReportePDF, "convertir_html", side_effect=AssertionError("no debe generarse")):
+            estado = self.client.get(f"/admin/reports/jobs/{clave}")
+            descarga = self.client.get(f"/admin/reports/jobs/{clave}/download")
+
+        self.assertEqual(estado.status_code, 200)
+        self.assertEqual(estado.get_json()["status"], "listo")
+        self.assertEqual(descarga.status_code, 200)
+        self.assertTrue(descarga.data.startswith(b"%PDF"))
+        descarga.close()
+        self.assertEqual(self.client.get("/admin/reports/jobs/otra-clave").status_code, 404)
+
+
+if __name__ == "__main__":
+    unittest.main()
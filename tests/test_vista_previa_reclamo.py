@@ -0,0 +1,79 @@
+"""
+Tests para la vista previa y la confirmación de reclamos.
+"""
+
+import unittest
+from unittest import mock
+
+from tests.conftest import CasoTestBase
+from modules.config import db
+from modules.cache_clasificacion import CacheClasificacion
+from modules.clasificador import clasificador
+from modules.cola_clasificacion import cola_clasificacion
+from modules.reclamo import Reclamo
+from modules.usuario_final import UsuarioFinal, Claustro
+
+
+class TestVistaPreviaReclamo(CasoTestBase):
+    """Tests de las rutas de vista previa y creación de reclamos."""
+
+    def setUp(self):
+        """Registra las rutas, inicia sesión con un usuario final y parchea el modelo."""
+        super().setUp()
+        self._registrar_rutas()
+
+        usuario = UsuarioFinal(
+            nombre="Test", apellido="Usuario",
+            correo="usuario@test.com", nombre_usuario="testusuario",
+            claustro=Claustro.ESTUDIANTE,
+        )
+        usuario.establecer_contrasena("test123")
+        db.session.add(usuario)
+        db.session.commit()
+        with self.client.session_transaction() as sesion:
+            sesion["_user_id"] = str(usuario.id)
+
+        parche_version = mock.patch.object(clasificador, "version_sin_cargar", return_value="version-test")
+        parche_version.start()
+        self.addCleanup(parche_version.stop)
+        parche = mock.patch.object(clasificador, "clasificar", return_value="ciencias")
+        self.clasificar = parche.start()
+        self.addCleanup(parche.stop)
+
+    def test_confirmar_vista_previa_no_invoca_al_modelo(self):
+        """Verifica que confirmar un reclamo ya previsualizado reutiliza la clasificación."""
+        detalle = "No funciona el wifi del aula 3"
+        respuesta = self.client.post("/claims/preview", data={"detail": detalle})
+        self.assertEqual(respuesta.status_code, 200)
+        self.clasificar.assert_called_once_with(detalle)
+        with self.client.session_transaction() as sesion:
+            self.assertEqual(sesion["pending_claim"], {"detail": detalle, "image_path": None})
+
+        self.clasificar.reset_mock()
+        with mock.patch.object(CacheClasificacion, "obtener_varios") as obtener_varios:
+            respuesta = self.client.post("/claims", data={"from_preview": "true"})
+
+        self.assertEqual(respuesta.status_code, 302)
+        self.clasificar.assert_not_called()
+        obtener_varios.assert_not_called()
+        reclamo = db.session.query(Reclamo).filter_by(detalle=detalle).one()
+        self.assertEqual(reclamo.departamento_id, self.departamentos_prueba["depto1_id"])
+        self.assertFalse(reclamo.clasificacion_pendiente)
+        self.assertEqual(len(cola_clasificacion), 0)
+
+    def test_sin_clasificacion_previa_el_reclamo_va_a_la_cola(self):
+        """Verifica que si el detalle no se clasificó, la confirmación lo deja en la cola."""
+        with self.client.session_transaction() as sesion:
+            sesion["pending_claim"] = {"detail": "Se rompió la canilla del baño", "image_path": None}
+
+        self.client.post("/claims", data={"from_preview": "true"})
+
+        self.clasificar.assert_not_called()
+        reclamo = db.session.query(Reclamo).filter_by(detalle="Se rompió la canilla del baño").one()
+        self.assertEqual(reclamo.departamento_id, self.departamentos_prueba["st_id"])
+        self.assertTrue(reclamo.clasificacion_pendiente)
+        self.assertEqual(len(cola_clasificacion), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
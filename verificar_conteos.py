@@ -0,0 +1,46 @@
+"""
+Script para verificar los contadores de reclamos por departamento y estado.
+Con --reconstruir los regenera a partir de la tabla de reclamos, junto con las
+frecuencias de palabras clave, las métricas de tiempos de resolución y las
+firmas para detectar casi duplicados (necesario la primera vez sobre una base
+creada antes de existir esas tablas).
+"""
+
+import argparse
+
+from modules.banda_lsh import BandaLSH
+from modules.config import create_app
+from modules.conteo_reclamos import ConteoReclamos
+from modules.departamento import Departamento
+from modules.frecuencia_palabra import FrecuenciaPalabra
+from modules.metrica_resolucion import MetricaResolucion
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--reconstruir", action="store_true", help="regenerar los contadores")
+    argumentos = parser.parse_args()
+
+    app = create_app()
+    with app.app_context():
+        diferencias = ConteoReclamos.verificar()
+        if not diferencias:
+            print("Los contadores coinciden con los reclamos")
+        else:
+            nombres = {d.id: d.nombre_mostrar for d in Departamento.obtener_todos()}
+            print(f"{len(diferencias)} contadores no coinciden:")
+            for departamento_id, estado, guardado, real in diferencias:
+                nombre = nombres.get(departamento_id, departamento_id)
+                print(f"  - {nombre} / {estado.value}: contador {guardado}, reclamos {real}")
+
+        if argumentos.reconstruir:
+            ConteoReclamos.reconstruir()
+            FrecuenciaPalabra.reconstruir()
+            MetricaResolucion.reconstruir()
+            indexados = BandaLSH.reconstruir()
+            print("Contadores, frecuencias de palabras y métricas de resolución reconstruidos")
+            print(f"Firmas de casi duplicados recalculadas para {indexados} reclamos")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,20 @@
+"""
+Punto de entrada WSGI para servidores de producción.
+
+Con PRECARGAR_MODELO=1 el modelo se carga al importar este módulo; usado con
+un servidor que importa la app antes de hacer fork (p. ej.
+`gunicorn --preload wsgi:app`), los trabajadores comparten esa memoria.
+"""
+
+import os
+
+from modules.config import app
+from modules.precarga import precalentar, precargar_antes_de_fork
+
+# Import routes to register them with the app
+import modules.rutas  # noqa: F401
+
+if os.environ.get("PRECARGAR_MODELO") == "1":
+    precargar_antes_de_fork(app)
+else:
+    precalentar(app)